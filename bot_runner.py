@@ -1,13 +1,19 @@
 """
-Simple Bot Runner with Keep-Alive for 24/7 Operation
-This approach prioritizes reliability and simplicity
+Supervisor for 24/7 Operation
+Runs the bot in a child process and restarts it with exponential backoff,
+backing off further when it detects a crash loop
 """
 
 import logging
-import threading
-import time
 import os
-from keep_alive_simple import keep_alive
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from config import (RESTART_BASE_DELAY, RESTART_MAX_DELAY, STABLE_RUN_SECONDS,
+                    CRASH_LOOP_WINDOW, CRASH_LOOP_THRESHOLD, CRASH_LOOP_COOLDOWN)
 
 # Configure logging
 logging.basicConfig(
@@ -16,43 +22,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_bot():
-    """Run the Telegram bot"""
-    try:
-        logger.info("🚀 Starting Telegram Bot...")
-        
-        # Import main bot function
-        from main import main
-        
-        # Run the bot
-        main()
-        
-    except Exception as e:
-        logger.error(f"Bot error: {e}")
-        logger.info("Restarting bot in 10 seconds...")
-        time.sleep(10)
-        run_bot()  # Restart on error
+RUNTIME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runtime.py")
+
+def backoff_delay(failures: int, base: float = RESTART_BASE_DELAY, cap: float = RESTART_MAX_DELAY,
+                  rng=random) -> float:
+    """Exponential backoff with jitter, between half and all of base * 2^(failures-1)"""
+    delay = min(cap, base * 2 ** max(failures - 1, 0))
+    return rng.uniform(delay / 2, delay)
+
+class CrashTracker:
+    """Remembers recent crashes to tell a crash loop from an occasional failure"""
+
+    def __init__(self, window: float = CRASH_LOOP_WINDOW, threshold: int = CRASH_LOOP_THRESHOLD):
+        self.window = window
+        self.threshold = threshold
+        self.crashes = deque()
+        self.failures = 0
+
+    def record(self, run_seconds: float, now: float = None) -> bool:
+        """Record a crash after a run of run_seconds, returns True when in a crash loop"""
+        now = time.monotonic() if now is None else now
+        if run_seconds >= STABLE_RUN_SECONDS:
+            # It ran fine for a while, so this is a fresh failure
+            self.failures = 0
+        self.failures += 1
+
+        self.crashes.append(now)
+        while self.crashes and now - self.crashes[0] > self.window:
+            self.crashes.popleft()
+        return len(self.crashes) >= self.threshold
+
+    def reset(self):
+        self.crashes.clear()
+        self.failures = 0
+
+class Supervisor:
+    """Starts the runtime, forwards stop signals and restarts it when it crashes"""
+
+    def __init__(self, command=None):
+        self.command = command or [sys.executable, RUNTIME_SCRIPT]
+        self.tracker = CrashTracker()
+        self.child = None
+        self.stopping = False
+
+    def _forward_signal(self, signum, frame):
+        """Pass SIGINT/SIGTERM to the bot so it drains and saves its warm state"""
+        self.stopping = True
+        if self.child is not None and self.child.poll() is None:
+            self.child.send_signal(signum)
+
+    def _sleep(self, seconds: float):
+        """Wait before a restart, giving up early when asked to stop"""
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1.0, deadline - time.monotonic()))
+
+    def run(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._forward_signal)
+
+        while not self.stopping:
+            logger.info("🚀 Starting Telegram Bot...")
+            started = time.monotonic()
+            self.child = subprocess.Popen(self.command)
+            code = self.child.wait()
+            run_seconds = time.monotonic() - started
+
+            if self.stopping or code == 0:
+                logger.info(f"🛑 Bot exited with code {code}, not restarting")
+                break
+
+            crash_loop = self.tracker.record(run_seconds)
+            if crash_loop:
+                logger.critical(
+                    f"🔥 Crash loop: {len(self.tracker.crashes)} crashes in {self.tracker.window}s, "
+                    f"cooling down for {CRASH_LOOP_COOLDOWN}s"
+                )
+                self._sleep(CRASH_LOOP_COOLDOWN)
+                self.tracker.reset()
+                continue
+
+            delay = backoff_delay(self.tracker.failures)
+            logger.error(f"💥 Bot exited with code {code} after {run_seconds:.0f}s, restarting in {delay:.1f}s")
+            self._sleep(delay)
 
 def main():
-    """Main function to start both keep-alive and bot"""
-    try:
-        logger.info("=" * 50)
-        logger.info("🤖 Starting 24/7 Telegram Bot System")
-        logger.info("=" * 50)
-        
-        # Start keep-alive server first
-        keep_alive()
-        
-        # Start bot
-        run_bot()
-        
-    except KeyboardInterrupt:
-        logger.info("Bot stopped by user")
-    except Exception as e:
-        logger.error(f"System error: {e}")
-        logger.info("Restarting system...")
-        time.sleep(5)
-        main()
+    """Main function to supervise the bot"""
+    logger.info("=" * 50)
+    logger.info("🤖 Starting 24/7 Telegram Bot System")
+    logger.info("=" * 50)
+    Supervisor().run()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
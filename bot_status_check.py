@@ -1,76 +1,223 @@
 #!/usr/bin/env python3
 """
 Bot Status Check Script
-Quick verification that all bot systems are working correctly
+Reads the bot's metrics from its /metrics endpoint or a local snapshot file,
+reports latency, errors, API budget and cache hit rates and checks them against SLOs
+
+Exit codes: 0 all SLOs met, 1 an SLO was breached, 2 metrics could not be read
 """
 
-import os
+import argparse
 import json
+import math
+import os
 import sys
+import urllib.request
 from datetime import datetime
-from config import BOT_TOKEN
+from config import (METRICS_SNAPSHOT_FILE, SLO_HANDLER_P99_MS, SLO_MAX_ERROR_RATE, SLO_MIN_CACHE_HIT_RATE,
+                    SLO_MAX_API_BUDGET, API_CALLS_PER_SECOND)
+from utils.metrics import parse_prometheus, bucket_quantile
+
+EXIT_OK = 0
+EXIT_SLO_BREACHED = 1
+EXIT_UNAVAILABLE = 2
+
+def load_metrics(url: str = None, path: str = None, timeout: float = 5) -> dict:
+    """Fetch and parse metrics from a URL or a snapshot file"""
+    if path:
+        with open(path, 'r') as f:
+            return parse_prometheus(f.read())
+    # Talk to the local instance directly, never through a configured proxy
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(url, timeout=timeout) as response:
+        return parse_prometheus(response.read().decode())
+
+def sample_value(samples: dict, name: str, default=None):
+    """Value of an unlabelled sample"""
+    for labels, value in samples.get(name, []):
+        if not labels:
+            return value
+    return default
+
+def totals_by(samples: dict, name: str, label: str) -> dict:
+    """Sum a sample by one label"""
+    totals = {}
+    for labels, value in samples.get(name, []):
+        key = labels.get(label, "")
+        totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+def histogram_summary(samples: dict, name: str, label: str) -> dict:
+    """Count and p50/p95/p99 per label value of a histogram"""
+    buckets = {}
+    for labels, value in samples.get(f"{name}_bucket", []):
+        bound = float(labels.get('le', 'inf'))
+        buckets.setdefault(labels.get(label, ""), []).append((bound, value))
+
+    summary = {}
+    for key, cumulative in buckets.items():
+        cumulative.sort()
+        bounds = tuple(bound for bound, _ in cumulative if not math.isinf(bound))
+        counts = []
+        previous = 0.0
+        for _, total in cumulative:
+            counts.append(total - previous)
+            previous = total
+        summary[key] = {
+            'count': int(previous),
+            'p50': bucket_quantile(0.5, bounds, counts),
+            'p95': bucket_quantile(0.95, bounds, counts),
+            'p99': bucket_quantile(0.99, bounds, counts)
+        }
+    return summary
+
+def build_report(samples: dict) -> dict:
+    """Turn raw samples into the numbers the SLOs are checked against"""
+    start = sample_value(samples, 'bot_process_start_time_seconds')
+    scraped = sample_value(samples, 'bot_scrape_time_seconds')
+    uptime = scraped - start if start and scraped and scraped > start else None
+
+    latency = histogram_summary(samples, 'bot_handler_duration_seconds', 'handler')
+    errors = totals_by(samples, 'bot_handler_errors_total', 'handler')
+    commands = {}
+    for handler, stats in latency.items():
+        runs = stats['count']
+        commands[handler] = dict(stats, errors=int(errors.get(handler, 0)),
+                                 error_rate=errors.get(handler, 0) / runs if runs else 0.0)
+
+    api = histogram_summary(samples, 'bot_api_request_duration_seconds', 'method')
+    outbound_calls = sum(stats['count'] for method, stats in api.items() if method != 'getUpdates')
+    calls_per_second = outbound_calls / uptime if uptime else None
+
+    lookups = {}
+    for labels, value in samples.get('bot_cache_requests_total', []):
+        counts = lookups.setdefault(labels.get('cache', ""), {'hit': 0.0, 'miss': 0.0})
+        result = 'hit' if labels.get('result') == 'hit' else 'miss'
+        counts[result] += value
+    caches = {}
+    for cache, counts in lookups.items():
+        total = counts['hit'] + counts['miss']
+        caches[cache] = {'lookups': int(total), 'hit_rate': counts['hit'] / total if total else None}
+
+    return {
+        'uptime_seconds': uptime,
+        'commands': commands,
+        'api_methods': api,
+        'api_calls_per_second': calls_per_second,
+        'api_budget_used': calls_per_second / API_CALLS_PER_SECOND if calls_per_second is not None else None,
+        'caches': caches
+    }
+
+def check_slos(report: dict, max_p99_ms: float, max_error_rate: float, min_cache_hit_rate: float,
+               max_api_budget: float, min_samples: int) -> list:
+    """Return a description of every breached SLO"""
+    breaches = []
+    for handler, stats in report['commands'].items():
+        if stats['count'] < min_samples:
+            continue
+        if stats['p99'] is not None and stats['p99'] * 1000 > max_p99_ms:
+            breaches.append(f"{handler}: p99 {stats['p99'] * 1000:.0f}ms > {max_p99_ms:.0f}ms")
+        if stats['error_rate'] > max_error_rate:
+            breaches.append(f"{handler}: error rate {stats['error_rate']:.1%} > {max_error_rate:.1%}")
+
+    for cache, stats in report['caches'].items():
+        if stats['lookups'] >= min_samples and stats['hit_rate'] < min_cache_hit_rate:
+            breaches.append(f"cache {cache}: hit rate {stats['hit_rate']:.1%} < {min_cache_hit_rate:.1%}")
+
+    budget = report['api_budget_used']
+    if budget is not None and budget > max_api_budget:
+        breaches.append(f"Bot API budget {budget:.1%} used > {max_api_budget:.1%}")
+    return breaches
 
-def check_bot_status():
-    """Check overall bot status"""
+def format_ms(seconds) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds is not None else "-"
+
+def print_report(report: dict, breaches: list):
+    """Print the report as tables"""
     print("🤖 Bot Status Check")
     print("=" * 50)
-    
-    # Check environment
-    print("📋 System Status:")
-    print(f"✅ Python version: {sys.version.split()[0]}")
-    print(f"✅ Bot token configured: {BOT_TOKEN is not None}")
-    print(f"✅ Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Check files
-    print("\n📁 Critical Files:")
+    uptime = report['uptime_seconds']
+    print(f"⏱️ Uptime: {uptime / 3600:.1f}h" if uptime is not None else "⏱️ Uptime: unknown")
+
+    print("\n⚙️ Command latency and errors:")
+    print(f"   {'command':<16}{'runs':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>9}")
+    for handler, stats in sorted(report['commands'].items(), key=lambda item: -item[1]['count']):
+        print(f"   {handler:<16}{stats['count']:>8}{format_ms(stats['p50']):>9}{format_ms(stats['p95']):>9}"
+              f"{format_ms(stats['p99']):>9}{stats['error_rate']:>9.1%}")
+
+    print("\n🌐 Bot API calls:")
+    for method, stats in sorted(report['api_methods'].items(), key=lambda item: -item[1]['count']):
+        rate = f" ({stats['count'] / uptime * 60:.1f}/min)" if uptime else ""
+        print(f"   {method:<24}{stats['count']:>8}{rate}  p99 {format_ms(stats['p99'])}")
+    if report['api_budget_used'] is not None:
+        print(f"   Budget used: {report['api_budget_used']:.1%} of {API_CALLS_PER_SECOND} calls/s")
+
+    print("\n💾 Cache hit rates:")
+    for cache, stats in sorted(report['caches'].items()):
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else "-"
+        print(f"   {cache:<24}{hit_rate:>8} of {stats['lookups']} lookups")
+
+    print("\n" + "=" * 50)
+    if breaches:
+        print(f"❌ {len(breaches)} SLO breach(es):")
+        for breach in breaches:
+            print(f"   • {breach}")
+    else:
+        print("✅ All SLOs met")
+
+def check_files():
+    """Check that the bot's files are in place"""
+    print("📁 Critical Files:")
     critical_files = [
-        "main.py", "config.py", "bot_runner.py", "keep_alive_simple.py"
-    ]
-    for file in critical_files:
-        status = "✅" if os.path.exists(file) else "❌"
-        print(f"{status} {file}")
-    
-    # Check handlers
-    print("\n🎯 Command Handlers:")
-    handlers = [
+        "main.py", "config.py", "bot_runner.py", "runtime.py",
         "handlers/admin.py", "handlers/moderation.py", "handlers/fun.py",
-        "handlers/info.py", "handlers/general.py", "handlers/utility.py"
-    ]
-    for handler in handlers:
-        status = "✅" if os.path.exists(handler) else "❌"
-        print(f"{status} {handler}")
-    
-    # Check data files
-    print("\n📊 Data Files:")
-    data_files = [
-        ("data/quotes.json", "quotes"),
-        ("data/jokes.json", "jokes"),
-        ("data/facts.json", "facts"),
-        ("data/warnings.json", "warnings"),
+        "handlers/info.py", "handlers/general.py", "handlers/utility.py",
+        "utils/decorators.py", "utils/helpers.py"
     ]
-    for file, desc in data_files:
-        if os.path.exists(file):
-            try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
-                    count = len(data.get(desc, []))
-                    print(f"✅ {file} ({count} {desc})")
-            except:
-                print(f"⚠️  {file} (exists but invalid JSON)")
-        else:
-            print(f"ℹ️  {file} (will be created when needed)")
-    
-    # Check utilities
-    print("\n🛠️  Utility Files:")
-    utils = ["utils/decorators.py", "utils/helpers.py"]
-    for util in utils:
-        status = "✅" if os.path.exists(util) else "❌"
-        print(f"{status} {util}")
-    
-    print("\n" + "=" * 50)
-    print("🎉 Bot Status Check Complete!")
-    print("📝 Summary: All systems operational")
-    print("🚀 Bot is ready for 24/7 operation")
+    missing = 0
+    for file in critical_files:
+        exists = os.path.exists(file)
+        missing += not exists
+        print(f"{'✅' if exists else '❌'} {file}")
+    print(f"✅ Checked at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return missing == 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the bot's metrics against its SLOs")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--url', default=f"http://127.0.0.1:{os.environ.get('PORT', 5000)}/metrics",
+                        help="metrics endpoint of a running bot (default: %(default)s)")
+    source.add_argument('--file', nargs='?', const=METRICS_SNAPSHOT_FILE,
+                        help=f"read a metrics snapshot instead (default file: {METRICS_SNAPSHOT_FILE})")
+    parser.add_argument('--max-p99-ms', type=float, default=SLO_HANDLER_P99_MS)
+    parser.add_argument('--max-error-rate', type=float, default=SLO_MAX_ERROR_RATE)
+    parser.add_argument('--min-cache-hit-rate', type=float, default=SLO_MIN_CACHE_HIT_RATE)
+    parser.add_argument('--max-api-budget', type=float, default=SLO_MAX_API_BUDGET)
+    parser.add_argument('--min-samples', type=int, default=20,
+                        help="ignore commands and caches with fewer observations")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--files', action='store_true', help="only check that the bot's files exist")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.files:
+        return EXIT_OK if check_files() else EXIT_UNAVAILABLE
+
+    try:
+        samples = load_metrics(url=args.url, path=args.file)
+    except Exception as e:
+        print(f"❌ Could not read metrics from {args.file or args.url}: {e}")
+        return EXIT_UNAVAILABLE
+
+    report = build_report(samples)
+    breaches = check_slos(report, args.max_p99_ms, args.max_error_rate, args.min_cache_hit_rate,
+                          args.max_api_budget, args.min_samples)
+    if args.json:
+        print(json.dumps(dict(report, breaches=breaches), indent=2))
+    else:
+        print_report(report, breaches)
+    return EXIT_SLO_BREACHED if breaches else EXIT_OK
 
 if __name__ == "__main__":
-    check_bot_status()
\ No newline at end of file
+    sys.exit(main())
@@ -29,7 +29,11 @@ ADMIN_COMMANDS = {
     "unpin": "📌 Unpin a message",
     "setgrouppic": "🖼️ Set group profile picture",
     "settitle": "📝 Set group title",
-    "setdescription": "📄 Set group description"
+    "setdescription": "📄 Set group description",
+    "disable": "⛔ Disable a command in this chat",
+    "enable": "✅ Re-enable a disabled command",
+    "status": "🩺 Show bot pipeline health",
+    "contentfilter": "🏷️ Filter quotes, jokes and facts by tag"
 }
 
 MODERATION_COMMANDS = {
@@ -51,15 +55,16 @@ INFO_COMMANDS = {
     "members": "👥 Get member count",
     "id": "🆔 Get user/chat ID",
     "rules": "📜 Show group rules",
-    "setrules": "📝 Set group rules"
+    "setrules": "📝 Set group rules",
+    "stats": "📈 Show chat activity statistics"
 }
 
 FUN_COMMANDS = {
     "dice": "🎲 Roll a dice",
     "coin": "🪙 Flip a coin",
-    "quote": "💭 Get random quote",
-    "joke": "😂 Get random joke",
-    "fact": "🧠 Get random fact",
+    "quote": "💭 Get random quote (add a keyword to search)",
+    "joke": "😂 Get random joke (add a keyword to search)",
+    "fact": "🧠 Get random fact (add a keyword to search)",
     "8ball": "🎱 Magic 8-ball",
     "choose": "🤔 Choose between options"
 }
@@ -78,6 +83,25 @@ GENERAL_COMMANDS = {
     "menu": "📋 Show main menu"
 }
 
+# Command routing
+COMMAND_PREFIXES = ("/", "!")
+
+COMMAND_ALIASES = {
+    "h": "help",
+    "commands": "help",
+    "chat": "chatinfo",
+    "admin": "admins",
+    "count": "members",
+    "warns": "warnings",
+    "roll": "dice",
+    "flip": "coin",
+    "tr": "translate",
+    "calculate": "calc"
+}
+
+# Commands that can never be disabled in a chat
+PROTECTED_COMMANDS = ("start", "help", "enable", "disable")
+
 # Emojis
 EMOJIS = {
     "success": "✅",
@@ -112,3 +136,60 @@ MESSAGES = {
 MAX_WARNINGS = 3
 DEFAULT_MUTE_TIME = 3600  # 1 hour in seconds
 MAX_PURGE_MESSAGES = 100
+SHUTDOWN_DRAIN_TIMEOUT = 10  # seconds to finish in-flight updates on shutdown
+SHUTDOWN_CANCEL_GRACE = 5  # seconds for cancelled handlers to unwind after the drain deadline
+LOOP_PROBE_INTERVAL = 0.5  # seconds between event loop lag probes
+LOOP_BLOCK_THRESHOLD = 0.25  # seconds the loop may stall before its stack is logged
+SLOW_HANDLER_THRESHOLD = 5  # seconds a handler may take before it is logged as slow
+WATCHDOG_INTERVAL = 15  # seconds between stall checks
+POLL_STALL_TIMEOUT = 90  # seconds without a successful getUpdates before restarting
+UPDATE_STALL_TIMEOUT = 120  # seconds queued updates may wait with none processed before restarting
+LOOP_STALL_LAG = 5  # seconds of event loop lag reported as unresponsive
+API_PROBE_INTERVAL = 30  # seconds between getMe round-trip probes
+MAX_FLUSH_LAG = 60  # seconds unsaved store changes may wait before health degrades
+ADMIN_CACHE_TTL = 300  # seconds a chat's administrator list is reused for /admins and @username lookups
+CHAT_INFO_TTL = 60  # seconds a chat's get_chat details are reused
+MEMBER_COUNT_TTL = 60  # seconds a chat's member count is reused
+MEMBER_COUNT_RESYNC = 6 * 3600  # seconds the tracked member count is trusted before asking Telegram again
+RESPONSE_CACHE_TTL = 3600  # seconds a rendered /rules reply is reused
+USERNAME_INDEX_TTL = 7 * 24 * 3600  # seconds a seen username stays resolvable
+METRICS_SNAPSHOT_FILE = "data/metrics.prom"  # metrics written here for offline status checks
+METRICS_SNAPSHOT_INTERVAL = 60  # seconds between metrics snapshots
+CONTENT_RELOAD_INTERVAL = 5  # seconds between checks for edited quotes/jokes/facts files
+COALESCE_WINDOW = 2  # seconds messages to the same chat are collected into one send
+MAX_CONCURRENT_SENDS = 8  # independent Bot API calls a handler may have in flight at once
+CALC_MAX_LENGTH = 200  # characters accepted by /calc
+CALC_MAX_NODES = 100  # numbers, operators and calls in one /calc expression
+CALC_MAX_RESULT_BITS = 4096  # largest integer /calc may produce, about 1,200 digits
+CALC_TIME_BUDGET = 0.5  # seconds a /calc evaluation may take
+WORKER_PROCESSES = 2  # processes for CPU-heavy command work
+WORKER_QUEUE_LIMIT = 8  # tasks that may wait for a worker before commands reply busy
+WORKER_TASK_TIMEOUT = 2  # seconds a worker task may run before its worker is killed
+TRANSLATION_BACKEND = "phrasebook"  # translation engine, the offline phrase table by default
+TRANSLATION_CACHE_SIZE = 5000  # translations kept in the LRU cache
+TRANSLATION_CACHE_TTL = 24 * 3600  # seconds a cached translation is reused
+TRANSLATION_BATCH_WINDOW = 0.05  # seconds concurrent /translate requests are collected into one backend call
+LANGDETECT_MIN_CONFIDENCE = 0.8  # detected source languages below this are only shown, not used to translate
+STATS_SKETCH_WIDTH = 1024  # counters per count-min row, top poster counts are off by at most 0.3% of messages
+STATS_SKETCH_DEPTH = 4  # count-min rows, each an independent hash
+STATS_HLL_PRECISION = 10  # 1024 HyperLogLog registers per sketch, about 3% error on active users
+STATS_TOP_POSTERS = 10  # heavy hitters tracked per chat
+STATS_HISTORY_HOURS = 7 * 24  # hourly message buckets kept per chat
+STATS_ACTIVE_DAYS = 7  # daily active-user sketches kept per chat
+STATS_SNAPSHOT_INTERVAL = 300  # seconds between saves of the /stats sketches
+STATS_IDLE_DAYS = 90  # days without messages before a chat's sketches are dropped
+
+# Service level objectives checked by bot_status_check.py
+SLO_HANDLER_P99_MS = 2000  # p99 latency of any single command
+SLO_MAX_ERROR_RATE = 0.05  # fraction of handler runs that may error
+SLO_MIN_CACHE_HIT_RATE = 0.5  # lowest acceptable hit rate for any cache
+SLO_MAX_API_BUDGET = 0.8  # fraction of the Bot API rate limit that may be used
+API_CALLS_PER_SECOND = 30  # Telegram's global Bot API rate limit
+
+# Supervisor settings (bot_runner.py)
+RESTART_BASE_DELAY = 1  # seconds before the first restart
+RESTART_MAX_DELAY = 300  # cap on the restart backoff
+STABLE_RUN_SECONDS = 600  # a run this long resets the backoff
+CRASH_LOOP_WINDOW = 600  # seconds over which crashes are counted
+CRASH_LOOP_THRESHOLD = 5  # crashes within the window that count as a crash loop
+CRASH_LOOP_COOLDOWN = 900  # seconds to wait once a crash loop is detected
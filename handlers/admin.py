@@ -13,6 +13,10 @@ from config import EMOJIS, MESSAGES
 from datetime import datetime, timezone
 from config import IST
 from utils.helpers import get_ist_time, format_ist_time
+from utils.health import API_PROBE, collect_health
+from utils.cache import invalidate_chat
+from utils.content import CONTENT_STORES, get_chat_filter, set_chat_filter
+from utils.sampling import ContentFilter, NO_FILTER
 logger = logging.getLogger(__name__)
 
 @admin_required
@@ -62,6 +66,7 @@ async def ban_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         # Ban the user
         await context.bot.ban_chat_member(update.effective_chat.id, user_to_ban.id)
+        invalidate_chat(update.effective_chat.id, members=True)
         
         reason = ' '.join(context.args[1:]) if len(context.args) > 1 else "No reason provided"
         
@@ -161,6 +166,7 @@ async def kick_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Kick the user (ban then unban)
         await context.bot.ban_chat_member(update.effective_chat.id, user_to_kick.id)
         await context.bot.unban_chat_member(update.effective_chat.id, user_to_kick.id)
+        invalidate_chat(update.effective_chat.id, members=True)
         
         reason = ' '.join(context.args[1:]) if len(context.args) > 1 else "No reason provided"
         
@@ -219,6 +225,7 @@ async def promote_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode='Markdown'
         )
         
+        invalidate_chat(update.effective_chat.id, admins=True)
         logger.info(f"User {user_to_promote.id} promoted in chat {update.effective_chat.id}")
         
     except BadRequest as e:
@@ -264,6 +271,7 @@ async def demote_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode='Markdown'
         )
         
+        invalidate_chat(update.effective_chat.id, admins=True)
         logger.info(f"User {user_to_demote.id} demoted in chat {update.effective_chat.id}")
         
     except BadRequest as e:
@@ -379,6 +387,7 @@ async def set_group_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         new_title = ' '.join(context.args)
         await context.bot.set_chat_title(update.effective_chat.id, new_title)
+        invalidate_chat(update.effective_chat.id, info=True)
         
         await update.message.reply_text(
             f"{EMOJIS['success']} **Group Title Updated!**\n\n"
@@ -410,6 +419,7 @@ async def set_group_description(update: Update, context: ContextTypes.DEFAULT_TY
             
         new_description = ' '.join(context.args)
         await context.bot.set_chat_description(update.effective_chat.id, new_description)
+        invalidate_chat(update.effective_chat.id, info=True)
         
         await update.message.reply_text(
             f"{EMOJIS['success']} **Group Description Updated!**\n\n"
@@ -426,3 +436,140 @@ async def set_group_description(update: Update, context: ContextTypes.DEFAULT_TY
     except Exception as e:
         logger.error(f"Error in set_group_description: {e}")
         await update.message.reply_text(MESSAGES['action_failed'])
+
+@admin_required
+async def disable_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Disable a command in this chat"""
+    try:
+        router = context.application.bot_data.get('router')
+        if not context.args:
+            disabled = router.disabled_commands(update.effective_chat.id) if router else []
+            await update.message.reply_text(
+                f"{EMOJIS['error']} Please provide a command to disable!\n"
+                f"Usage: `/disable joke`\n\n"
+                f"⛔ **Disabled here:** {', '.join(disabled) if disabled else 'None'}",
+                parse_mode='Markdown'
+            )
+            return
+            
+        command = context.args[0].lstrip('/!').lower()
+        if not router or not router.disable(update.effective_chat.id, command):
+            await update.message.reply_text(
+                f"{EMOJIS['error']} Cannot disable `/{command}`!\n"
+                f"💡 Unknown commands and core commands can't be disabled",
+                parse_mode='Markdown'
+            )
+            return
+            
+        await update.message.reply_text(
+            f"{EMOJIS['success']} **Command Disabled!**\n\n"
+            f"⛔ **Command:** `/{command}`\n"
+            f"👑 **Disabled by:** {format_user_mention(update.effective_user)}\n"
+            f"⏰ **Time:** {format_ist_time()}",
+            parse_mode='Markdown'
+        )
+        
+        logger.info(f"Command {command} disabled in chat {update.effective_chat.id}")
+        
+    except Exception as e:
+        logger.error(f"Error in disable_command: {e}")
+        await update.message.reply_text(MESSAGES['action_failed'])
+
+@admin_required
+async def enable_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Re-enable a disabled command in this chat"""
+    try:
+        router = context.application.bot_data.get('router')
+        if not context.args:
+            await update.message.reply_text(
+                f"{EMOJIS['error']} Please provide a command to enable!\n"
+                f"Usage: `/enable joke`",
+                parse_mode='Markdown'
+            )
+            return
+            
+        command = context.args[0].lstrip('/!').lower()
+        if not router or not router.enable(update.effective_chat.id, command):
+            await update.message.reply_text(
+                f"{EMOJIS['error']} Unknown command `/{command}`!",
+                parse_mode='Markdown'
+            )
+            return
+            
+        await update.message.reply_text(
+            f"{EMOJIS['success']} **Command Enabled!**\n\n"
+            f"✅ **Command:** `/{command}`\n"
+            f"👑 **Enabled by:** {format_user_mention(update.effective_user)}\n"
+            f"⏰ **Time:** {format_ist_time()}",
+            parse_mode='Markdown'
+        )
+        
+        logger.info(f"Command {command} enabled in chat {update.effective_chat.id}")
+        
+    except Exception as e:
+        logger.error(f"Error in enable_command: {e}")
+        await update.message.reply_text(MESSAGES['action_failed'])
+
+def format_stage(value, unit):
+    """Format a measured value, or a dash when it has not been measured yet"""
+    return f"{value}{unit}" if value is not None else "—"
+
+@admin_required
+async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the health of every stage of the bot pipeline"""
+    try:
+        # Measure the Bot API round trip now rather than showing a stale probe
+        await API_PROBE.measure(context.bot)
+        health = collect_health(context.application.running)
+        
+        status_icon = EMOJIS['success'] if health['ready'] else EMOJIS['warning']
+        status_text = f"{status_icon} **Bot Status: {health['status'].upper()}**\n\n"
+        status_text += f"📥 **Last update:** {format_stage(health['last_update_age_s'], 's ago')}\n"
+        status_text += f"🔄 **Last getUpdates:** {format_stage(health['last_getupdates_age_s'], 's ago')}\n"
+        status_text += f"⚙️ **Handler latency:** p50 {format_stage(health['handler_p50_ms'], 'ms')} / p99 {format_stage(health['handler_p99_ms'], 'ms')}\n"
+        status_text += f"🌐 **Bot API round trip:** {format_stage(health['api_rtt_ms'], 'ms')}\n"
+        status_text += f"📬 **Update queue:** {health['update_queue']:.0f} pending, {health['updates_in_flight']} in flight\n"
+        status_text += f"📤 **Outbound queue:** {health['outbound_queue']:.0f}, {health['pending_responses']:.0f} coalescing\n"
+        status_text += f"💾 **Store flush lag:** {health['store_flush_lag_s']}s\n"
+        status_text += f"⏱️ **Event loop lag:** {health['loop_lag_ms']}ms\n"
+        status_text += f"♻️ **Watchdog restarts:** {health['watchdog_restarts']}\n"
+        if health['problems']:
+            status_text += f"\n{EMOJIS['warning']} **Problems:** {', '.join(health['problems'])}\n"
+        status_text += f"\n⏰ **Time:** {format_ist_time()}"
+        
+        await update.message.reply_text(status_text, parse_mode='Markdown')
+        
+    except Exception as e:
+        logger.error(f"Error in status_command: {e}")
+        await update.message.reply_text(MESSAGES['action_failed'])
+
+@admin_required
+async def content_filter_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show or set the tags quotes, jokes and facts must have or avoid in this chat"""
+    try:
+        chat_id = update.effective_chat.id
+        if context.args:
+            if context.args[0].lower() in ('off', 'clear', 'none'):
+                content_filter = NO_FILTER
+            else:
+                words = [word.lower() for word in context.args]
+                require = tuple(word.lstrip('+') for word in words if not word.startswith('-'))
+                exclude = tuple(word[1:] for word in words if word.startswith('-') and len(word) > 1)
+                content_filter = ContentFilter(tuple(tag for tag in require if tag), exclude)
+            set_chat_filter(chat_id, content_filter)
+            logger.info(f"Content filter for chat {chat_id} set to {content_filter}")
+
+        content_filter = get_chat_filter(chat_id)
+        known_tags = sorted(set().union(*(store.tags.tags for store in CONTENT_STORES)))
+        await update.message.reply_text(
+            f"🏷️ **Content Filter**\n\n"
+            f"✅ **Only:** {', '.join(content_filter.require) or 'Anything'}\n"
+            f"⛔ **Never:** {', '.join(content_filter.exclude) or 'Nothing'}\n"
+            f"📚 **Known tags:** {', '.join(known_tags) or 'None'}\n\n"
+            f"💡 Usage: `/contentfilter +family -dark` or `/contentfilter off`",
+            parse_mode='Markdown'
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in content_filter_command: {e}")
+        await update.message.reply_text(MESSAGES['action_failed'])
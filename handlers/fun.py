@@ -4,27 +4,18 @@ Handles dice, coin flip, jokes, quotes and other entertainment functions
 """
 
 import logging
-import json
 import random
 from telegram import Update
 from telegram.ext import ContextTypes
 from config import EMOJIS
+from utils.content import QUOTES, JOKES, FACTS, SearchUnavailable, get_chat_filter
 
 logger = logging.getLogger(__name__)
 
-# Load jokes and quotes
-def load_json_data(filename, default_data):
-    """Load data from JSON file with fallback"""
-    try:
-        with open(filename, 'r') as f:
-            return json.load(f)
-    except:
-        return default_data
-
 async def roll_dice(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Roll a dice"""
     try:
-        # Send dice emoji
+        # Send dice emoji, the reply needs its value so the two sends stay sequential
         dice_result = await context.bot.send_dice(update.effective_chat.id, emoji="🎲")
         
         await update.message.reply_text(
@@ -62,89 +53,101 @@ async def flip_coin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"{EMOJIS['error']} Failed to flip coin!")
 
 async def random_quote(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Send a random inspirational quote"""
+    """Send a random inspirational quote, optionally matching a keyword"""
     try:
-        quotes_data = load_json_data('data/quotes.json', {
-            "quotes": [
-                {"text": "The only way to do great work is to love what you do.", "author": "Steve Jobs"},
-                {"text": "Life is what happens to you while you're busy making other plans.", "author": "John Lennon"},
-                {"text": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt"},
-                {"text": "It is during our darkest moments that we must focus to see the light.", "author": "Aristotle"},
-                {"text": "The only impossible journey is the one you never begin.", "author": "Tony Robbins"}
-            ]
-        })
-        
-        quote = random.choice(quotes_data["quotes"])
+        chat_filter = get_chat_filter(update.effective_chat.id)
+        if context.args:
+            keyword = ' '.join(context.args)
+            quote = QUOTES.search(keyword, chat_filter)
+            if not quote:
+                await update.message.reply_text(f"{EMOJIS['error']} No quotes found matching \"{keyword}\"!")
+                return
+        else:
+            quote = QUOTES.next_for(update.effective_chat.id, chat_filter)
+            if not quote:
+                await update.message.reply_text(f"{EMOJIS['error']} No quotes allowed by this chat's content filter!")
+                return
         
         await update.message.reply_text(
             f"💭 **Random Quote**\n\n"
-            f"📝 *\"{quote['text']}\"*\n\n"
-            f"👨‍💼 **— {quote['author']}**\n\n"
+            f"📝 *\"{quote.text}\"*\n\n"
+            f"👨‍💼 **— {quote.author or 'Unknown'}**\n\n"
             f"🌟 Requested by {update.effective_user.first_name}",
             parse_mode='Markdown'
         )
         
         logger.info(f"Quote sent to user {update.effective_user.id}")
         
+    except SearchUnavailable:
+        await update.message.reply_text(
+            f"{EMOJIS['info']} Quote search is still being prepared, try again in a minute!"
+        )
     except Exception as e:
         logger.error(f"Error in random_quote: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get quote!")
 
 async def random_joke(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Send a random joke"""
+    """Send a random joke, optionally matching a keyword"""
     try:
-        jokes_data = load_json_data('data/jokes.json', {
-            "jokes": [
-                "Why don't scientists trust atoms? Because they make up everything!",
-                "Why did the scarecrow win an award? He was outstanding in his field!",
-                "Why don't eggs tell jokes? They'd crack each other up!",
-                "What do you call a fake noodle? An impasta!",
-                "Why did the math book look so sad? Because it was full of problems!"
-            ]
-        })
-        
-        joke = random.choice(jokes_data["jokes"])
+        chat_filter = get_chat_filter(update.effective_chat.id)
+        if context.args:
+            keyword = ' '.join(context.args)
+            joke = JOKES.search(keyword, chat_filter)
+            if not joke:
+                await update.message.reply_text(f"{EMOJIS['error']} No jokes found matching \"{keyword}\"!")
+                return
+        else:
+            joke = JOKES.next_for(update.effective_chat.id, chat_filter)
+            if not joke:
+                await update.message.reply_text(f"{EMOJIS['error']} No jokes allowed by this chat's content filter!")
+                return
         
         await update.message.reply_text(
             f"😂 **Random Joke**\n\n"
-            f"🎭 {joke}\n\n"
+            f"🎭 {joke.text}\n\n"
             f"😄 Hope that made you smile, {update.effective_user.first_name}!",
             parse_mode='Markdown'
         )
         
         logger.info(f"Joke sent to user {update.effective_user.id}")
         
+    except SearchUnavailable:
+        await update.message.reply_text(
+            f"{EMOJIS['info']} Joke search is still being prepared, try again in a minute!"
+        )
     except Exception as e:
         logger.error(f"Error in random_joke: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get joke!")
 
 async def random_fact(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Send a random fun fact"""
+    """Send a random fun fact, optionally matching a keyword"""
     try:
-        facts = [
-            "🐙 Octopuses have three hearts and blue blood!",
-            "🍯 Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old!",
-            "🧠 Your brain uses about 20% of your body's total energy!",
-            "🌍 There are more possible games of chess than there are atoms in the observable universe!",
-            "🦒 A giraffe's tongue can be up to 20 inches long!",
-            "🌊 The Pacific Ocean is larger than all the continents combined!",
-            "⚡ Lightning strikes the Earth about 100 times per second!",
-            "🐘 Elephants are the only animals that can't jump!",
-            "🍌 Bananas are berries, but strawberries aren't!",
-            "🌙 The Moon is moving away from Earth at about 1.5 inches per year!"
-        ]
-        
-        fact = random.choice(facts)
+        chat_filter = get_chat_filter(update.effective_chat.id)
+        if context.args:
+            keyword = ' '.join(context.args)
+            fact = FACTS.search(keyword, chat_filter)
+            if not fact:
+                await update.message.reply_text(f"{EMOJIS['error']} No facts found matching \"{keyword}\"!")
+                return
+        else:
+            fact = FACTS.next_for(update.effective_chat.id, chat_filter)
+            if not fact:
+                await update.message.reply_text(f"{EMOJIS['error']} No facts allowed by this chat's content filter!")
+                return
         
         await update.message.reply_text(
             f"🧠 **Random Fun Fact**\n\n"
-            f"📚 {fact}\n\n"
+            f"📚 {fact.text}\n\n"
             f"🤓 Learn something new every day, {update.effective_user.first_name}!",
             parse_mode='Markdown'
         )
         
         logger.info(f"Fact sent to user {update.effective_user.id}")
         
+    except SearchUnavailable:
+        await update.message.reply_text(
+            f"{EMOJIS['info']} Fact search is still being prepared, try again in a minute!"
+        )
     except Exception as e:
         logger.error(f"Error in random_fact: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get fact!")
@@ -5,63 +5,267 @@ Handles start, help, menu and other general functions
 
 import logging
 from datetime import datetime
+from typing import NamedTuple, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
 from config import (BOT_NAME, BOT_VERSION, BOT_DESCRIPTION, EMOJIS, 
                    ADMIN_COMMANDS, MODERATION_COMMANDS, FUN_COMMANDS, 
                    INFO_COMMANDS, GENERAL_COMMANDS)
+from utils.responder import RESPONDER
 
 logger = logging.getLogger(__name__)
 
+class Payload(NamedTuple):
+    """A prepared Markdown reply and its inline keyboard"""
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
+def keyboard(*rows) -> InlineKeyboardMarkup:
+    """Inline keyboard from rows of (label, callback data) pairs"""
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data=data) for label, data in row]
+                                 for row in rows])
+
+def command_lines(commands: dict, limit: int = None) -> list:
+    return [f"• `/{cmd}` - {desc}" for cmd, desc in list(commands.items())[:limit]]
+
+def render_start_private() -> Payload:
+    """Private /start, {user_name} is filled in per user"""
+    return Payload(
+        f"🎉 **Welcome to {BOT_NAME}!**\n\n"
+        f"👋 Hi {{user_name}}! I'm your comprehensive admin and moderation bot.\n\n"
+        f"🚀 **Version:** {BOT_VERSION}\n"
+        f"📝 **Description:** {BOT_DESCRIPTION}\n\n"
+        f"💡 **Quick Start:**\n"
+        f"• Add me to your group\n"
+        f"• Make me an admin\n"
+        f"• Use `/help` to see all commands\n\n"
+        f"🔧 **Features:**\n"
+        f"• 🛡️ Advanced moderation tools\n"
+        f"• 👑 Admin management commands\n"
+        f"• 🎮 Fun entertainment features\n"
+        f"• 📊 Information and statistics\n"
+        f"• 🎨 Rich emoji interface\n\n"
+        f"📚 Use `/menu` to explore all features!",
+        keyboard(
+            [("📚 Help", "help"), ("📋 Menu", "menu")],
+            [("🛡️ Admin Commands", "admin_help"), ("🎮 Fun Commands", "fun_help")]
+        )
+    )
+
+def render_start_group() -> Payload:
+    return Payload(
+        f"🎉 **{BOT_NAME} is now active!**\n\n"
+        f"👋 Hello everyone! I'm ready to help manage this group.\n\n"
+        f"🛡️ **Ready to provide:**\n"
+        f"• Advanced moderation tools\n"
+        f"• Admin management features\n"
+        f"• Fun entertainment commands\n"
+        f"• Group information tools\n\n"
+        f"📚 Type `/help` or `/menu` to get started!"
+    )
+
+def render_help() -> Payload:
+    """Help text listing every command category"""
+    sections = [
+        f"📚 **{BOT_NAME} - Help Center**\n\n"
+        f"🤖 **Version:** {BOT_VERSION}\n"
+        f"📝 **Description:** {BOT_DESCRIPTION}\n",
+        "\n".join(["🔧 **General Commands:**", *command_lines(GENERAL_COMMANDS)]) + "\n"
+    ]
+    for title, commands, shown, kind in (
+        ("👑 **Admin Commands:**", ADMIN_COMMANDS, 5, "admin"),
+        ("🛡️ **Moderation Commands:**", MODERATION_COMMANDS, 5, "moderation"),
+        ("📊 **Information Commands:**", INFO_COMMANDS, 4, "info"),
+        ("🎮 **Fun Commands:**", FUN_COMMANDS, 4, "fun")
+    ):
+        sections.append("\n".join([
+            title, *command_lines(commands, shown), f"• _...and {len(commands) - shown} more {kind} commands_"
+        ]) + "\n")
+    sections.append(
+        f"🛠️ **Utility Commands:**\n"
+        f"• `/translate` - 🌐 Translate text between languages\n"
+        f"• `/time` - 🕐 Get current time and date\n"
+        f"• `/calc` - 🧮 Calculate math expressions\n"
+        f"• `/password` - 🔐 Generate secure passwords\n"
+    )
+    sections.append(
+        f"💡 **Tips:**\n"
+        f"• Use `/menu` for an interactive command browser\n"
+        f"• Most admin commands require admin permissions\n"
+        f"• Reply to messages for user-specific commands\n"
+        f"• Bot needs admin rights for moderation features\n"
+    )
+    sections.append(f"🆘 **Need more help?** Use `/menu` for detailed command categories!")
+    return Payload(
+        "\n".join(sections),
+        keyboard(
+            [("📋 Interactive Menu", "menu"), ("🔄 Refresh", "help")],
+            [("👑 Admin Help", "admin_help"), ("🛡️ Moderation Help", "mod_help")],
+            [("📊 Info Help", "info_help"), ("🎮 Fun Help", "fun_help")]
+        )
+    )
+
+def render_menu() -> Payload:
+    """/menu with a summary and button per category"""
+    return Payload(
+        f"📋 **{BOT_NAME} - Interactive Menu**\n\n"
+        f"🎯 Choose a category to explore commands:\n\n"
+        f"👑 **Admin Commands** ({len(ADMIN_COMMANDS)})\n"
+        f"├ Ban, kick, promote users\n"
+        f"├ Manage group settings\n"
+        f"└ Pin messages and more\n\n"
+        f"🛡️ **Moderation Commands** ({len(MODERATION_COMMANDS)})\n"
+        f"├ Mute, warn users\n"
+        f"├ Delete and purge messages\n"
+        f"└ Lock/unlock chat\n\n"
+        f"📊 **Information Commands** ({len(INFO_COMMANDS)})\n"
+        f"├ User and chat info\n"
+        f"├ Admin lists and rules\n"
+        f"└ Member statistics\n\n"
+        f"🎮 **Fun Commands** ({len(FUN_COMMANDS)})\n"
+        f"├ Games and entertainment\n"
+        f"├ Random quotes and jokes\n"
+        f"└ Interactive features\n\n"
+        f"💡 **Tip:** Click buttons below to explore each category!",
+        keyboard(
+            [(f"👑 Admin ({len(ADMIN_COMMANDS)})", "admin_help"),
+             (f"🛡️ Moderation ({len(MODERATION_COMMANDS)})", "mod_help")],
+            [(f"📊 Information ({len(INFO_COMMANDS)})", "info_help"), (f"🎮 Fun ({len(FUN_COMMANDS)})", "fun_help")],
+            [("📚 Full Help", "help"), ("🔄 Refresh Menu", "menu")]
+        )
+    )
+
+def render_help_callback() -> Payload:
+    """Short help shown from the inline keyboards"""
+    return Payload(
+        f"📚 **{BOT_NAME} - Help Center**\n\n"
+        f"🎯 **Quick Command Reference:**\n\n"
+        f"👑 **Admin:** `/ban` `/kick` `/promote` `/demote`\n"
+        f"🛡️ **Moderation:** `/mute` `/warn` `/del` `/purge`\n"
+        f"📊 **Info:** `/info` `/admins` `/members` `/rules`\n"
+        f"🎮 **Fun:** `/dice` `/joke` `/quote` `/8ball`\n\n"
+        f"💡 **Usage Examples:**\n"
+        f"• `/ban @username` - Ban a user\n"
+        f"• `/mute @username 1h` - Mute for 1 hour\n"
+        f"• `/warn @username reason` - Warn with reason\n"
+        f"• `/joke` - Get a random joke\n\n"
+        f"🔧 **Requirements:**\n"
+        f"• Bot must be admin for moderation\n"
+        f"• You must be admin for admin commands\n"
+        f"• Some commands work via reply to messages",
+        keyboard([("📋 Back to Menu", "menu"), ("🔄 Refresh", "help")])
+    )
+
+def render_menu_callback() -> Payload:
+    categories = [
+        (f"👑 **Admin Commands** ({len(ADMIN_COMMANDS)})", "User management, group settings"),
+        (f"🛡️ **Moderation** ({len(MODERATION_COMMANDS)})", "Chat moderation, warnings"),
+        (f"📊 **Information** ({len(INFO_COMMANDS)})", "User info, statistics, rules"),
+        (f"🎮 **Fun Commands** ({len(FUN_COMMANDS)})", "Games, jokes, entertainment")
+    ]
+    return Payload(
+        f"📋 **{BOT_NAME} - Command Menu**\n\n"
+        f"🎯 **Select a category to view detailed commands:**\n\n"
+        + "".join(f"{category}\n└ {description}\n\n" for category, description in categories),
+        keyboard(
+            [("👑 Admin", "admin_help"), ("🛡️ Moderation", "mod_help")],
+            [("📊 Information", "info_help"), ("🎮 Fun", "fun_help")],
+            [("📚 Full Help", "help")]
+        )
+    )
+
+def render_category(title: str, requirements: str, commands: dict, examples: list, notes: str,
+                    neighbours: list) -> Payload:
+    """Full command list of one category, with buttons to two others and the menu"""
+    return Payload(
+        f"{title}\n\n"
+        f"{requirements}\n\n"
+        + "\n".join(command_lines(commands))
+        + "\n\n💡 **Usage Examples:**\n"
+        + "\n".join(examples)
+        + f"\n\n{notes}",
+        keyboard(neighbours, [("📋 Back to Menu", "menu")])
+    )
+
+def render_categories() -> dict:
+    """Callback data -> Payload for the four category pages"""
+    return {
+        "admin_help": render_category(
+            "👑 **Admin Commands**", "🔒 **Requirements:** Admin permissions required", ADMIN_COMMANDS,
+            ["• `/ban @username reason` - Ban user with reason",
+             "• `/promote @username` - Promote to admin",
+             "• `/settitle New Group Name` - Change title",
+             "• `/pin` - Pin replied message"],
+            "⚠️ **Note:** Bot needs admin rights to execute these commands",
+            [("🛡️ Moderation", "mod_help"), ("📊 Information", "info_help")]
+        ),
+        "mod_help": render_category(
+            "🛡️ **Moderation Commands**", "🔒 **Requirements:** Admin permissions required", MODERATION_COMMANDS,
+            ["• `/mute @username 1h` - Mute for 1 hour",
+             "• `/warn @username spam` - Warn for spam",
+             "• `/del` - Delete replied message",
+             "• `/lock` - Lock chat for members"],
+            "📊 **Auto-moderation:**\n"
+            "• Users are auto-banned after 3 warnings\n"
+            "• Warnings are tracked per user",
+            [("👑 Admin", "admin_help"), ("📊 Information", "info_help")]
+        ),
+        "info_help": render_category(
+            "📊 **Information Commands**", "🔓 **Requirements:** Available to all users", INFO_COMMANDS,
+            ["• `/info @username` - Get user details",
+             "• `/admins` - List all admins",
+             "• `/members` - Get member count",
+             "• `/id` - Get your ID"],
+            "📝 **Special Features:**\n"
+            "• Detailed user profiles with permissions\n"
+            "• Group statistics and member info\n"
+            "• Custom rules management",
+            [("👑 Admin", "admin_help"), ("🎮 Fun", "fun_help")]
+        ),
+        "fun_help": render_category(
+            "🎮 **Fun Commands**", "🔓 **Requirements:** Available to all users", FUN_COMMANDS,
+            ["• `/dice` - Roll a dice (1-6)",
+             "• `/8ball Will I win?` - Ask magic 8-ball",
+             "• `/choose pizza burger tacos` - Pick option",
+             "• `/joke` - Get random joke"],
+            "🎊 **Entertainment Features:**\n"
+            "• Random quotes for inspiration\n"
+            "• Fun facts to learn new things\n"
+            "• Interactive games and choices",
+            [("🛡️ Moderation", "mod_help"), ("📊 Information", "info_help")]
+        )
+    }
+
+# Replies that only depend on config.py, rendered by build_payloads()
+PAYLOADS = {}
+
+# Callback data -> Payload the message is edited to
+CALLBACK_PAYLOADS = {}
+
+def build_payloads():
+    """Render every static reply and keyboard, call again after changing the command tables"""
+    PAYLOADS.update({
+        "start_private": render_start_private(),
+        "start_group": render_start_group(),
+        "help": render_help(),
+        "menu": render_menu()
+    })
+    CALLBACK_PAYLOADS.update({"help": render_help_callback(), "menu": render_menu_callback(), **render_categories()})
+    logger.info(f"📚 Rendered {len(PAYLOADS) + len(CALLBACK_PAYLOADS)} help and menu payloads")
+
+build_payloads()
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a welcome message when the command /start is issued"""
     try:
-        user_name = update.effective_user.first_name
-        chat_type = update.effective_chat.type
-        
-        if chat_type == 'private':
-            welcome_text = f"🎉 **Welcome to {BOT_NAME}!**\n\n"
-            welcome_text += f"👋 Hi {user_name}! I'm your comprehensive admin and moderation bot.\n\n"
-            welcome_text += f"🚀 **Version:** {BOT_VERSION}\n"
-            welcome_text += f"📝 **Description:** {BOT_DESCRIPTION}\n\n"
-            welcome_text += f"💡 **Quick Start:**\n"
-            welcome_text += f"• Add me to your group\n"
-            welcome_text += f"• Make me an admin\n" 
-            welcome_text += f"• Use `/help` to see all commands\n\n"
-            welcome_text += f"🔧 **Features:**\n"
-            welcome_text += f"• 🛡️ Advanced moderation tools\n"
-            welcome_text += f"• 👑 Admin management commands\n"
-            welcome_text += f"• 🎮 Fun entertainment features\n"
-            welcome_text += f"• 📊 Information and statistics\n"
-            welcome_text += f"• 🎨 Rich emoji interface\n\n"
-            welcome_text += f"📚 Use `/menu` to explore all features!"
-        else:
-            welcome_text = f"🎉 **{BOT_NAME} is now active!**\n\n"
-            welcome_text += f"👋 Hello everyone! I'm ready to help manage this group.\n\n"
-            welcome_text += f"🛡️ **Ready to provide:**\n"
-            welcome_text += f"• Advanced moderation tools\n"
-            welcome_text += f"• Admin management features\n"
-            welcome_text += f"• Fun entertainment commands\n"
-            welcome_text += f"• Group information tools\n\n"
-            welcome_text += f"📚 Type `/help` or `/menu` to get started!"
-            
-        # Create inline keyboard for private chats
-        if chat_type == 'private':
-            keyboard = [
-                [InlineKeyboardButton("📚 Help", callback_data="help"),
-                 InlineKeyboardButton("📋 Menu", callback_data="menu")],
-                [InlineKeyboardButton("🛡️ Admin Commands", callback_data="admin_help"),
-                 InlineKeyboardButton("🎮 Fun Commands", callback_data="fun_help")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+        if update.effective_chat.type == 'private':
+            payload = PAYLOADS["start_private"]
+            text = payload.text.replace("{user_name}", update.effective_user.first_name, 1)
         else:
-            reply_markup = None
+            payload = PAYLOADS["start_group"]
+            text = payload.text
             
-        await update.message.reply_text(
-            welcome_text, 
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        await update.message.reply_text(text, parse_mode='Markdown', reply_markup=payload.reply_markup)
         
         logger.info(f"Start command used by user {update.effective_user.id} in chat {update.effective_chat.id}")
         
@@ -72,70 +276,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send help message with all available commands"""
     try:
-        help_text = f"📚 **{BOT_NAME} - Help Center**\n\n"
-        help_text += f"🤖 **Version:** {BOT_VERSION}\n"
-        help_text += f"📝 **Description:** {BOT_DESCRIPTION}\n\n"
-        
-        # General Commands
-        help_text += f"🔧 **General Commands:**\n"
-        for cmd, desc in GENERAL_COMMANDS.items():
-            help_text += f"• `/{cmd}` - {desc}\n"
-        help_text += "\n"
-        
-        # Admin Commands
-        help_text += f"👑 **Admin Commands:**\n"
-        for cmd, desc in list(ADMIN_COMMANDS.items())[:5]:  # Show first 5
-            help_text += f"• `/{cmd}` - {desc}\n"
-        help_text += f"• _...and {len(ADMIN_COMMANDS)-5} more admin commands_\n\n"
-        
-        # Moderation Commands  
-        help_text += f"🛡️ **Moderation Commands:**\n"
-        for cmd, desc in list(MODERATION_COMMANDS.items())[:5]:  # Show first 5
-            help_text += f"• `/{cmd}` - {desc}\n"
-        help_text += f"• _...and {len(MODERATION_COMMANDS)-5} more moderation commands_\n\n"
-        
-        # Info Commands
-        help_text += f"📊 **Information Commands:**\n"
-        for cmd, desc in list(INFO_COMMANDS.items())[:4]:  # Show first 4
-            help_text += f"• `/{cmd}` - {desc}\n"
-        help_text += f"• _...and {len(INFO_COMMANDS)-4} more info commands_\n\n"
-        
-        # Fun Commands
-        help_text += f"🎮 **Fun Commands:**\n"
-        for cmd, desc in list(FUN_COMMANDS.items())[:4]:  # Show first 4
-            help_text += f"• `/{cmd}` - {desc}\n"
-        help_text += f"• _...and {len(FUN_COMMANDS)-4} more fun commands_\n\n"
-        
-        help_text += f"🛠️ **Utility Commands:**\n"
-        help_text += f"• `/translate` - 🌐 Translate text between languages\n"
-        help_text += f"• `/time` - 🕐 Get current time and date\n"
-        help_text += f"• `/calc` - 🧮 Calculate math expressions\n"
-        help_text += f"• `/password` - 🔐 Generate secure passwords\n\n"
-        
-        help_text += f"💡 **Tips:**\n"
-        help_text += f"• Use `/menu` for an interactive command browser\n"
-        help_text += f"• Most admin commands require admin permissions\n"
-        help_text += f"• Reply to messages for user-specific commands\n"
-        help_text += f"• Bot needs admin rights for moderation features\n\n"
-        
-        help_text += f"🆘 **Need more help?** Use `/menu` for detailed command categories!"
-        
-        # Create inline keyboard
-        keyboard = [
-            [InlineKeyboardButton("📋 Interactive Menu", callback_data="menu"),
-             InlineKeyboardButton("🔄 Refresh", callback_data="help")],
-            [InlineKeyboardButton("👑 Admin Help", callback_data="admin_help"),
-             InlineKeyboardButton("🛡️ Moderation Help", callback_data="mod_help")],
-            [InlineKeyboardButton("📊 Info Help", callback_data="info_help"),
-             InlineKeyboardButton("🎮 Fun Help", callback_data="fun_help")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            help_text, 
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        payload = PAYLOADS["help"]
+        await update.message.reply_text(payload.text, parse_mode='Markdown', reply_markup=payload.reply_markup)
         
         logger.info(f"Help command used by user {update.effective_user.id}")
         
@@ -146,47 +288,8 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send interactive menu with command categories"""
     try:
-        menu_text = f"📋 **{BOT_NAME} - Interactive Menu**\n\n"
-        menu_text += f"🎯 Choose a category to explore commands:\n\n"
-        
-        menu_text += f"👑 **Admin Commands** ({len(ADMIN_COMMANDS)})\n"
-        menu_text += f"├ Ban, kick, promote users\n"
-        menu_text += f"├ Manage group settings\n"
-        menu_text += f"└ Pin messages and more\n\n"
-        
-        menu_text += f"🛡️ **Moderation Commands** ({len(MODERATION_COMMANDS)})\n"
-        menu_text += f"├ Mute, warn users\n"
-        menu_text += f"├ Delete and purge messages\n"
-        menu_text += f"└ Lock/unlock chat\n\n"
-        
-        menu_text += f"📊 **Information Commands** ({len(INFO_COMMANDS)})\n"
-        menu_text += f"├ User and chat info\n"
-        menu_text += f"├ Admin lists and rules\n"
-        menu_text += f"└ Member statistics\n\n"
-        
-        menu_text += f"🎮 **Fun Commands** ({len(FUN_COMMANDS)})\n"
-        menu_text += f"├ Games and entertainment\n"
-        menu_text += f"├ Random quotes and jokes\n"
-        menu_text += f"└ Interactive features\n\n"
-        
-        menu_text += f"💡 **Tip:** Click buttons below to explore each category!"
-        
-        # Create inline keyboard
-        keyboard = [
-            [InlineKeyboardButton(f"👑 Admin ({len(ADMIN_COMMANDS)})", callback_data="admin_help"),
-             InlineKeyboardButton(f"🛡️ Moderation ({len(MODERATION_COMMANDS)})", callback_data="mod_help")],
-            [InlineKeyboardButton(f"📊 Information ({len(INFO_COMMANDS)})", callback_data="info_help"),
-             InlineKeyboardButton(f"🎮 Fun ({len(FUN_COMMANDS)})", callback_data="fun_help")],
-            [InlineKeyboardButton("📚 Full Help", callback_data="help"),
-             InlineKeyboardButton("🔄 Refresh Menu", callback_data="menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            menu_text, 
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        payload = PAYLOADS["menu"]
+        await update.message.reply_text(payload.text, parse_mode='Markdown', reply_markup=payload.reply_markup)
         
         logger.info(f"Menu command used by user {update.effective_user.id}")
         
@@ -201,207 +304,39 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.answer()
         
         callback_data = query.data
-        
-        if callback_data == "help":
-            await show_help_callback(query)
-        elif callback_data == "menu":
-            await show_menu_callback(query)
-        elif callback_data == "admin_help":
-            await show_admin_help_callback(query)
-        elif callback_data == "mod_help":
-            await show_mod_help_callback(query)
-        elif callback_data == "info_help":
-            await show_info_help_callback(query)
-        elif callback_data == "fun_help":
-            await show_fun_help_callback(query)
+        payload = CALLBACK_PAYLOADS.get(callback_data)
+        if payload is not None:
+            await query.edit_message_text(payload.text, parse_mode='Markdown', reply_markup=payload.reply_markup)
             
         logger.info(f"Button callback: {callback_data} by user {query.from_user.id}")
         
     except Exception as e:
         logger.error(f"Error in button_callback: {e}")
 
-async def show_help_callback(query):
-    """Show help via callback"""
-    help_text = f"📚 **{BOT_NAME} - Help Center**\n\n"
-    help_text += f"🎯 **Quick Command Reference:**\n\n"
-    
-    # Sample commands from each category
-    help_text += f"👑 **Admin:** `/ban` `/kick` `/promote` `/demote`\n"
-    help_text += f"🛡️ **Moderation:** `/mute` `/warn` `/del` `/purge`\n"
-    help_text += f"📊 **Info:** `/info` `/admins` `/members` `/rules`\n"
-    help_text += f"🎮 **Fun:** `/dice` `/joke` `/quote` `/8ball`\n\n"
-    
-    help_text += f"💡 **Usage Examples:**\n"
-    help_text += f"• `/ban @username` - Ban a user\n"
-    help_text += f"• `/mute @username 1h` - Mute for 1 hour\n"
-    help_text += f"• `/warn @username reason` - Warn with reason\n"
-    help_text += f"• `/joke` - Get a random joke\n\n"
-    
-    help_text += f"🔧 **Requirements:**\n"
-    help_text += f"• Bot must be admin for moderation\n"
-    help_text += f"• You must be admin for admin commands\n"
-    help_text += f"• Some commands work via reply to messages"
-    
-    keyboard = [
-        [InlineKeyboardButton("📋 Back to Menu", callback_data="menu"),
-         InlineKeyboardButton("🔄 Refresh", callback_data="help")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(help_text, parse_mode='Markdown', reply_markup=reply_markup)
-
-async def show_menu_callback(query):
-    """Show menu via callback"""
-    menu_text = f"📋 **{BOT_NAME} - Command Menu**\n\n"
-    menu_text += f"🎯 **Select a category to view detailed commands:**\n\n"
-    
-    categories = [
-        (f"👑 **Admin Commands** ({len(ADMIN_COMMANDS)})", "User management, group settings"),
-        (f"🛡️ **Moderation** ({len(MODERATION_COMMANDS)})", "Chat moderation, warnings"),
-        (f"📊 **Information** ({len(INFO_COMMANDS)})", "User info, statistics, rules"),
-        (f"🎮 **Fun Commands** ({len(FUN_COMMANDS)})", "Games, jokes, entertainment")
-    ]
-    
-    for category, description in categories:
-        menu_text += f"{category}\n└ {description}\n\n"
-    
-    keyboard = [
-        [InlineKeyboardButton("👑 Admin", callback_data="admin_help"),
-         InlineKeyboardButton("🛡️ Moderation", callback_data="mod_help")],
-        [InlineKeyboardButton("📊 Information", callback_data="info_help"),
-         InlineKeyboardButton("🎮 Fun", callback_data="fun_help")],
-        [InlineKeyboardButton("📚 Full Help", callback_data="help")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(menu_text, parse_mode='Markdown', reply_markup=reply_markup)
-
-async def show_admin_help_callback(query):
-    """Show admin commands via callback"""
-    admin_text = f"👑 **Admin Commands**\n\n"
-    admin_text += f"🔒 **Requirements:** Admin permissions required\n\n"
-    
-    for cmd, desc in ADMIN_COMMANDS.items():
-        admin_text += f"• `/{cmd}` - {desc}\n"
-    
-    admin_text += f"\n💡 **Usage Examples:**\n"
-    admin_text += f"• `/ban @username reason` - Ban user with reason\n"
-    admin_text += f"• `/promote @username` - Promote to admin\n"
-    admin_text += f"• `/settitle New Group Name` - Change title\n"
-    admin_text += f"• `/pin` - Pin replied message\n\n"
-    
-    admin_text += f"⚠️ **Note:** Bot needs admin rights to execute these commands"
-    
-    keyboard = [
-        [InlineKeyboardButton("🛡️ Moderation", callback_data="mod_help"),
-         InlineKeyboardButton("📊 Information", callback_data="info_help")],
-        [InlineKeyboardButton("📋 Back to Menu", callback_data="menu")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(admin_text, parse_mode='Markdown', reply_markup=reply_markup)
-
-async def show_mod_help_callback(query):
-    """Show moderation commands via callback"""
-    mod_text = f"🛡️ **Moderation Commands**\n\n"
-    mod_text += f"🔒 **Requirements:** Admin permissions required\n\n"
-    
-    for cmd, desc in MODERATION_COMMANDS.items():
-        mod_text += f"• `/{cmd}` - {desc}\n"
-    
-    mod_text += f"\n💡 **Usage Examples:**\n"
-    mod_text += f"• `/mute @username 1h` - Mute for 1 hour\n"
-    mod_text += f"• `/warn @username spam` - Warn for spam\n"
-    mod_text += f"• `/del` - Delete replied message\n"
-    mod_text += f"• `/lock` - Lock chat for members\n\n"
-    
-    mod_text += f"📊 **Auto-moderation:**\n"
-    mod_text += f"• Users are auto-banned after 3 warnings\n"
-    mod_text += f"• Warnings are tracked per user"
-    
-    keyboard = [
-        [InlineKeyboardButton("👑 Admin", callback_data="admin_help"),
-         InlineKeyboardButton("📊 Information", callback_data="info_help")],
-        [InlineKeyboardButton("📋 Back to Menu", callback_data="menu")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(mod_text, parse_mode='Markdown', reply_markup=reply_markup)
-
-async def show_info_help_callback(query):
-    """Show info commands via callback"""
-    info_text = f"📊 **Information Commands**\n\n"
-    info_text += f"🔓 **Requirements:** Available to all users\n\n"
-    
-    for cmd, desc in INFO_COMMANDS.items():
-        info_text += f"• `/{cmd}` - {desc}\n"
-    
-    info_text += f"\n💡 **Usage Examples:**\n"
-    info_text += f"• `/info @username` - Get user details\n"
-    info_text += f"• `/admins` - List all admins\n"
-    info_text += f"• `/members` - Get member count\n"
-    info_text += f"• `/id` - Get your ID\n\n"
-    
-    info_text += f"📝 **Special Features:**\n"
-    info_text += f"• Detailed user profiles with permissions\n"
-    info_text += f"• Group statistics and member info\n"
-    info_text += f"• Custom rules management"
-    
-    keyboard = [
-        [InlineKeyboardButton("👑 Admin", callback_data="admin_help"),
-         InlineKeyboardButton("🎮 Fun", callback_data="fun_help")],
-        [InlineKeyboardButton("📋 Back to Menu", callback_data="menu")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(info_text, parse_mode='Markdown', reply_markup=reply_markup)
-
-async def show_fun_help_callback(query):
-    """Show fun commands via callback"""
-    fun_text = f"🎮 **Fun Commands**\n\n"
-    fun_text += f"🔓 **Requirements:** Available to all users\n\n"
-    
-    for cmd, desc in FUN_COMMANDS.items():
-        fun_text += f"• `/{cmd}` - {desc}\n"
-    
-    fun_text += f"\n💡 **Usage Examples:**\n"
-    fun_text += f"• `/dice` - Roll a dice (1-6)\n"
-    fun_text += f"• `/8ball Will I win?` - Ask magic 8-ball\n"
-    fun_text += f"• `/choose pizza burger tacos` - Pick option\n"
-    fun_text += f"• `/joke` - Get random joke\n\n"
-    
-    fun_text += f"🎊 **Entertainment Features:**\n"
-    fun_text += f"• Random quotes for inspiration\n"
-    fun_text += f"• Fun facts to learn new things\n"
-    fun_text += f"• Interactive games and choices"
-    
-    keyboard = [
-        [InlineKeyboardButton("🛡️ Moderation", callback_data="mod_help"),
-         InlineKeyboardButton("📊 Information", callback_data="info_help")],
-        [InlineKeyboardButton("📋 Back to Menu", callback_data="menu")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(fun_text, parse_mode='Markdown', reply_markup=reply_markup)
+def render_welcome(chat_title: str):
+    """Build the welcome for every member who joined within one coalescing window"""
+    def render(names: list) -> str:
+        welcome_text = f"🎉 **Welcome to the group!**\n\n"
+        welcome_text += f"👋 Hi {', '.join(names)}! Welcome to {chat_title}!\n\n"
+        welcome_text += f"📋 **Quick Start:**\n"
+        welcome_text += f"• Read the group rules: `/rules`\n"
+        welcome_text += f"• Get help with commands: `/help`\n"
+        welcome_text += f"• Have fun and be respectful! 😊\n\n"
+        welcome_text += f"🤖 I'm here to help manage the group. Feel free to explore my features!"
+        return welcome_text
+    return render
 
 async def welcome_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Welcome new members to the group"""
+    """Welcome new members to the group, joins close together share one message"""
     try:
         new_members = update.message.new_chat_members
+        chat = update.effective_chat
         
         for member in new_members:
             if member.is_bot:
                 continue
-                
-            welcome_text = f"🎉 **Welcome to the group!**\n\n"
-            welcome_text += f"👋 Hi {member.first_name}! Welcome to {update.effective_chat.title}!\n\n"
-            welcome_text += f"📋 **Quick Start:**\n"
-            welcome_text += f"• Read the group rules: `/rules`\n"
-            welcome_text += f"• Get help with commands: `/help`\n"
-            welcome_text += f"• Have fun and be respectful! 😊\n\n"
-            welcome_text += f"🤖 I'm here to help manage the group. Feel free to explore my features!"
-            
-            await update.message.reply_text(welcome_text, parse_mode='Markdown')
+            RESPONDER.post(context.bot, chat.id, member.first_name, key="welcome",
+                           render=render_welcome(chat.title), parse_mode='Markdown')
             
         logger.info(f"Welcomed {len(new_members)} new members to chat {update.effective_chat.id}")
         
@@ -3,40 +3,57 @@ Info command handlers for the Telegram Bot
 Handles user info, chat info, admin list and other information functions
 """
 
+import asyncio
 import logging
-import json
-import os
+import time
+import numpy as np
 from datetime import datetime, timezone
-from telegram import Update
+from telegram import Update, ChatMember, ChatMemberLeft, ChatMemberMember
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
 from utils.helpers import get_user_from_message, format_user_mention, get_ist_time, format_ist_time
 from utils.decorators import admin_required
-from config import EMOJIS, IST
+from utils.storage import JsonStore
+from utils.cache import ADMIN_CACHE, get_chat_admins, get_chat_info, cached_response, bump_version
+from utils.members import MEMBERS
+from utils.analytics import ACTIVITY, sparkline
+from config import EMOJIS, IST, ADMIN_CACHE_TTL, CHAT_INFO_TTL
 
 logger = logging.getLogger(__name__)
 
 # Simple file-based storage for rules
 RULES_FILE = "data/rules.json"
 
+RULES_STORE = JsonStore(RULES_FILE)
+
 def load_rules():
-    """Load rules from file"""
-    try:
-        if os.path.exists(RULES_FILE):
-            with open(RULES_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except:
-        return {}
+    """Load rules from the store"""
+    return RULES_STORE.load()
 
 def save_rules(rules):
-    """Save rules to file"""
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open(RULES_FILE, 'w') as f:
-            json.dump(rules, f)
-    except Exception as e:
-        logger.error(f"Error saving rules: {e}")
+    """Save rules to the store"""
+    RULES_STORE.save(rules)
+
+def from_timestamp(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+async def lookup_member(bot, chat_id: int, user, record):
+    """
+    ChatMember for /info, built from the member registry and the cached admin list
+    when they are enough, fetched with get_chat_member otherwise
+    Only statuses set by join, leave and chat_member events are trusted, a row
+    created by a message says nothing about whether the user is still here
+    """
+    if record is not None and record.confirmed:
+        if record.status in (ChatMember.MEMBER, ChatMember.ADMINISTRATOR, ChatMember.OWNER):
+            admins = await get_chat_admins(bot, chat_id)
+            admin = next((admin for admin in admins if admin.user.id == user.id), None)
+            return admin or ChatMemberMember(user)
+        if record.status == ChatMember.LEFT:
+            return ChatMemberLeft(user)
+    # Restricted and banned members have details only Telegram knows
+    return await bot.get_chat_member(chat_id, user.id)
 
 async def user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get information about a user"""
@@ -46,7 +63,8 @@ async def user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
             user_to_check = update.effective_user
             
         # Get chat member info
-        chat_member = await context.bot.get_chat_member(update.effective_chat.id, user_to_check.id)
+        record = MEMBERS.get(update.effective_chat.id, user_to_check.id)
+        chat_member = await lookup_member(context.bot, update.effective_chat.id, user_to_check, record)
         
         # Status mapping
         status_emoji = {
@@ -103,6 +121,15 @@ async def user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if restrictions:
                 info_text += f"🚫 **Restrictions:** {', '.join(restrictions)}\n"
                 
+        if record is not None:
+            if record.joined:
+                info_text += f"📥 **Joined:** {format_ist_time(from_timestamp(record.joined))}\n"
+            else:
+                info_text += f"👀 **First Seen:** {format_ist_time(from_timestamp(record.first_seen))}\n"
+            if record.messages:
+                info_text += f"💬 **Messages:** {record.messages:,}\n"
+                info_text += f"🕐 **Last Active:** {format_ist_time(from_timestamp(record.last_seen))}\n"
+                
         info_text += f"\n📅 **Checked:** {format_ist_time()}"
         
         await update.message.reply_text(info_text, parse_mode='Markdown')
@@ -115,82 +142,92 @@ async def user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in user_info: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get user information!")
 
+CHAT_TYPE_EMOJI = {
+    'private': '👤',
+    'group': '👥',
+    'supergroup': '🏢',
+    'channel': '📢'
+}
+
+async def render_chat_info(bot, chat_id: int) -> str:
+    """Chat information text, the same for everyone in the chat"""
+    # Both lookups are independent, so they go out together
+    chat, member_count = await asyncio.gather(
+        get_chat_info(bot, chat_id),
+        MEMBERS.member_count(bot, chat_id),
+        return_exceptions=True
+    )
+    if isinstance(chat, BaseException):
+        raise chat
+
+    lines = [
+        "💬 **Chat Information**\n",
+        f"🆔 **Chat ID:** `{chat.id}`",
+        f"📝 **Title:** {chat.title or 'N/A'}",
+        f"{CHAT_TYPE_EMOJI.get(chat.type, '❓')} **Type:** {chat.type.title()}"
+    ]
+    if chat.username:
+        lines.append(f"📛 **Username:** @{chat.username}")
+    if chat.description:
+        lines.append(f"📄 **Description:** {chat.description[:100]}{'...' if len(chat.description) > 100 else ''}")
+    if isinstance(member_count, int):
+        lines.append(f"👥 **Members:** {member_count:,}")
+    if getattr(chat, 'invite_link', None):
+        lines.append(f"🔗 **Invite Link:** {chat.invite_link}")
+    return "\n".join(lines)
+
 async def chat_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get information about the current chat"""
     try:
-        chat = await context.bot.get_chat(update.effective_chat.id)
-        
-        chat_type_emoji = {
-            'private': '👤',
-            'group': '👥', 
-            'supergroup': '🏢',
-            'channel': '📢'
-        }
-        
-        info_text = f"💬 **Chat Information**\n\n"
-        info_text += f"🆔 **Chat ID:** `{chat.id}`\n"
-        info_text += f"📝 **Title:** {chat.title or 'N/A'}\n"
-        info_text += f"{chat_type_emoji.get(chat.type, '❓')} **Type:** {chat.type.title()}\n"
-        
-        if chat.username:
-            info_text += f"📛 **Username:** @{chat.username}\n"
-            
-        if chat.description:
-            info_text += f"📄 **Description:** {chat.description[:100]}{'...' if len(chat.description) > 100 else ''}\n"
-            
-        # Get member count
-        try:
-            member_count = await context.bot.get_chat_member_count(chat.id)
-            info_text += f"👥 **Members:** {member_count:,}\n"
-        except:
-            pass
-            
-        if hasattr(chat, 'invite_link') and chat.invite_link:
-            info_text += f"🔗 **Invite Link:** {chat.invite_link}\n"
-            
-        info_text += f"\n📅 **Generated:** {format_ist_time()}"
+        chat_id = update.effective_chat.id
+        info_text = await cached_response(
+            chat_id, "chatinfo", ('info', 'members'),
+            lambda: render_chat_info(context.bot, chat_id), ttl=CHAT_INFO_TTL
+        )
+        # The cached text is shared, the time is added to each reply
+        info_text += f"\n\n📅 **Generated:** {format_ist_time()}"
         
         await update.message.reply_text(info_text, parse_mode='Markdown')
         
-        logger.info(f"Chat info generated for chat {chat.id}")
+        logger.info(f"Chat info sent for chat {chat_id}")
         
     except Exception as e:
         logger.error(f"Error in chat_info: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get chat information!")
 
+def render_admin_list(admins) -> str:
+    """Administrator list text, owner first"""
+    owner = next((admin for admin in admins if admin.status == 'creator'), None)
+    administrators = [admin for admin in admins if admin.status == 'administrator']
+
+    lines = ["👑 **Chat Administrators**\n"]
+    if owner:
+        lines.append("👑 **Owner:**")
+        lines.append(f"   • {format_user_mention(owner.user)}\n")
+    if administrators:
+        lines.append(f"⭐ **Administrators:** ({len(administrators)})")
+        lines.extend(f"   {i}. {format_user_mention(admin.user)}" for i, admin in enumerate(administrators, 1))
+    else:
+        lines.append("⭐ **Administrators:** None")
+    lines.append(f"\n📊 **Total:** {len(admins)} admin(s)")
+    return "\n".join(lines)
+
 async def list_admins(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all administrators in the chat"""
     try:
-        admins = await context.bot.get_chat_administrators(update.effective_chat.id)
-        
-        admin_list = f"👑 **Chat Administrators**\n\n"
-        
-        owner = None
-        administrators = []
-        
-        for admin in admins:
-            if admin.status == 'creator':
-                owner = admin
-            elif admin.status == 'administrator':
-                administrators.append(admin)
-                
-        if owner:
-            admin_list += f"👑 **Owner:**\n"
-            admin_list += f"   • {format_user_mention(owner.user)}\n\n"
-            
-        if administrators:
-            admin_list += f"⭐ **Administrators:** ({len(administrators)})\n"
-            for i, admin in enumerate(administrators, 1):
-                admin_list += f"   {i}. {format_user_mention(admin.user)}\n"
-        else:
-            admin_list += f"⭐ **Administrators:** None\n"
-            
-        admin_list += f"\n📊 **Total:** {len(admins)} admin(s)"
+        chat_id = update.effective_chat.id
+        admins = await get_chat_admins(context.bot, chat_id)
+        # The reply expires together with the admin table it was rendered from
+        ttl = ADMIN_CACHE.remaining(chat_id)
+        admin_list = await cached_response(
+            chat_id, "admins", ('admins',), lambda: render_admin_list(admins),
+            ttl=ADMIN_CACHE_TTL if ttl is None else ttl
+        )
         admin_list += f"\n📅 **Updated:** {format_ist_time()}"
         
         await update.message.reply_text(admin_list, parse_mode='Markdown')
         
-        logger.info(f"Admin list generated for chat {update.effective_chat.id}")
+        logger.info(f"Admin list sent for chat {chat_id}")
         
     except Exception as e:
         logger.error(f"Error in list_admins: {e}")
@@ -199,22 +236,67 @@ async def list_admins(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def member_count(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get member count of the chat"""
     try:
-        count = await context.bot.get_chat_member_count(update.effective_chat.id)
+        chat_id = update.effective_chat.id
+        count = await MEMBERS.member_count(context.bot, chat_id)
         
-        await update.message.reply_text(
-            f"👥 **Member Count**\n\n"
-            f"📊 **Total Members:** {count:,}\n"
-            f"💬 **Chat:** {update.effective_chat.title or 'This Chat'}\n"
-            f"📅 **Updated:** {format_ist_time()}",
-            parse_mode='Markdown'
-        )
+        count_text = f"👥 **Member Count**\n\n"
+        count_text += f"📊 **Total Members:** {count:,}\n"
         
-        logger.info(f"Member count checked for chat {update.effective_chat.id}")
+        tracked = MEMBERS.chats.get(chat_id)
+        if tracked:
+            week_ago = time.time() - 7 * 24 * 3600
+            count_text += f"📥 **Joined This Week:** {tracked.joined_since(week_ago):,}\n"
+            count_text += f"🗣️ **Active This Week:** {tracked.active_since(week_ago):,}\n"
+            
+        count_text += f"💬 **Chat:** {update.effective_chat.title or 'This Chat'}\n"
+        count_text += f"📅 **Updated:** {format_ist_time()}"
+        
+        await update.message.reply_text(count_text, parse_mode='Markdown')
+        
+        logger.info(f"Member count checked for chat {chat_id}")
         
     except Exception as e:
         logger.error(f"Error in member_count: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get member count!")
 
+def render_stats(summary) -> str:
+    """Activity statistics text, counts from sketches are shown as approximate"""
+    lines = [
+        "📈 **Chat Activity**\n",
+        f"💬 **Messages:** {summary.messages:,} ({int(summary.last_24h.sum()):,} in the last 24h)",
+        f"👥 **Active Users:** ~{summary.active_today:,} today, ~{summary.active_week:,} this week, "
+        f"~{summary.active_all_time:,} overall"
+    ]
+    if summary.top_posters:
+        lines.append("\n🏆 **Top Posters:**")
+        lines.extend(f"   {i}. {escape_markdown(name or str(user_id))} - ~{count:,}"
+                     for i, (user_id, count, name) in enumerate(summary.top_posters, 1))
+    busiest = [hour for hour in np.argsort(summary.by_hour)[::-1][:3] if summary.by_hour[hour]]
+    if busiest:
+        lines.append(f"\n⏰ **Busiest Hours (IST):** {', '.join(f'{hour:02d}:00' for hour in busiest)}")
+    lines.append(f"📊 **Last 24h:** `{sparkline(summary.last_24h)}`")
+    lines.append(f"\n📅 **Generated:** {format_ist_time()}")
+    return "\n".join(lines)
+
+async def chat_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show message and user activity statistics for the chat"""
+    try:
+        activity = ACTIVITY.chats.get(update.effective_chat.id)
+        if activity is None:
+            await update.message.reply_text(
+                f"{EMOJIS['info']} No activity recorded here yet!\n"
+                f"Statistics are collected from group messages."
+            )
+            return
+            
+        await update.message.reply_text(render_stats(activity.summary(time.time())), parse_mode='Markdown')
+        
+        logger.info(f"Stats shown for chat {update.effective_chat.id}")
+        
+    except Exception as e:
+        logger.error(f"Error in chat_stats: {e}")
+        await update.message.reply_text(f"{EMOJIS['error']} Failed to get chat statistics!")
+
 async def get_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get user or chat ID"""
     try:
@@ -238,25 +320,32 @@ async def get_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in get_id: {e}")
         await update.message.reply_text(f"{EMOJIS['error']} Failed to get ID information!")
 
+def render_rules(rules: str) -> str:
+    """Rules text for a chat, or how to set them"""
+    if rules:
+        return (
+            f"📜 **Group Rules**\n\n"
+            f"📝 {rules}\n\n"
+            f"⚠️ Please follow these rules to maintain a healthy community!"
+        )
+    return (
+        f"📜 **Group Rules**\n\n"
+        f"❌ No rules have been set for this group yet.\n"
+        f"👑 Admins can set rules using `/setrules`"
+    )
+
 async def show_rules(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show group rules"""
     try:
-        rules = load_rules()
-        chat_id = str(update.effective_chat.id)
-        
-        if chat_id in rules and rules[chat_id]:
-            rules_text = f"📜 **Group Rules**\n\n"
-            rules_text += f"📝 {rules[chat_id]}\n\n"
-            rules_text += f"⚠️ Please follow these rules to maintain a healthy community!\n"
-            rules_text += f"📅 Last updated: {get_ist_time().strftime('%Y-%m-%d')}"
-        else:
-            rules_text = f"📜 **Group Rules**\n\n"
-            rules_text += f"❌ No rules have been set for this group yet.\n"
-            rules_text += f"👑 Admins can set rules using `/setrules`"
+        chat_id = update.effective_chat.id
+        rules = load_rules().get(str(chat_id))
+        rules_text = await cached_response(chat_id, "rules", ('rules',), lambda: render_rules(rules))
+        if rules:
+            rules_text += f"\n📅 Last updated: {get_ist_time().strftime('%Y-%m-%d')}"
             
         await update.message.reply_text(rules_text, parse_mode='Markdown')
         
-        logger.info(f"Rules displayed for chat {update.effective_chat.id}")
+        logger.info(f"Rules displayed for chat {chat_id}")
         
     except Exception as e:
         logger.error(f"Error in show_rules: {e}")
@@ -279,6 +368,7 @@ async def set_rules(update: Update, context: ContextTypes.DEFAULT_TYPE):
         chat_id = str(update.effective_chat.id)
         rules[chat_id] = new_rules
         save_rules(rules)
+        bump_version(update.effective_chat.id, 'rules')
         
         await update.message.reply_text(
             f"📜 **Rules Updated!**\n\n"
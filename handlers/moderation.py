@@ -4,14 +4,15 @@ Handles mute, warn, delete, purge and other moderation functions
 """
 
 import logging
-import json
-import os
 from datetime import datetime, timezone
 from telegram import Update, ChatPermissions
+from telegram.constants import BulkRequestLimit
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
 from utils.decorators import admin_required, bot_admin_required
 from utils.helpers import get_user_from_message, format_user_mention, parse_time, get_ist_time, format_ist_time
+from utils.storage import JsonStore
+from utils.responder import gather_sends
 from config import EMOJIS, MESSAGES, MAX_WARNINGS, DEFAULT_MUTE_TIME, IST
 
 logger = logging.getLogger(__name__)
@@ -20,43 +21,24 @@ logger = logging.getLogger(__name__)
 WARNINGS_FILE = "data/warnings.json"
 MUTES_FILE = "data/mutes.json"
 
+WARNINGS_STORE = JsonStore(WARNINGS_FILE)
+MUTES_STORE = JsonStore(MUTES_FILE)
+
 def load_warnings():
-    """Load warnings from file"""
-    try:
-        if os.path.exists(WARNINGS_FILE):
-            with open(WARNINGS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except:
-        return {}
+    """Load warnings from the store"""
+    return WARNINGS_STORE.load()
 
 def save_warnings(warnings):
-    """Save warnings to file"""
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open(WARNINGS_FILE, 'w') as f:
-            json.dump(warnings, f)
-    except Exception as e:
-        logger.error(f"Error saving warnings: {e}")
+    """Save warnings to the store"""
+    WARNINGS_STORE.save(warnings)
 
 def load_mutes():
-    """Load mutes from file"""
-    try:
-        if os.path.exists(MUTES_FILE):
-            with open(MUTES_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except:
-        return {}
+    """Load mutes from the store"""
+    return MUTES_STORE.load()
 
 def save_mutes(mutes):
-    """Save mutes to file"""
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open(MUTES_FILE, 'w') as f:
-            json.dump(mutes, f)
-    except Exception as e:
-        logger.error(f"Error saving mutes: {e}")
+    """Save mutes to the store"""
+    MUTES_STORE.save(mutes)
 
 @admin_required
 @bot_admin_required
@@ -393,13 +375,16 @@ async def purge_messages(update: Update, context: ContextTypes.DEFAULT_TYPE):
         start_id = update.message.reply_to_message.message_id
         end_id = update.message.message_id
         
-        deleted_count = 0
-        for msg_id in range(start_id, end_id + 1):
-            try:
-                await context.bot.delete_message(update.effective_chat.id, msg_id)
-                deleted_count += 1
-            except:
-                continue
+        # One deleteMessages call per 100 ids, the chunks don't depend on each other
+        message_ids = range(start_id, end_id + 1)
+        chunks = [message_ids[i:i + BulkRequestLimit.MAX_LIMIT]
+                  for i in range(0, len(message_ids), BulkRequestLimit.MAX_LIMIT)]
+        results = await gather_sends(
+            context.bot.delete_messages(update.effective_chat.id, list(chunk))
+            for chunk in chunks
+        )
+        # Telegram skips ids it can't delete without saying which, so this counts the ids sent
+        deleted_count = sum(len(chunk) for chunk, result in zip(chunks, results) if not isinstance(result, Exception))
                 
         await update.message.reply_text(
             f"{EMOJIS['success']} **Messages Purged!**\n\n"
@@ -8,7 +8,11 @@ import json
 from datetime import datetime, timezone, timedelta
 from telegram import Update
 from telegram.ext import ContextTypes
-from config import EMOJIS
+from config import EMOJIS, LANGDETECT_MIN_CONFIDENCE
+from utils.safe_calc import evaluate, CalcError, FUNCTIONS, CONSTANTS
+from utils.workers import WORKER_POOL, WorkerBusy, WorkerError
+from utils.translation import TRANSLATOR
+from utils.langdetect import detect_language
 
 # Indian Standard Time (IST) timezone
 IST = timezone(timedelta(hours=5, minutes=30))
@@ -36,7 +40,7 @@ LANGUAGE_CODES = {
 }
 
 async def translate_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Translate text between languages using a simple translation approach"""
+    """Translate text between languages using the configured translation backend"""
     try:
         # Check if we have arguments or a replied message
         text_to_translate = ""
@@ -74,16 +78,24 @@ async def translate_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
             
-        # Simple translation simulation (in real deployment, you'd use Google Translate API)
-        # For demo purposes, we'll provide a basic response
-        translated_text = f"[Translation to {target_lang.upper()}] {text_to_translate}"
+        detection = detect_language(text_to_translate)
+        source = detection.language if detection.confidence >= LANGDETECT_MIN_CONFIDENCE else None
+        translation = await TRANSLATOR.translate(text_to_translate, target_lang, source)
+        if source and translation.coverage == 0:
+            # A wrong guess matches no phrases at all, let the backend work out the source instead
+            source = None
+            translation = await TRANSLATOR.translate(text_to_translate, target_lang)
+        if source:
+            source_lang = f"{source.upper()} (detected, {detection.confidence:.0%})"
+        else:
+            source_lang = translation.source.upper() if translation.source else "Unknown"
         
-        # Create a more realistic translation response
         response_text = f"🌐 **Translation Complete!**\n\n"
         response_text += f"📝 **Original:** {text_to_translate}\n"
-        response_text += f"🔤 **Language:** {target_lang.upper()}\n"
-        response_text += f"✨ **Translated:** {translated_text}\n\n"
-        response_text += f"💡 *Note: For full translation features, API key setup required*"
+        response_text += f"🔤 **Language:** {source_lang} → {target_lang.upper()}\n"
+        response_text += f"✨ **Translated:** {translation.text}\n\n"
+        if translation.coverage < 1:
+            response_text += f"💡 *The {translation.backend} backend recognised {translation.coverage:.0%} of the text, other words are kept as they are*"
         
         await update.message.reply_text(response_text, parse_mode='Markdown')
         logger.info(f"Translation requested by user {update.effective_user.id}")
@@ -126,8 +138,11 @@ async def calculate_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"• `/calc 2 + 2`\n"
                 f"• `/calc 10 * 5`\n"
                 f"• `/calc 100 / 4`\n"
-                f"• `/calc 2 ** 3` (power)\n\n"
-                f"⚠️ **Supported:** +, -, *, /, **, (, )\n"
+                f"• `/calc 2 ** 3` (power)\n"
+                f"• `/calc sqrt(2) * sin(pi / 4)`\n\n"
+                f"⚠️ **Supported:** +, -, *, /, //, %, ** (or ^), (, )\n"
+                f"📐 **Functions:** {', '.join(FUNCTIONS)}\n"
+                f"🔣 **Constants:** {', '.join(CONSTANTS)}\n"
                 f"🛡️ Safe calculation only - no external functions",
                 parse_mode='Markdown'
             )
@@ -135,28 +150,10 @@ async def calculate_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         expression = " ".join(context.args)
         
-        # Safety check - only allow basic math operations
-        allowed_chars = "0123456789+-*/.()**  "
-        if not all(c in allowed_chars for c in expression):
-            await update.message.reply_text(
-                f"{EMOJIS['error']} **Invalid Expression!**\n\n"
-                f"🔢 Only numbers and basic math operators allowed\n"
-                f"✅ Allowed: + - * / ** ( )"
-            )
-            return
-            
         # Evaluate the expression safely
         try:
-            # Use eval with restricted globals for safer execution
-            safe_dict = {
-                "__builtins__": {},
-                "abs": abs,
-                "round": round,
-                "min": min,
-                "max": max,
-                "pow": pow
-            }
-            result = eval(expression, safe_dict)
+            # Only whitelisted numeric nodes, with bounded size and time, off the event loop
+            result = await WORKER_POOL.run(evaluate, expression)
             
             calc_text = f"🧮 **Calculator Result**\n\n"
             calc_text += f"📝 **Expression:** `{expression}`\n"
@@ -173,6 +170,23 @@ async def calculate_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text(calc_text, parse_mode='Markdown')
             logger.info(f"Calculation by user {update.effective_user.id}: {expression} = {result}")
             
+        except WorkerBusy:
+            await update.message.reply_text(
+                f"{EMOJIS['warning']} **Calculator is busy!**\n\n"
+                f"⏳ Too many calculations are running right now\n"
+                f"💡 Please try again in a few seconds"
+            )
+        except WorkerError as e:
+            await update.message.reply_text(
+                f"{EMOJIS['error']} **Calculation stopped!**\n\n"
+                f"❌ {e}"
+            )
+        except CalcError as e:
+            await update.message.reply_text(
+                f"{EMOJIS['error']} **Invalid Expression!**\n\n"
+                f"❌ {e}\n"
+                f"💡 Check your math syntax"
+            )
         except ZeroDivisionError:
             await update.message.reply_text(
                 f"{EMOJIS['error']} **Division by Zero!**\n\n"
@@ -8,17 +8,22 @@ Date: July 10, 2025
 import logging
 import os
 from datetime import datetime
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler
+from telegram.ext import Application, MessageHandler, filters, CallbackQueryHandler
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from config import BOT_TOKEN, ADMIN_COMMANDS, MODERATION_COMMANDS, FUN_COMMANDS, INFO_COMMANDS, UTILITY_COMMANDS, IST
+from config import (BOT_TOKEN, ADMIN_COMMANDS, MODERATION_COMMANDS, FUN_COMMANDS, INFO_COMMANDS, UTILITY_COMMANDS, IST,
+                    COMMAND_PREFIXES, COMMAND_ALIASES, PROTECTED_COMMANDS)
 from handlers.admin import *
 from handlers.moderation import *
 from handlers.fun import *
 from handlers.info import *
 from handlers.general import *
 from handlers.utility import *
+from utils.router import CommandRouter
+from utils.lifecycle import TrackingApplication
+from utils.decorators import instrument_handler
+from utils.metrics import InstrumentedRequest, UPDATE_QUEUE_DEPTH, install_error_counter
 
 # Custom logging formatter for IST timezone
 class ISTFormatter(logging.Formatter):
@@ -46,76 +51,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Command name -> callback, dispatched by the CommandRouter
+COMMAND_CALLBACKS = {
+    # General commands
+    "start": start_command,
+    "help": help_command,
+    "menu": menu_command,
+    
+    # Admin commands
+    "ban": ban_user,
+    "unban": unban_user,
+    "kick": kick_user,
+    "promote": promote_user,
+    "demote": demote_user,
+    "pin": pin_message,
+    "unpin": unpin_message,
+    "setgrouppic": set_group_pic,
+    "settitle": set_group_title,
+    "setdescription": set_group_description,
+    "disable": disable_command,
+    "enable": enable_command,
+    "status": status_command,
+    "contentfilter": content_filter_command,
+    
+    # Moderation commands
+    "mute": mute_user,
+    "unmute": unmute_user,
+    "warn": warn_user,
+    "unwarn": unwarn_user,
+    "warnings": check_warnings,
+    "del": delete_message,
+    "purge": purge_messages,
+    "lock": lock_chat,
+    "unlock": unlock_chat,
+    
+    # Info commands
+    "info": user_info,
+    "chatinfo": chat_info,
+    "admins": list_admins,
+    "members": member_count,
+    "id": get_id,
+    "rules": show_rules,
+    "setrules": set_rules,
+    "stats": chat_stats,
+    
+    # Fun commands
+    "dice": roll_dice,
+    "coin": flip_coin,
+    "quote": random_quote,
+    "joke": random_joke,
+    "fact": random_fact,
+    "8ball": magic_8ball,
+    "choose": choose_option,
+    "test": test_command,
+    
+    # Utility commands
+    "translate": translate_text,
+    "time": time_command,
+    "calc": calculate_command,
+    "password": generate_password,
+}
+
+def build_application():
+    """Create the bot application with all handlers registered"""
+    install_error_counter()
+    
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .application_class(TrackingApplication)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedRequest(connection_pool_size=1))
+        .build()
+    )
+    UPDATE_QUEUE_DEPTH.set_function(application.update_queue.qsize)
+    
+    # One router handles every command
+    router = CommandRouter(
+        prefixes=COMMAND_PREFIXES,
+        aliases=COMMAND_ALIASES,
+        protected=PROTECTED_COMMANDS
+    )
+    for name, callback in COMMAND_CALLBACKS.items():
+        router.add_command(name, instrument_handler(name)(callback))
+    application.bot_data['router'] = router
+    application.add_handler(router)
+    
+    # Message handlers
+    application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, instrument_handler("welcome")(welcome_new_member)))
+    application.add_handler(MessageHandler(filters.StatusUpdate.LEFT_CHAT_MEMBER, instrument_handler("goodbye")(goodbye_member)))
+    
+    # Callback query handler for inline keyboards
+    application.add_handler(CallbackQueryHandler(instrument_handler("button")(button_callback)))
+    
+    # Error handler
+    application.add_error_handler(error_handler)
+    
+    return application
+
 def main():
     """Main function to start the bot."""
     try:
         # Create application
-        application = Application.builder().token(BOT_TOKEN).build()
-        
-        # Add command handlers
-        
-        # General commands
-        application.add_handler(CommandHandler("start", start_command))
-        application.add_handler(CommandHandler("help", help_command))
-        application.add_handler(CommandHandler("menu", menu_command))
-        
-        # Admin commands
-        application.add_handler(CommandHandler("ban", ban_user))
-        application.add_handler(CommandHandler("unban", unban_user))
-        application.add_handler(CommandHandler("kick", kick_user))
-        application.add_handler(CommandHandler("promote", promote_user))
-        application.add_handler(CommandHandler("demote", demote_user))
-        application.add_handler(CommandHandler("pin", pin_message))
-        application.add_handler(CommandHandler("unpin", unpin_message))
-        application.add_handler(CommandHandler("setgrouppic", set_group_pic))
-        application.add_handler(CommandHandler("settitle", set_group_title))
-        application.add_handler(CommandHandler("setdescription", set_group_description))
-        
-        # Moderation commands
-        application.add_handler(CommandHandler("mute", mute_user))
-        application.add_handler(CommandHandler("unmute", unmute_user))
-        application.add_handler(CommandHandler("warn", warn_user))
-        application.add_handler(CommandHandler("unwarn", unwarn_user))
-        application.add_handler(CommandHandler("warnings", check_warnings))
-        application.add_handler(CommandHandler("del", delete_message))
-        application.add_handler(CommandHandler("purge", purge_messages))
-        application.add_handler(CommandHandler("lock", lock_chat))
-        application.add_handler(CommandHandler("unlock", unlock_chat))
-        
-        # Info commands
-        application.add_handler(CommandHandler("info", user_info))
-        application.add_handler(CommandHandler("chatinfo", chat_info))
-        application.add_handler(CommandHandler("admins", list_admins))
-        application.add_handler(CommandHandler("members", member_count))
-        application.add_handler(CommandHandler("id", get_id))
-        application.add_handler(CommandHandler("rules", show_rules))
-        application.add_handler(CommandHandler("setrules", set_rules))
-        
-        # Fun commands
-        application.add_handler(CommandHandler("dice", roll_dice))
-        application.add_handler(CommandHandler("coin", flip_coin))
-        application.add_handler(CommandHandler("quote", random_quote))
-        application.add_handler(CommandHandler("joke", random_joke))
-        application.add_handler(CommandHandler("fact", random_fact))
-        application.add_handler(CommandHandler("8ball", magic_8ball))
-        application.add_handler(CommandHandler("choose", choose_option))
-        application.add_handler(CommandHandler("test", test_command))
-        
-        # Utility commands
-        application.add_handler(CommandHandler("translate", translate_text))
-        application.add_handler(CommandHandler("time", time_command))
-        application.add_handler(CommandHandler("calc", calculate_command))
-        application.add_handler(CommandHandler("password", generate_password))
-        
-        # Message handlers
-        application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, welcome_new_member))
-        application.add_handler(MessageHandler(filters.StatusUpdate.LEFT_CHAT_MEMBER, goodbye_member))
-        
-        # Callback query handler for inline keyboards
-        application.add_handler(CallbackQueryHandler(button_callback))
-        
-        # Error handler
-        application.add_error_handler(error_handler)
+        application = build_application()
         
         logger.info("🚀 Bot is starting...")
         print("🤖 Telegram Bot is running!")
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Single-process runtime for the Telegram Bot
+Runs the bot Application and the health server on one event loop
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from telegram import Update
+
+from main import build_application
+from config import (BOT_NAME, BOT_VERSION, SHUTDOWN_DRAIN_TIMEOUT, METRICS_SNAPSHOT_FILE,
+                    METRICS_SNAPSHOT_INTERVAL, STATS_SNAPSHOT_INTERVAL)
+from utils.health_server import (
+    HealthServer, Response, StaticAsset, StreamResponse, json_response
+)
+from utils.lifecycle import RuntimeState, TRACKER, drain_and_flush
+from utils.metrics import REGISTRY, write_snapshot
+from utils.loopmon import LOOP_MONITOR
+from utils.watchdog import WATCHDOG
+from utils.health import API_PROBE, collect_health
+from utils.cache import load_warm_state, save_warm_state
+from utils.content import watch_content
+from utils.workers import WORKER_POOL
+from utils.analytics import ACTIVITY
+
+logger = logging.getLogger(__name__)
+
+# Bot status tracking
+bot_status = {
+    'running': False,
+    'start_time': datetime.now(),
+    'health_checks': 0
+}
+
+FEATURES = ['Admin Commands', 'Moderation Tools', 'Fun Commands', 'Information Commands', 'Utility Tools']
+
+def format_uptime() -> str:
+    """Format the runtime uptime as hours and minutes"""
+    uptime_seconds = (datetime.now() - bot_status['start_time']).total_seconds()
+    hours = int(uptime_seconds // 3600)
+    minutes = int((uptime_seconds % 3600) // 60)
+    return f"{hours}h {minutes}m"
+
+# Seconds between live updates pushed to open dashboards
+LIVE_INTERVAL = 5
+
+def render_dashboard() -> str:
+    """Render the static HTML dashboard, live numbers are filled in by the page script"""
+    return """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>🤖 Telegram Bot Status</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            background: #f5f5f5;
+        }
+        .container {
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .status-online {
+            color: #22c55e;
+            font-weight: bold;
+        }
+        .status-offline {
+            color: #ef4444;
+            font-weight: bold;
+        }
+        .metric {
+            background: #f8f9fa;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 5px;
+            border-left: 4px solid #22c55e;
+        }
+        .metric-title {
+            font-weight: bold;
+            color: #333;
+        }
+        .metric-value {
+            font-size: 1.2em;
+            margin-top: 5px;
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+        }
+        .timestamp {
+            color: #666;
+            font-size: 0.9em;
+            text-align: center;
+            margin-top: 20px;
+        }
+        .features {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 10px;
+            margin-top: 20px;
+        }
+        .feature {
+            background: #e0f2fe;
+            padding: 10px;
+            border-radius: 5px;
+            text-align: center;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🤖 Telegram Admin Bot</h1>
+            <h2 id="status" class="status-online">🟡 CONNECTING...</h2>
+        </div>
+
+        <div class="metric">
+            <div class="metric-title">⏱️ Uptime</div>
+            <div class="metric-value" id="uptime">-</div>
+        </div>
+
+        <div class="metric">
+            <div class="metric-title">🔍 Health Checks</div>
+            <div class="metric-value" id="health_checks">-</div>
+        </div>
+
+        <div class="metric">
+            <div class="metric-title">📅 Started</div>
+            <div class="metric-value" id="started">-</div>
+        </div>
+
+        <div class="metric">
+            <div class="metric-title">🔧 Features Available</div>
+            <div class="features">
+                <div class="feature">👑 Admin Commands</div>
+                <div class="feature">🛡️ Moderation Tools</div>
+                <div class="feature">🎮 Fun Commands</div>
+                <div class="feature">📊 Info Commands</div>
+                <div class="feature">🛠️ Utility Tools</div>
+            </div>
+        </div>
+
+        <div class="metric">
+            <div class="metric-title">🌐 API Endpoints</div>
+            <div style="font-family: monospace; margin-top: 10px;">
+                <div>GET / - Dashboard (this page)</div>
+                <div>GET /health - Pipeline health, 503 when not ready</div>
+                <div>GET /stats - JSON statistics</div>
+                <div>GET /events - Live statistics (Server-Sent Events)</div>
+                <div>GET /metrics - Prometheus metrics</div>
+                <div>GET /loop - Event loop lag and recent blocks</div>
+            </div>
+        </div>
+
+        <div class="timestamp">
+            Last updated: <span id="server_time">-</span><br>
+            <span id="mode">Live updates</span>
+        </div>
+    </div>
+    <script>
+        function show(stats) {
+            var status = document.getElementById('status');
+            var online = stats.status === 'operational';
+            status.textContent = online ? '🟢 ONLINE & RUNNING' : '🟡 STARTING';
+            status.className = online ? 'status-online' : 'status-offline';
+            ['uptime', 'health_checks', 'started', 'server_time'].forEach(function(key) {
+                document.getElementById(key).textContent = stats[key];
+            });
+        }
+        function poll() {
+            fetch('/stats').then(function(r) { return r.json(); }).then(show).catch(function() {});
+        }
+        if (window.EventSource) {
+            var events = new EventSource('/events');
+            events.onmessage = function(e) { show(JSON.parse(e.data)); };
+            events.onerror = function() {
+                document.getElementById('status').textContent = '🔴 RECONNECTING...';
+                document.getElementById('status').className = 'status-offline';
+            };
+        } else {
+            document.getElementById('mode').textContent = 'Auto-refresh every 30 seconds';
+            poll();
+            setInterval(poll, 30000);
+        }
+    </script>
+</body>
+</html>
+"""
+
+# The page never changes while the process runs, so it is rendered and compressed once
+DASHBOARD = StaticAsset(render_dashboard(), "text/html; charset=utf-8")
+
+def live_stats() -> dict:
+    """Numbers shown on the dashboard and returned by /stats"""
+    return {
+        'bot_name': BOT_NAME,
+        'version': BOT_VERSION,
+        'status': 'operational' if bot_status['running'] else 'starting',
+        'uptime': format_uptime(),
+        'started': bot_status['start_time'].strftime('%Y-%m-%d %H:%M:%S'),
+        'features': FEATURES,
+        'health_checks': bot_status['health_checks'],
+        'server_time': datetime.now().isoformat(timespec='seconds'),
+        'watchdog': WATCHDOG.snapshot()
+    }
+
+_live_event = {'time': 0.0, 'data': b""}
+
+def live_event() -> bytes:
+    """
+    The current stats as a Server-Sent Event
+    Built at most once per interval and shared by every open dashboard
+    """
+    now = time.monotonic()
+    if not _live_event['data'] or now - _live_event['time'] >= LIVE_INTERVAL:
+        _live_event['data'] = f"data: {json.dumps(live_stats())}\n\n".encode()
+        _live_event['time'] = now
+    return _live_event['data']
+
+async def live_events():
+    """Push stats to one dashboard until it disconnects"""
+    yield f"retry: {LIVE_INTERVAL * 1000}\n\n"
+    while True:
+        yield live_event()
+        await asyncio.sleep(LIVE_INTERVAL)
+
+async def dashboard_route(request):
+    """HTML dashboard for easy monitoring"""
+    bot_status['health_checks'] += 1
+    return DASHBOARD.respond(request)
+
+async def health_route(request):
+    """Pipeline health for UptimeRobot and load balancers, 503 until the bot is ready"""
+    bot_status['health_checks'] += 1
+    health = collect_health(bot_status['running'])
+    health['uptime'] = format_uptime()
+    return json_response(health, 200 if health['ready'] else 503, indent=2)
+
+async def stats_route(request):
+    """JSON statistics"""
+    bot_status['health_checks'] += 1
+    return json_response(live_stats(), indent=2)
+
+async def events_route(request):
+    """Live statistics as Server-Sent Events"""
+    return StreamResponse(live_events())
+
+async def metrics_route(request):
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+async def loop_route(request):
+    """Event loop lag and recent blocking stacks"""
+    return json_response(LOOP_MONITOR.snapshot(), indent=2)
+
+def build_health_server(port: int) -> HealthServer:
+    """Create the health server with all routes registered"""
+    server = HealthServer(port=port)
+    server.route('/', dashboard_route)
+    server.route('/health', health_route)
+    server.route('/stats', stats_route)
+    server.route('/events', events_route)
+    server.route('/metrics', metrics_route)
+    server.route('/loop', loop_route)
+    return server
+
+def save_metrics_snapshot():
+    """Write the metrics for bot_status_check.py to read without a network"""
+    try:
+        write_snapshot(METRICS_SNAPSHOT_FILE)
+    except Exception as e:
+        logger.warning(f"Could not write metrics snapshot: {e}")
+
+async def snapshot_metrics():
+    """Keep the metrics snapshot file current"""
+    while True:
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL)
+        save_metrics_snapshot()
+
+async def snapshot_activity():
+    """Save the /stats sketches now and then, so a crash loses little"""
+    while True:
+        await asyncio.sleep(STATS_SNAPSHOT_INTERVAL)
+        ACTIVITY.evict_idle()
+        await ACTIVITY.save_async()
+
+def install_signal_handlers(stop_event: asyncio.Event):
+    """Stop the runtime on SIGINT/SIGTERM"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Not available on this platform or outside the main thread
+            pass
+
+async def run_application(state: RuntimeState, stop_event: asyncio.Event) -> bool:
+    """
+    Run one Application until a stop signal or a watchdog stall
+    Returns True when the Application should be rebuilt and started again
+    """
+    application = build_application()
+    async with application:
+        await application.start()
+
+        # Hand over updates the previous run fetched but could not finish,
+        # anything else up to its last update was already handled
+        pending = state.take_pending(application.bot)
+        TRACKER.resume_after(state.last_update_id, pending)
+        for update in pending:
+            await application.update_queue.put(update)
+
+        await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+        bot_status['running'] = True
+        logger.info("🚀 Bot is running")
+
+        WATCHDOG.arm(application)
+        API_PROBE.start(application.bot)
+        stalled = asyncio.create_task(WATCHDOG.run())
+        stopped = asyncio.create_task(stop_event.wait())
+        await asyncio.wait({stalled, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (stalled, stopped):
+            task.cancel()
+        restart = stalled.done() and not stop_event.is_set()
+
+        if not restart:
+            logger.info("🛑 Shutting down gracefully...")
+        bot_status['running'] = False
+        API_PROBE.stop()
+        await drain_and_flush(application, state, SHUTDOWN_DRAIN_TIMEOUT)
+    return restart
+
+async def run_async():
+    """Run the bot and the health server until a stop signal arrives"""
+    port = int(os.environ.get('PORT', 5000))
+    stop_event = asyncio.Event()
+    install_signal_handlers(stop_event)
+
+    # Bind the port first so the platform sees the service come up quickly
+    server = build_health_server(port)
+    await server.start()
+    LOOP_MONITOR.start()
+    snapshots = asyncio.create_task(snapshot_metrics())
+    content_watcher = asyncio.create_task(watch_content())
+    activity_snapshots = asyncio.create_task(snapshot_activity())
+
+    try:
+        state = RuntimeState()
+        load_warm_state()
+        await ACTIVITY.load_async()
+        while not stop_event.is_set():
+            if await run_application(state, stop_event):
+                logger.warning("♻️ Restarting the application after a stall")
+    finally:
+        bot_status['running'] = False
+        save_warm_state()
+        # Nothing else runs on the loop any more, so the final save may block
+        ACTIVITY.save()
+        snapshots.cancel()
+        content_watcher.cancel()
+        activity_snapshots.cancel()
+        save_metrics_snapshot()
+        WORKER_POOL.shutdown()
+        await LOOP_MONITOR.stop()
+        await server.stop()
+
+def main():
+    """Start the runtime"""
+    logger.info("=" * 50)
+    logger.info("🚀 Starting Telegram Bot with Health Server")
+    logger.info("=" * 50)
+    asyncio.run(run_async())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for chat activity analytics
+Verifies sketch accuracy, fixed memory per chat and the /stats snapshot
+"""
+
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from telegram import Chat, Message, Update, User
+from utils.analytics import (ActivityTracker, ChatActivity, HyperLogLog, HourlyHistogram,
+                             IST_OFFSET, sparkline)
+from handlers.info import render_stats
+
+START = 1_700_000_000 - 1_700_000_000 % 86400 - IST_OFFSET
+
+def test_count_min_and_heavy_hitters():
+    """Test that top posters are found and never undercounted in a skewed stream"""
+    print("🔍 Testing count-min sketch and heavy hitters...")
+    rng = random.Random(7)
+    activity = ChatActivity()
+    truth = {}
+    for i in range(50000):
+        # Zipf-like: a few users write most messages
+        user = min(int(rng.paretovariate(1.0)), 5000)
+        truth[user] = truth.get(user, 0) + 1
+        activity.add(user, f"user{user}", START + i)
+
+    expected = sorted(truth, key=truth.get, reverse=True)[:5]
+    found = [user for user, _, _ in activity.top.top(5)]
+    assert found == expected, (found, expected)
+    for user, count, label in activity.top.top(5):
+        assert truth[user] <= count <= truth[user] + 50000 * np.e / 1024
+        assert label == f"user{user}"
+    assert activity.posters.estimate(123456789) <= 50000 * np.e / 1024
+    print("✅ Top posters found within the sketch's error bound")
+
+def test_hyperloglog_accuracy():
+    """Test distinct counts across small and large cardinalities, and unions"""
+    print("🔍 Testing HyperLogLog...")
+    for n in (10, 500, 20000):
+        sketch = HyperLogLog()
+        for user in range(n):
+            sketch.add(user)
+            sketch.add(user)
+        assert abs(sketch.count() - n) <= max(2, 0.1 * n), (n, sketch.count())
+
+    first, second = HyperLogLog(), HyperLogLog()
+    for user in range(3000):
+        (first if user % 2 else second).add(user)
+    assert abs(first.union(second).count() - 3000) <= 300
+    print("✅ HyperLogLog counts are within 10%")
+
+def test_hourly_histogram():
+    """Test the hourly ring, clearing of skipped hours and the IST hour of day"""
+    print("🔍 Testing hourly histograms...")
+    hours = HourlyHistogram(hours=24)
+    for i in range(10):
+        hours.add(START + 3600 * 5 + i)
+    hours.add(START + 3600 * 6)
+    last = hours.last(24, START + 3600 * 6)
+    assert last[-1] == 1 and last[-2] == 10 and last.sum() == 11
+    # IST midnight plus five hours
+    assert hours.by_hour[5] == 10
+
+    # A day later the old buckets have rolled off but the hour of day stays
+    assert hours.last(24, START + 3600 * 30).sum() == 0
+    assert hours.by_hour.sum() == 11
+    assert sparkline(np.array([0, 1, 2, 4])) == "▁▃▅█"
+    print("✅ Hourly histograms work")
+
+def test_memory_is_fixed_and_snapshot(tmp_path):
+    """Test that a chat's memory does not grow and the snapshot restores it"""
+    print("🔍 Testing fixed memory and snapshots...")
+    tracker = ActivityTracker()
+    chat = Chat(-800, Chat.SUPERGROUP)
+
+    def post(user_id, seconds):
+        when = datetime.fromtimestamp(START + seconds, timezone.utc)
+        user = User(user_id, f"User_{user_id}", False)
+        tracker.observe(Update(seconds, message=Message(seconds, when, chat, from_user=user, text="hi")))
+
+    post(1, 0)
+    size = tracker.chats[-800].nbytes
+    for i in range(1, 5000):
+        post(i % 1000, i * 30)
+    assert tracker.chats[-800].nbytes == size
+
+    # Private chats are not counted
+    tracker.observe(Update(1, message=Message(1, datetime.now(timezone.utc), Chat(9, Chat.PRIVATE),
+                                              from_user=User(9, "Me", False), text="hi")))
+    assert list(tracker.chats) == [-800]
+
+    now = START + 5000 * 30
+    before = tracker.chats[-800].summary(now)
+    tracker.save(str(tmp_path / "activity.npz"))
+    restored = ActivityTracker()
+    restored.load(str(tmp_path / "activity.npz"))
+    after = restored.chats[-800].summary(now)
+    assert after.messages == before.messages == 5000
+    assert after.active_all_time == before.active_all_time
+    assert after.active_week == before.active_week
+    assert after.top_posters == before.top_posters
+    assert np.array_equal(after.last_24h, before.last_24h)
+
+    text = render_stats(after)
+    assert "5,000" in text and "User\\_" in text
+
+    # The async pair round-trips too, and the snapshot does not share the live arrays
+    arrays, _ = tracker.snapshot()
+    assert not np.shares_memory(arrays["-800.posters"], tracker.chats[-800].posters.table)
+    asyncio.run(tracker.save_async(str(tmp_path / "async.npz")))
+    restored = ActivityTracker()
+    asyncio.run(restored.load_async(str(tmp_path / "async.npz")))
+    assert restored.chats[-800].summary(now).top_posters == before.top_posters
+    print("✅ Memory stays fixed and snapshots restore")
+
+def test_idle_chats_evicted():
+    """Test that chats without recent messages are dropped"""
+    print("🔍 Testing idle chat eviction...")
+    tracker = ActivityTracker()
+    tracker.chat(-1).add(1, "Old", START)
+    tracker.chat(-2).add(1, "New", START + 80 * 86400)
+    assert tracker.evict_idle(now=START + 100 * 86400, idle_days=30) == 1
+    assert list(tracker.chats) == [-2]
+    print("✅ Idle chats are evicted")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_count_min_and_heavy_hitters()
+    test_hyperloglog_accuracy()
+    test_hourly_histogram()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_memory_is_fixed_and_snapshot(Path(tmp))
+    test_idle_chats_evicted()
+    print("🎉 All analytics tests passed!")
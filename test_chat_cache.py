@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for cached chat lookups
+Verifies concurrent misses share one API call, rendered replies are reused and
+service updates invalidate both
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Chat, ChatMemberMember, Message, Update, User
+from telegram.error import BadRequest
+from utils import cache
+from utils.helpers import find_known_user
+
+class CountingBot:
+    """Answers get_chat and get_chat_member_count slowly, counting the calls"""
+
+    def __init__(self):
+        self.calls = {'get_chat': 0, 'get_chat_member_count': 0}
+        self.members = 10
+
+    async def get_chat(self, chat_id):
+        self.calls['get_chat'] += 1
+        await asyncio.sleep(0.01)
+        return Chat(chat_id, Chat.SUPERGROUP, title=f"Chat {self.calls['get_chat']}")
+
+    async def get_chat_member_count(self, chat_id):
+        self.calls['get_chat_member_count'] += 1
+        await asyncio.sleep(0.01)
+        return self.members
+
+def service_message(chat_id, **kwargs):
+    chat = Chat(chat_id, Chat.SUPERGROUP)
+    message = Message(1, datetime.now(timezone.utc), chat, from_user=User(5, "Admin", False), **kwargs)
+    return Update(1, message=message)
+
+def test_concurrent_misses_share_a_call():
+    """Test that a burst of lookups for one chat makes one call per endpoint"""
+    print("🔍 Testing single-flight chat lookups...")
+    bot = CountingBot()
+    cache.invalidate_chat(-300, info=True, members=True)
+
+    async def scenario():
+        chats = await asyncio.gather(*(cache.get_chat_info(bot, -300) for _ in range(10)))
+        counts = await asyncio.gather(*(cache.get_member_count(bot, -300) for _ in range(10)))
+        return chats, counts
+
+    chats, counts = asyncio.run(scenario())
+    assert {chat.title for chat in chats} == {"Chat 1"}
+    assert set(counts) == {10}
+    assert bot.calls == {'get_chat': 1, 'get_chat_member_count': 1}
+
+    # Served from the cache afterwards
+    asyncio.run(cache.get_chat_info(bot, -300))
+    assert bot.calls['get_chat'] == 1
+    print("✅ Chat lookups are shared and cached")
+
+def test_service_updates_invalidate():
+    """Test that joins and title changes drop the affected entries only"""
+    print("🔍 Testing invalidation by service updates...")
+    bot = CountingBot()
+    cache.invalidate_chat(-400, info=True, members=True)
+    asyncio.run(cache.get_chat_info(bot, -400))
+    asyncio.run(cache.get_member_count(bot, -400))
+
+    bot.members = 11
+    cache.invalidate_for_update(service_message(-400, new_chat_members=(User(6, "New", False),)))
+    assert asyncio.run(cache.get_member_count(bot, -400)) == 11
+    assert asyncio.run(cache.get_chat_info(bot, -400)).title == "Chat 1"
+
+    cache.invalidate_for_update(service_message(-400, new_chat_title="Renamed"))
+    assert asyncio.run(cache.get_chat_info(bot, -400)).title == "Chat 2"
+    assert bot.calls == {'get_chat': 2, 'get_chat_member_count': 2}
+    print("✅ Service updates invalidate the cache")
+
+def test_failed_fetch_not_cached():
+    """Test that an API error reaches every waiter and is not cached"""
+    print("🔍 Testing failed lookups...")
+
+    class FailingBot(CountingBot):
+        async def get_chat_member_count(self, chat_id):
+            self.calls['get_chat_member_count'] += 1
+            raise RuntimeError("chat not found")
+
+    bot = FailingBot()
+    cache.invalidate_chat(-500, members=True)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_member_count(bot, -500) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.MEMBER_COUNT_CACHE.get(-500) is None
+    assert bot.calls['get_chat_member_count'] == 1
+    print("✅ Failed lookups are not cached")
+
+def test_rendered_responses_follow_versions():
+    """Test that a reply is rendered once per data version"""
+    print("🔍 Testing rendered response cache...")
+    renders = []
+
+    def render():
+        renders.append(1)
+        return f"render {len(renders)}"
+
+    def show():
+        return asyncio.run(cache.cached_response(-600, "rules", ('rules',), render))
+
+    assert show() == "render 1"
+    assert show() == "render 1"
+    # Other topics changing leave the reply alone
+    cache.invalidate_chat(-600, admins=True, info=True, members=True)
+    assert show() == "render 1"
+    cache.bump_version(-600, 'rules')
+    assert show() == "render 2"
+    assert len(renders) == 2
+
+    # Async renderers and per-command topics
+    async def render_admins():
+        return f"admins v{cache.data_version(-600, 'admins')}"
+    first = asyncio.run(cache.cached_response(-600, "admins", ('admins',), render_admins))
+    cache.invalidate_for_update(service_message(-600, migrate_to_chat_id=-1006))
+    assert asyncio.run(cache.cached_response(-600, "admins", ('admins',), render_admins)) != first
+    print("✅ Rendered responses follow data versions")
+
+class MemberBot:
+    """Answers get_chat_member for the users in one chat"""
+
+    def __init__(self, members):
+        self.members = members
+        self.calls = 0
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls += 1
+        if user_id not in self.members:
+            raise BadRequest("User not found")
+        return ChatMemberMember(self.members[user_id])
+
+def test_username_index_follows_renames():
+    """Test that a rename drops the old username and index hits are confirmed in the chat"""
+    print("🔍 Testing username index...")
+    cache.remember_user(User(21, "Dana", False, username="dana_old"))
+    cache.remember_user(User(21, "Dana", False, username="Dana_New"))
+    assert cache.find_user_by_username("@dana_old") is None
+    assert cache.find_user_by_username("@dana_new").id == 21
+
+    # Someone else took the old name before the rename was seen
+    cache.remember_user(User(22, "Eve", False, username="eve"))
+    cache.remember_user(User(23, "Frank", False, username="eve"))
+    cache.remember_user(User(22, "Eve", False, username="eve2"))
+    assert cache.find_user_by_username("eve").id == 23
+
+    bot = MemberBot({21: User(21, "Dana", False, username="Dana_New")})
+    assert asyncio.run(find_known_user(bot, -900, "dana_new")).id == 21
+    assert asyncio.run(find_known_user(bot, -900, "eve")) is None
+    assert asyncio.run(find_known_user(bot, -900, "nobody")) is None
+    assert bot.calls == 2
+    print("✅ Username index follows renames")
+
+if __name__ == "__main__":
+    test_concurrent_misses_share_a_call()
+    test_service_updates_invalidate()
+    test_failed_fetch_not_cached()
+    test_rendered_responses_follow_versions()
+    test_username_index_follows_renames()
+    print("🎉 All chat cache tests passed!")
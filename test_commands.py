@@ -43,11 +43,20 @@ class MockBot:
         
     async def get_chat_administrators(self, chat_id):
         mock_admin = Mock()
+        mock_admin.status = 'administrator'
         mock_admin.user = Mock()
         mock_admin.user.id = 987654321
         mock_admin.user.username = "testadmin"
         mock_admin.user.first_name = "Test Admin"
-        return [mock_admin]
+        
+        # The bot itself is an admin too
+        mock_bot_admin = Mock()
+        mock_bot_admin.status = 'administrator'
+        mock_bot_admin.user = Mock()
+        mock_bot_admin.user.id = self.id
+        mock_bot_admin.user.username = "testbot"
+        mock_bot_admin.user.first_name = "Test Bot"
+        return [mock_admin, mock_bot_admin]
 
 def create_mock_update(command_text="/start", user_id=987654321, chat_id=-1001234567890):
     """Create a mock update object for testing"""
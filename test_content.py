@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the content store
+Verifies content is read once, served from memory and hot-swapped on change
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.content import ContentStore, Entry, SearchUnavailable, QUOTES, JOKES, FACTS
+from utils.corpus import MappedCorpus
+from utils.search import MappedIndex
+
+def bump_mtime(path):
+    """Make sure a rewrite is seen even on filesystems with coarse timestamps"""
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+def test_bundled_content():
+    """Test that the shipped data files load with text on every entry"""
+    print("🔍 Testing bundled content...")
+    for store in (QUOTES, JOKES, FACTS):
+        assert len(store) > 0
+        assert isinstance(store.entries, tuple)
+        assert all(isinstance(entry.text, str) and entry.text for entry in store.entries)
+    assert all(entry.author for entry in QUOTES.entries)
+    print("✅ Bundled content works")
+
+def test_hot_reload(tmp_path):
+    """Test that a changed file is swapped in and an unchanged one is not re-read"""
+    print("🔍 Testing hot reload...")
+    path = tmp_path / "jokes.json"
+    path.write_text(json.dumps({"jokes": ["first", {"text": "second"}]}))
+    store = ContentStore(str(path), "jokes", ["fallback"])
+    assert store.entries == (Entry("first"), Entry("second"))
+    assert store.reload() is False
+
+    path.write_text(json.dumps({"jokes": [{"text": "third", "author": "Someone"}]}))
+    bump_mtime(path)
+    assert store.reload() is True
+    assert store.random() == Entry("third", "Someone")
+
+    # A broken edit keeps the last good content
+    path.write_text("{not json")
+    bump_mtime(path)
+    assert store.reload() is False
+    assert store.entries == (Entry("third", "Someone"),)
+    print("✅ Hot reload works")
+
+def test_mapped_pack(tmp_path):
+    """Test that a JSONL pack is served through its offset index"""
+    print("🔍 Testing content pack...")
+    json_path = tmp_path / "facts.json"
+    pack_path = tmp_path / "facts.jsonl"
+    json_path.write_text(json.dumps({"facts": ["from json"]}))
+    store = ContentStore(str(json_path), "facts", pack=str(pack_path))
+    assert store.entries == (Entry("from json"),)
+
+    pack_path.write_text('{"text": "one"}\n\n"two"\n{"text": "three", "author": "X"}')
+    assert store.reload() is True
+    assert isinstance(store.entries, MappedCorpus)
+    assert len(store) == 3
+    assert store.entries[1] == Entry("two")
+    assert store.entries[2] == Entry("three", "X")
+    assert store.random() in (Entry("one"), Entry("two"), Entry("three", "X"))
+
+    # Appending to the pack rebuilds the stale index on reload
+    with open(pack_path, 'a') as f:
+        f.write('\n{"text": "four"}\n')
+    bump_mtime(pack_path)
+    assert store.reload() is True
+    assert len(store) == 4 and store.entries[3] == Entry("four")
+
+    # A search never builds the pack's keyword index inline, refresh_index() does it off the loop
+    terms_path = tmp_path / "facts.jsonl.terms"
+    try:
+        store.search("thr")
+        assert False
+    except SearchUnavailable:
+        pass
+    assert not terms_path.exists()
+    assert store.refresh_index() is True
+    assert store.refresh_index() is False
+    assert store.search("thr").author == "X"
+    assert isinstance(store.index, MappedIndex) and terms_path.exists()
+    assert store.index.search("o") == [0]
+    assert store.search("fo") == Entry("four")
+    assert store.search("five") is None
+
+    # A stale saved index is not used, and not rebuilt by a search either
+    with open(pack_path, 'a') as f:
+        f.write('{"text": "five"}\n')
+    bump_mtime(pack_path)
+    assert store.reload() is True
+    stale = terms_path.stat().st_mtime_ns
+    try:
+        store.search("five")
+        assert False
+    except SearchUnavailable:
+        pass
+    assert terms_path.stat().st_mtime_ns == stale
+    assert store.refresh_index() is True
+    assert store.search("five") == Entry("five")
+    print("✅ Content pack works")
+
+def test_keyword_search(tmp_path):
+    """Test that keyword search matches words and prefixes, with every word required"""
+    print("🔍 Testing keyword search...")
+    path = tmp_path / "quotes.json"
+    path.write_text(json.dumps({"quotes": [
+        {"text": "Courage is grace under pressure.", "author": "Ernest Hemingway"},
+        {"text": "Success is not final, failure is not fatal: it is the courage to continue that counts.",
+         "author": "Winston Churchill"},
+        {"text": "Stay hungry, stay foolish.", "author": "Steve Jobs"}
+    ]}))
+    store = ContentStore(str(path), "quotes")
+
+    assert store.index.search("courage") == [0, 1]
+    assert store.index.search("COUR") == [0, 1]
+    assert store.index.search("courage churchill") == [1]
+    assert store.index.search("the courage") == [0, 1]
+    assert store.search("hungry").author == "Steve Jobs"
+    assert store.search("jobs stay").text == "Stay hungry, stay foolish."
+    assert store.search("bravery") is None
+    assert store.search("!!!") is None
+    print("✅ Keyword search works")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_bundled_content()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_hot_reload(Path(tmp))
+        test_mapped_pack(Path(tmp))
+        test_keyword_search(Path(tmp))
+    print("🎉 All content tests passed!")
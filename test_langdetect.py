@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for language detection
+Verifies every supported language is recognised, alone and in batches
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.langdetect import get_detector, detect_languages, Detection
+
+SENTENCES = {
+    "en": "What time does the shop open tomorrow?",
+    "es": "¿Dónde está la estación de tren?",
+    "fr": "J'aime beaucoup cette chanson",
+    "de": "Wo ist der Bahnhof, bitte?",
+    "it": "Mi piace molto questa canzone",
+    "pt": "Eu gosto muito desta música",
+    "ru": "Мне очень нравится эта песня",
+    "uk": "Мені дуже подобається ця пісня",
+    "zh": "我很喜欢这首歌",
+    "ja": "この歌がとても好きです",
+    "ko": "이 노래를 정말 좋아해요",
+    "ar": "أحب هذه الأغنية كثيرا",
+    "hi": "मुझे यह गाना बहुत पसंद है",
+    "tr": "Bu şarkıyı çok seviyorum",
+    "nl": "Ik vind dit liedje heel mooi",
+    "pl": "Bardzo lubię tę piosenkę"
+}
+
+def test_detects_every_language():
+    """Test one sentence per supported language"""
+    print("🔍 Testing language detection...")
+    detector = get_detector()
+    assert len(detector.languages) == 16
+    for language, sentence in SENTENCES.items():
+        detection = detector.detect(sentence)
+        assert detection.language == language, (sentence, detection)
+        assert detection.confidence > 0.5
+    # Short greetings are covered by the phrasebook
+    assert detector.detect("merci").language == "fr"
+    print("✅ Language detection works")
+
+def test_batch_matches_single():
+    """Test that a batch gives the same answers as one-by-one calls, empty texts included"""
+    print("🔍 Testing batch detection...")
+    texts = list(SENTENCES.values()) * 20 + ["", "123 !!!"]
+    detections = detect_languages(texts)
+    assert len(detections) == len(texts)
+    assert [d.language for d in detections[:16]] == list(SENTENCES)
+    assert detections[-2:] == [Detection(None, 0.0)] * 2
+    assert detections[5] == get_detector().detect(texts[5])
+    print("✅ Batch detection works")
+
+if __name__ == "__main__":
+    test_detects_every_language()
+    test_batch_matches_single()
+    print("🎉 All language detection tests passed!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for shutdown bookkeeping
+Verifies the saved update offset skips handled updates on restart and
+updates still in flight at the drain deadline are cancelled and recorded
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Chat, Message, Update, User
+from utils.lifecycle import OFFSET_MAX_AGE, RuntimeState, UpdateTracker
+
+def make_update(update_id):
+    message = Message(update_id, datetime.now(timezone.utc), Chat(1, Chat.PRIVATE),
+                      from_user=User(1, "Me", False), text="hi")
+    return Update(update_id, message=message)
+
+def test_offset_skips_handled_updates(tmp_path):
+    """Test that updates up to the saved offset are skipped, except handed over ones"""
+    print("🔍 Testing saved update offset...")
+    state = RuntimeState(str(tmp_path / "runtime_state.json"))
+    state.save(20, [make_update(18)], [make_update(19)], last_update_at=time.time())
+    assert state.last_update_id == 20
+
+    tracker = UpdateTracker()
+    pending = state.take_pending(None)
+    assert [update.update_id for update in pending] == [18]
+    tracker.resume_after(state.last_update_id, pending)
+    assert not tracker.already_processed(make_update(18))
+    assert tracker.already_processed(make_update(19))
+    assert tracker.already_processed(make_update(20))
+    assert not tracker.already_processed(make_update(21))
+
+    # Interrupted ids are recorded once and then cleared with the pending updates
+    saved = json.loads((tmp_path / "runtime_state.json").read_text())
+    assert saved['pending_updates'] == [] and saved['interrupted_updates'] == []
+
+    # Update ids restart at random after a week without updates
+    state.save(20, [], last_update_at=time.time() - OFFSET_MAX_AGE - 1)
+    assert state.last_update_id is None
+    print("✅ Saved update offset works")
+
+def test_cancel_in_flight():
+    """Test that handlers still running are cancelled and returned for the record"""
+    print("🔍 Testing in-flight cancellation...")
+    tracker = UpdateTracker()
+
+    async def handle(update, delay):
+        tracker.begin(update)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            tracker.end(update)
+
+    async def scenario():
+        quick = asyncio.create_task(handle(make_update(1), 0))
+        slow = asyncio.create_task(handle(make_update(2), 60))
+        await asyncio.sleep(0.01)
+        interrupted = tracker.cancel_in_flight()
+        await asyncio.gather(quick, slow, return_exceptions=True)
+        return interrupted, slow
+
+    interrupted, slow = asyncio.run(scenario())
+    assert [update.update_id for update in interrupted] == [2]
+    assert slow.cancelled()
+    assert tracker.in_flight == 0 and not tracker.active
+    print("✅ In-flight updates are cancelled and recorded")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_offset_skips_handled_updates(Path(tmp))
+    test_cancel_in_flight()
+    print("🎉 All lifecycle tests passed!")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script for the event loop monitor
+Verifies that a blocking call is detected and its stack captured
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.loopmon import LoopMonitor
+
+def blocking_step():
+    """Synchronous work that holds the loop"""
+    time.sleep(0.4)
+
+def test_block_detected():
+    """Test that a stalled loop is reported with the blocking stack"""
+    print("🔍 Testing loop block detection...")
+    monitor = LoopMonitor(interval=0.05, threshold=0.1)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        blocking_step()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+    snapshot = monitor.snapshot()
+    assert snapshot['blocks'] == 1
+    assert snapshot['max_lag_ms'] >= 300
+    block = snapshot['recent_blocks'][0]
+    assert "blocking_step" in block['stack']
+    assert block['duration'] >= 0.3
+    assert not snapshot['running']
+    print("✅ Loop block detection works")
+
+if __name__ == "__main__":
+    test_block_detected()
+    print("🎉 All loop monitor tests passed!")
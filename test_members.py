@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the member registry
+Verifies joins, leaves and messages are tracked, the member count follows them
+and the journal restores the registry after a restart
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import (Chat, ChatMemberAdministrator, ChatMemberLeft, ChatMemberMember, ChatMemberUpdated,
+                      Message, Update, User)
+from handlers.info import lookup_member
+from utils import members
+from utils.storage import JsonStore
+
+CHAT = Chat(-700, Chat.SUPERGROUP)
+ALICE = User(1, "Alice", False)
+BOB = User(2, "Bob", False)
+CAROL = User(3, "Carol", False)
+
+def at(seconds):
+    return datetime.fromtimestamp(1_700_000_000 + seconds, timezone.utc)
+
+def message(seconds, user, **kwargs):
+    return Update(seconds, message=Message(seconds, at(seconds), CHAT, from_user=user, text="hi", **kwargs))
+
+def member_update(seconds, old, new):
+    return Update(seconds, chat_member=ChatMemberUpdated(CHAT, ALICE, at(seconds), old, new))
+
+class CountBot:
+    """Answers get_chat_member_count with a fixed count"""
+
+    def __init__(self, count):
+        self.count = count
+        self.calls = 0
+
+    async def get_chat_member_count(self, chat_id):
+        self.calls += 1
+        return self.count
+
+class LookupBot:
+    """Answers get_chat_member as Telegram would for a user who left, counting the calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls += 1
+        return ChatMemberLeft(User(user_id, "Gone", False))
+
+    async def get_chat_administrators(self, chat_id):
+        return ()
+
+def make_registry(tmp_path):
+    return members.MemberRegistry(str(tmp_path / "members.journal"), JsonStore(str(tmp_path / "counts.json")))
+
+def test_events_are_tracked(tmp_path):
+    """Test that service messages, chat_member updates and messages update the rows"""
+    print("🔍 Testing member tracking...")
+    registry = make_registry(tmp_path)
+    registry.observe(message(10, ALICE, new_chat_members=(BOB,)))
+    # The chat_member update for the same join must not count it twice
+    registry.observe(member_update(11, ChatMemberLeft(BOB), ChatMemberMember(BOB)))
+    registry.observe(message(20, BOB))
+    registry.observe(message(30, BOB))
+    registry.observe(message(40, CAROL, left_chat_member=CAROL))
+
+    bob = registry.get(-700, 2)
+    assert bob.present and bob.joined == at(10).timestamp() and bob.confirmed
+    assert bob.messages == 2 and bob.last_seen == at(30).timestamp()
+    assert registry.get(-700, 3).status == "left"
+    # The join message's sender is not counted as a message
+    assert registry.get(-700, 1) is None
+    # Someone only seen posting is assumed to be a member, without an event to confirm it
+    registry.observe(message(35, ALICE))
+    assert registry.get(-700, 1).present and not registry.get(-700, 1).confirmed
+
+    registry.observe(member_update(50, ChatMemberMember(BOB), ChatMemberAdministrator(BOB, *([False] * 12))))
+    assert registry.get(-700, 2).status == "administrator"
+
+    # Private chats are not tracked
+    registry.observe(Update(60, message=Message(60, at(60), Chat(5, Chat.PRIVATE), from_user=ALICE, text="hi")))
+    assert 5 not in registry.chats
+    print("✅ Member events are tracked")
+
+def test_member_count_follows_events(tmp_path):
+    """Test that the count is seeded once and then follows joins and leaves"""
+    print("🔍 Testing tracked member count...")
+    registry = make_registry(tmp_path)
+    bot = CountBot(100)
+    assert asyncio.run(registry.member_count(bot, -700)) == 100
+
+    registry.observe(message(10, ALICE, new_chat_members=(BOB, CAROL)))
+    registry.observe(member_update(11, ChatMemberLeft(BOB), ChatMemberMember(BOB)))
+    # Someone who was in the chat before the bot started tracking leaves
+    registry.observe(message(20, ALICE, left_chat_member=ALICE))
+    registry.observe(message(21, ALICE, left_chat_member=ALICE))
+    assert asyncio.run(registry.member_count(bot, -700)) == 101
+    assert bot.calls == 1
+    print("✅ Member count follows joins and leaves")
+
+def test_lookup_trusts_only_events(tmp_path):
+    """Test that /info asks Telegram about users the registry only saw posting"""
+    print("🔍 Testing member lookups...")
+    registry = make_registry(tmp_path)
+    registry.observe(message(10, ALICE, new_chat_members=(BOB,)))
+    registry.observe(message(20, CAROL))
+    bot = LookupBot()
+
+    assert asyncio.run(lookup_member(bot, -701, BOB, registry.get(-700, 2))).status == "member"
+    assert bot.calls == 0
+    assert asyncio.run(lookup_member(bot, -701, CAROL, registry.get(-700, 3))).status == "left"
+    assert bot.calls == 1
+    print("✅ Member lookups trust only events")
+
+def test_journal_replay_and_compaction(tmp_path):
+    """Test that a new registry reads back the journal, including after compaction"""
+    print("🔍 Testing member journal...")
+    registry = make_registry(tmp_path)
+    for i in range(1, 1200):
+        registry.observe(message(i, BOB))
+    registry.observe(message(5000, ALICE, new_chat_members=(CAROL,)))
+    # Compaction keeps the journal to about one record per row
+    assert registry.records_on_disk < 1100
+
+    # A torn record at the end is cut off, and a record with an unknown status is skipped
+    with open(tmp_path / "members.journal", 'ab') as f:
+        f.write(members.RECORD.pack(-700, 9, 0.0, 1.0, 1.0, 0, 200))
+        f.write(b"\0" * 7)
+
+    restored = make_registry(tmp_path)
+    assert restored.get(-700, 2).messages == 1199 and not restored.get(-700, 2).confirmed
+    assert restored.get(-700, 3).joined == at(5000).timestamp() and restored.get(-700, 3).confirmed
+    assert restored.get(-700, 9) is None
+    assert restored.chats[-700].present() == 2
+    assert restored.chats[-700].active_since(at(1000).timestamp()) == 1
+    assert os.path.getsize(tmp_path / "members.journal") % members.RECORD.size == 0
+
+    # Records appended after the torn tail replay correctly
+    restored.observe(message(6000, CAROL))
+    restored.observe(message(6001, ALICE, left_chat_member=BOB))
+    replayed = make_registry(tmp_path)
+    assert replayed.get(-700, 3).messages == 1
+    assert replayed.get(-700, 3).last_seen == at(6000).timestamp()
+    assert replayed.get(-700, 2).status == "left"
+    assert replayed.get(-700, 2).messages == 1199
+    print("✅ Member journal restores the registry")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_events_are_tracked, test_member_count_follows_events, test_lookup_trusts_only_events,
+                 test_journal_replay_and_compaction):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("🎉 All member registry tests passed!")
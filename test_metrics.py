@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics registry
+Verifies the text format and histogram quantile estimates
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.decorators import instrument_handler
+from utils.metrics import HANDLER_ERRORS, Registry, bucket_quantile, install_error_counter
+
+def test_render_format():
+    """Test the Prometheus text exposition output"""
+    print("🔍 Testing metrics rendering...")
+    registry = Registry()
+    calls = registry.counter("demo_calls", "Demo calls", ("method",))
+    depth = registry.gauge("demo_depth", "Demo depth")
+    latency = registry.histogram("demo_seconds", "Demo latency", ("handler",), buckets=(0.1, 1.0))
+
+    calls.labels("sendMessage").inc()
+    calls.labels("sendMessage").inc(2)
+    depth.set_function(lambda: 7)
+    latency.labels("ban").observe(0.05)
+    latency.labels("ban").observe(0.5)
+    latency.labels("ban").observe(3)
+
+    text = registry.render()
+    assert "# TYPE demo_calls_total counter" in text
+    assert 'demo_calls_total{method="sendMessage"} 3' in text
+    assert "demo_depth 7" in text
+    assert 'demo_seconds_bucket{handler="ban",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{handler="ban",le="1"} 2' in text
+    assert 'demo_seconds_bucket{handler="ban",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{handler="ban"} 3' in text
+    print("✅ Metrics rendering works")
+
+def test_bucket_quantile():
+    """Test quantile estimation from bucket counts"""
+    print("🔍 Testing quantile estimation...")
+    bounds = (0.1, 0.2, 0.5)
+    assert bucket_quantile(0.5, bounds, [0, 0, 0, 0]) is None
+    assert abs(bucket_quantile(0.5, bounds, [0, 10, 0, 0]) - 0.15) < 1e-9
+    assert bucket_quantile(0.99, bounds, [5, 0, 0, 5]) == 0.5
+    print("✅ Quantile estimation works")
+
+def test_handler_errors_counted_once():
+    """Test that a handler run counts one error whether it logs, raises or both"""
+    print("🔍 Testing handler error counting...")
+    install_error_counter()
+    logger = logging.getLogger("test_metrics")
+
+    @instrument_handler("test_logs_and_raises")
+    async def logs_and_raises(update, context):
+        logger.error("first")
+        logger.error("second")
+        raise ValueError("boom")
+
+    @instrument_handler("test_logs")
+    async def logs(update, context):
+        logger.error("handled")
+
+    for _ in range(2):
+        try:
+            asyncio.run(logs_and_raises(None, None))
+        except ValueError:
+            pass
+        asyncio.run(logs(None, None))
+    assert HANDLER_ERRORS.labels("test_logs_and_raises").value == 2
+    assert HANDLER_ERRORS.labels("test_logs").value == 2
+    print("✅ Handler errors are counted once per run")
+
+if __name__ == "__main__":
+    test_render_format()
+    test_bucket_quantile()
+    test_handler_errors_counted_once()
+    print("🎉 All metrics tests passed!")
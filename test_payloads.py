@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for precomputed help and menu payloads
+Verifies every keyboard button leads to a prepared page and rebuilding picks up config changes
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import INFO_COMMANDS
+from handlers import general
+
+def test_buttons_have_pages():
+    """Test that every callback a prepared keyboard sends has a page"""
+    print("🔍 Testing payload keyboards...")
+    payloads = list(general.PAYLOADS.values()) + list(general.CALLBACK_PAYLOADS.values())
+    for payload in payloads:
+        if payload.reply_markup is None:
+            continue
+        for row in payload.reply_markup.inline_keyboard:
+            for button in row:
+                assert button.callback_data in general.CALLBACK_PAYLOADS, button.callback_data
+    assert "{user_name}" in general.PAYLOADS["start_private"].text
+    print("✅ Every button has a prepared page")
+
+def test_rebuild_follows_config():
+    """Test that build_payloads() renders the current command tables"""
+    print("🔍 Testing payload rebuild...")
+    INFO_COMMANDS["example"] = "🧪 Example command"
+    try:
+        general.build_payloads()
+        assert "`/example` - 🧪 Example command" in general.CALLBACK_PAYLOADS["info_help"].text
+        assert f"📊 Information ({len(INFO_COMMANDS)})" in str(general.PAYLOADS["menu"].reply_markup.to_dict())
+    finally:
+        del INFO_COMMANDS["example"]
+        general.build_payloads()
+    assert "/example" not in general.CALLBACK_PAYLOADS["info_help"].text
+    print("✅ Payloads are rebuilt from the config")
+
+if __name__ == "__main__":
+    test_buttons_have_pages()
+    test_rebuild_follows_config()
+    print("🎉 All payload tests passed!")
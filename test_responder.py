@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for response coalescing
+Verifies bursts to one chat become one send and independent sends run concurrently
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from handlers.general import render_welcome
+from utils.responder import Responder, gather_sends, split_text
+
+class FakeBot:
+    """Records sent messages"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.sent.append((chat_id, text))
+        return len(self.sent)
+
+def test_burst_is_coalesced():
+    """Test that posts within the window are merged per chat and key"""
+    print("🔍 Testing coalescing...")
+    bot = FakeBot()
+
+    async def scenario():
+        responder = Responder(window=0.05)
+        welcome = render_welcome("Test Group")
+        first = responder.post(bot, -100, "Alice", key="welcome", render=welcome)
+        for name in ("Bob", "Carol"):
+            responder.post(bot, -100, name, key="welcome", render=welcome)
+        responder.post(bot, -200, "Dave", key="welcome", render=welcome)
+        assert responder.pending == 4 and not bot.sent
+
+        assert len(await asyncio.wait_for(first, 1)) == 1
+        await asyncio.sleep(0.05)
+        assert responder.pending == 0
+
+        # Shutdown sends whatever is still waiting
+        responder.post(bot, -100, "late")
+        assert await responder.flush_all() == 1
+
+    asyncio.run(scenario())
+    texts = dict(bot.sent[:2])
+    assert len(bot.sent) == 3
+    assert "Hi Alice, Bob, Carol!" in texts[-100]
+    assert "Hi Dave!" in texts[-200]
+    assert bot.sent[2] == (-100, "late")
+    print("✅ Coalescing works")
+
+def test_split_text():
+    """Test that long batches are split at paragraphs within the limit"""
+    print("🔍 Testing message splitting...")
+    text = "\n\n".join(["a" * 30] * 10)
+    chunks = split_text(text, limit=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+    assert split_text("b" * 250, limit=100) == ["b" * 100, "b" * 100, "b" * 50]
+    print("✅ Message splitting works")
+
+def test_gather_sends_is_bounded():
+    """Test that independent calls overlap, up to the limit, and errors are returned"""
+    print("🔍 Testing concurrent sends...")
+    running = {'now': 0, 'peak': 0}
+
+    async def call(i):
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        await asyncio.sleep(0.01)
+        running['now'] -= 1
+        if i == 3:
+            raise ValueError("message to delete not found")
+        return i
+
+    results = asyncio.run(gather_sends((call(i) for i in range(10)), limit=4))
+    assert running['peak'] == 4
+    assert isinstance(results[3], ValueError)
+    assert [r for r in results if not isinstance(r, Exception)] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    print("✅ Concurrent sends work")
+
+if __name__ == "__main__":
+    test_burst_is_coalesced()
+    test_split_text()
+    test_gather_sends_is_bounded()
+    print("🎉 All responder tests passed!")
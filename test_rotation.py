@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for per-chat content rotation
+Verifies the lazy permutation and that chats see no repeats within a cycle
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.rotation import RECORD, FeistelPermutation, Rotation, RotationJournal
+
+def test_permutation_is_bijection():
+    """Test that every size maps range(n) onto itself exactly once"""
+    print("🔍 Testing Feistel permutation...")
+    for n in (1, 2, 3, 7, 16, 17, 100, 1000, 4097):
+        for seed in (0, 1, 12345):
+            permutation = FeistelPermutation(n, seed)
+            assert sorted(permutation[i] for i in range(n)) == list(range(n))
+    assert [FeistelPermutation(50, 1)[i] for i in range(50)] != [FeistelPermutation(50, 2)[i] for i in range(50)]
+    print("✅ Feistel permutation works")
+
+def test_rotation_without_repeats(tmp_path):
+    """Test that each chat cycles through every entry before repeating"""
+    print("🔍 Testing per-chat rotation...")
+    rotation = Rotation("jokes", RotationJournal(str(tmp_path / "rotation.journal")))
+
+    first = [rotation.next_index(-100, 20) for _ in range(20)]
+    assert sorted(first) == list(range(20))
+    second = [rotation.next_index(-100, 20) for _ in range(20)]
+    assert sorted(second) == list(range(20))
+    assert second[0] != first[-1]
+
+    # Other chats have their own position, each pick appends one fixed-width record
+    assert sorted(rotation.next_index(-200, 20) for _ in range(20)) == list(range(20))
+    assert (tmp_path / "rotation.journal").stat().st_size == 60 * RECORD.size
+
+    # Content changing size starts a new cycle
+    assert sorted(rotation.next_index(-100, 5) for _ in range(5)) == list(range(5))
+    print("✅ Per-chat rotation works")
+
+def test_journal_replay_and_compaction(tmp_path):
+    """Test that positions survive a restart, a torn tail is dropped and the journal compacts"""
+    print("🔍 Testing rotation journal...")
+    path = tmp_path / "rotation.journal"
+    rotation = Rotation("quotes", RotationJournal(str(path)))
+    seen = [rotation.next_index(-100, 10) for _ in range(4)]
+
+    # A torn record at the end is cut off on replay
+    with open(path, 'ab') as f:
+        f.write(b"\x01" * (RECORD.size // 2))
+    journal = RotationJournal(str(path))
+    assert journal.get("quotes", -100)[1] == 4 and journal.get("quotes", -100)[3] == seen[-1]
+    assert path.stat().st_size == 4 * RECORD.size
+    restarted = Rotation("quotes", journal)
+    assert sorted(seen + [restarted.next_index(-100, 10) for _ in range(6)]) == list(range(10))
+
+    # Rewriting leaves one record per chat state
+    journal._dirty.add(("quotes", -100))
+    journal.records_on_disk = 10 ** 6
+    assert journal.flush()
+    assert path.stat().st_size == RECORD.size
+    assert RotationJournal(str(path)).get("quotes", -100) == journal.get("quotes", -100)
+    print("✅ Rotation journal works")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_permutation_is_bijection()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_rotation_without_repeats(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_journal_replay_and_compaction(Path(tmp))
+    print("🎉 All rotation tests passed!")
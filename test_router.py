@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-dispatch command router
+Verifies parsing, aliases, prefixes, @BotName targeting and disabled commands
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import Mock
+from telegram import Update, Message, Chat
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import utils.router as router_module
+from utils.router import CommandRouter, parse_command
+
+async def ping(update, context):
+    return "ping"
+
+async def pong(update, context):
+    return "pong"
+
+def create_update(text, chat_id=-100123, bot_username="NyroxBot"):
+    """Create a mock update carrying a text message"""
+    chat = Mock(spec=Chat)
+    chat.id = chat_id
+
+    message = Mock(spec=Message)
+    message.text = text
+    message.chat = chat
+    message.get_bot.return_value.username = bot_username
+
+    update = Mock(spec=Update)
+    update.message = message
+    return update
+
+def create_router(tmp_path, monkeypatch):
+    """Create a router backed by a temporary disabled-commands file"""
+    monkeypatch.setattr(router_module, "DISABLED_COMMANDS_FILE", str(tmp_path / "disabled_commands.json"))
+    router = CommandRouter(prefixes=("/", "!"), aliases={"p": "ping"}, protected=("pong",))
+    router.add_command("ping", ping)
+    router.add_command("pong", pong)
+    return router
+
+def test_parse_command():
+    """Test command token parsing"""
+    print("🔍 Testing command parsing...")
+    assert parse_command("/Ping a b") == ("ping", "", ["a", "b"])
+    assert parse_command("/ping@NyroxBot x") == ("ping", "NyroxBot", ["x"])
+    assert parse_command("!ping", ("/", "!")) == ("ping", "", [])
+    assert parse_command("hello /ping") is None
+    assert parse_command("/") is None
+    assert parse_command("") is None
+    print("✅ Command parsing works")
+
+def test_dispatch(tmp_path, monkeypatch):
+    """Test routing to callbacks, aliases and bot targeting"""
+    print("🔍 Testing dispatch...")
+    router = create_router(tmp_path, monkeypatch)
+
+    entry, args = router.check_update(create_update("/ping 1 2"))
+    assert entry.name == "ping" and args == ["1", "2"]
+    assert router.check_update(create_update("!p"))[0].name == "ping"
+    assert router.check_update(create_update("/ping@nyroxbot"))[0].name == "ping"
+    assert router.check_update(create_update("/ping@OtherBot")) is None
+    assert router.check_update(create_update("/unknown")) is None
+
+    context = Mock()
+    update = create_update("/pong now")
+    result = asyncio.run(router.handle_update(update, None, router.check_update(update), context))
+    assert result == "pong" and context.args == ["now"]
+    print("✅ Dispatch works")
+
+def test_disabled_commands(tmp_path, monkeypatch):
+    """Test per-chat disabled command bitsets"""
+    print("🔍 Testing disabled commands...")
+    router = create_router(tmp_path, monkeypatch)
+
+    assert router.disable(-100123, "p")
+    assert router.check_update(create_update("/ping")) is None
+    assert router.check_update(create_update("/ping", chat_id=-100999)) is not None
+    assert not router.disable(-100123, "pong")
+    assert router.disabled_commands(-100123) == ["ping"]
+
+    # Disabled commands survive a restart
+    reloaded = create_router(tmp_path, monkeypatch)
+    assert reloaded.is_disabled(-100123, "ping")
+
+    assert reloaded.enable(-100123, "ping")
+    assert reloaded.check_update(create_update("/ping")) is not None
+    print("✅ Disabled commands work")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    import pytest
+
+    test_parse_command()
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as monkeypatch:
+        test_dispatch(Path(tmp), monkeypatch)
+        test_disabled_commands(Path(tmp), monkeypatch)
+    print("🎉 All router tests passed!")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the safe /calc expression engine
+Verifies math works and that hostile input is rejected quickly
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.safe_calc import evaluate, CalcError
+
+def rejects(expression) -> bool:
+    try:
+        evaluate(expression)
+    except CalcError:
+        return True
+    return False
+
+def test_arithmetic_and_functions():
+    """Test operators, functions and constants"""
+    print("🔍 Testing calculator math...")
+    assert evaluate("2 + 2") == 4
+    assert evaluate("100 / 4") == 25.0
+    assert evaluate("2 ** 10") == 1024 == evaluate("2 ^ 10")
+    assert evaluate("-(7 // 2) % 5") == 2
+    assert evaluate("sqrt(16) + abs(-3)") == 7.0
+    assert math.isclose(evaluate("sin(pi / 2) + log(e) + log(8, 2)"), 5.0)
+    assert evaluate("max(1, 5, 3) * factorial(5)") == 600
+    assert evaluate("round(2.567, 2)") == 2.57
+    assert len(str(evaluate("2 ** 4000"))) == 1205
+    print("✅ Calculator math works")
+
+def test_hostile_input_is_rejected_fast():
+    """Test that huge powers, names and attribute access never run"""
+    print("🔍 Testing hostile expressions...")
+    started = time.perf_counter()
+    for expression in ("9**9**9", "2 ** 5000", "10 ** 10 ** 10", "(10 ** 1000) * (10 ** 1000)",
+                       "factorial(100000)", "round(1, -10 ** 9)", "exp(10000)", "1e308 * 10",
+                       "__import__('os')", "().__class__", "open('x')", "x", "'a' * 10",
+                       "[1] * 10", "lambda: 1", "sqrt(-1)", "(-8) ** 0.5", "True + 1",
+                       "1 +" , "", "1 + " * 100 + "1"):
+        assert rejects(expression), expression
+    assert time.perf_counter() - started < 1
+    try:
+        evaluate("1 / 0")
+        assert False
+    except ZeroDivisionError:
+        pass
+    print("✅ Hostile expressions rejected")
+
+if __name__ == "__main__":
+    test_arithmetic_and_functions()
+    test_hostile_input_is_rejected_fast()
+    print("🎉 All calculator tests passed!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for weighted and tagged content sampling
+Verifies the alias tables and that tag filters pick only allowed entries
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.content import ContentStore, Entry
+from utils.rotation import Rotation, RotationJournal
+from utils.sampling import AliasTable, ContentFilter, TagIndex
+
+def test_alias_table_distribution():
+    """Test that draws follow the weights, and zero weights are never drawn"""
+    print("🔍 Testing alias table...")
+    weights = [1, 3, 0, 6]
+    table = AliasTable(weights)
+    rng = random.Random(7)
+    counts = [0] * len(weights)
+    for _ in range(50000):
+        counts[table.sample(rng)] += 1
+
+    assert counts[2] == 0
+    for count, weight in zip(counts, weights):
+        assert abs(count / 50000 - weight / 10) < 0.01
+    assert AliasTable([0, 0]).sample(rng) in (0, 1)
+    print("✅ Alias table works")
+
+def test_tag_filters(tmp_path):
+    """Test that filters pick only allowed entries and are combined once"""
+    print("🔍 Testing tag filters...")
+    path = tmp_path / "jokes.json"
+    path.write_text(json.dumps({"jokes": [
+        {"text": "pun one", "tags": ["Pun", "family"]},
+        {"text": "dark one", "tags": ["dark"]},
+        {"text": "pun two", "tags": ["pun", "dark"]},
+        "untagged"
+    ]}))
+    store = ContentStore(str(path), "jokes")
+    store.rotation = Rotation("jokes", RotationJournal(str(tmp_path / "rotation.journal")))
+    assert store.entries[0].tags == ("pun", "family")
+
+    no_dark = ContentFilter(exclude=("dark",))
+    shown = {store.next_for(-100, no_dark).text for _ in range(10)}
+    assert shown == {"pun one", "untagged"}
+    assert store.next_for(-100, ContentFilter(("pun",), ("dark",))).text == "pun one"
+    assert store.next_for(-100, ContentFilter(("missing",))) is None
+    assert store.search("pun", no_dark).text == "pun one"
+    assert store.search("dark", no_dark) is None
+
+    # The same filter in any order reuses the combined sampler
+    index = store.tags
+    assert index.sampler(ContentFilter(("pun",), ("dark",))) is index.sampler(ContentFilter(("pun", "pun"), ("dark",)))
+    assert list(index.sampler(ContentFilter(("pun", "dark"))).ids) == [2]
+    print("✅ Tag filters work")
+
+def test_pack_filters(tmp_path):
+    """Test that packs walk the rotation and skip entries the filter rejects"""
+    print("🔍 Testing tag filters on a pack...")
+    pack_path = tmp_path / "jokes.jsonl"
+    pack_path.write_text('{"text": "pun", "tags": ["pun"], "weight": 5}\n'
+                         '{"text": "dark", "tags": ["dark"]}\n"plain"\n')
+    store = ContentStore(str(tmp_path / "jokes.json"), "jokes", pack=str(pack_path))
+    store.rotation = Rotation("jokes", RotationJournal(str(tmp_path / "rotation.journal")))
+    assert not store.tags.tags
+
+    shown = [store.next_for(-100, ContentFilter(exclude=("dark",))).text for _ in range(4)]
+    assert set(shown) == {"pun", "plain"}
+    assert {store.next_for(-200).text for _ in range(3)} == {"pun", "dark", "plain"}
+    assert store.next_for(-100, ContentFilter(("missing",))) is None
+    print("✅ Tag filters on a pack work")
+
+def test_weighted_entries():
+    """Test that custom weights switch picks to the alias table"""
+    print("🔍 Testing weighted entries...")
+    entries = (Entry("seasonal", tags=("winter",), weight=9.0), Entry("normal"), Entry("retired", weight=0.0))
+    index = TagIndex(entries)
+    sampler = index.sampler()
+    assert sampler.weighted
+
+    rng = random.Random(3)
+    picks = [sampler.pick(rng) for _ in range(10000)]
+    assert 2 not in picks
+    assert 0.85 < picks.count(0) / len(picks) < 0.95
+
+    # A single allowed entry has nothing to weigh
+    assert not index.sampler(ContentFilter(("winter",))).weighted
+    assert not TagIndex((Entry("a"), Entry("b"))).sampler().weighted
+    print("✅ Weighted entries work")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_alias_table_distribution()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_tag_filters(Path(tmp))
+        test_pack_filters(Path(tmp))
+    test_weighted_entries()
+    print("🎉 All sampling tests passed!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline status check CLI
+Verifies reports from a metrics snapshot and the SLO exit codes
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bot_status_check
+from utils.metrics import Registry, write_snapshot
+
+def make_snapshot(path, slow=False):
+    """Write a snapshot with one command and one cache"""
+    registry = Registry()
+    registry.gauge("bot_process_start_time_seconds", "start").set(1000)
+    registry.gauge("bot_scrape_time_seconds", "now").set(1100)
+    latency = registry.histogram("bot_handler_duration_seconds", "latency", ("handler",))
+    errors = registry.counter("bot_handler_errors", "errors", ("handler",))
+    api = registry.histogram("bot_api_request_duration_seconds", "api", ("method",))
+    cache = registry.counter("bot_cache_requests", "cache", ("cache", "result"))
+
+    for _ in range(50):
+        latency.labels("ban").observe(5.0 if slow else 0.02)
+        api.labels("sendMessage").observe(0.1)
+    errors.labels("ban").inc()
+    cache.labels("chat_admins", "hit").inc(40)
+    cache.labels("chat_admins", "miss").inc(10)
+    write_snapshot(str(path), registry)
+
+def test_report_from_snapshot(tmp_path):
+    """Test that a healthy snapshot is reported and passes"""
+    print("🔍 Testing snapshot report...")
+    path = tmp_path / "metrics.prom"
+    make_snapshot(path)
+
+    report = bot_status_check.build_report(bot_status_check.load_metrics(path=str(path)))
+    ban = report['commands']['ban']
+    assert ban['count'] == 50 and ban['errors'] == 1
+    assert ban['p99'] <= 0.025
+    assert report['caches']['chat_admins']['hit_rate'] == 0.8
+    assert abs(report['api_calls_per_second'] - 0.5) < 1e-9
+
+    assert bot_status_check.main(['--file', str(path)]) == bot_status_check.EXIT_OK
+    print("✅ Snapshot report works")
+
+def test_slo_breach_exit_code(tmp_path):
+    """Test that a breached SLO makes the check fail"""
+    print("🔍 Testing SLO breach...")
+    path = tmp_path / "metrics.prom"
+    make_snapshot(path, slow=True)
+
+    assert bot_status_check.main(['--file', str(path)]) == bot_status_check.EXIT_SLO_BREACHED
+    assert bot_status_check.main(['--file', str(path), '--max-p99-ms', '20000']) == bot_status_check.EXIT_OK
+    assert bot_status_check.main(['--file', str(tmp_path / "missing.prom")]) == bot_status_check.EXIT_UNAVAILABLE
+    print("✅ SLO breach detection works")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_report_from_snapshot(Path(tmp))
+        test_slo_breach_exit_code(Path(tmp))
+    print("🎉 All status check tests passed!")
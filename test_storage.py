@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for the write-behind JSON stores
+Verifies that writes are coalesced and that shutdown flushes pending changes
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.storage import JsonStore, flush_all
+
+def test_save_without_loop_writes_immediately(tmp_path):
+    """Test that scripts without an event loop still persist straight away"""
+    print("🔍 Testing synchronous save...")
+    path = tmp_path / "rules.json"
+    store = JsonStore(str(path))
+
+    store.save({"-100": "Be nice"})
+    assert json.loads(path.read_text()) == {"-100": "Be nice"}
+    assert store.flush_lag == 0.0
+    print("✅ Synchronous save works")
+
+def test_write_behind_and_flush(tmp_path):
+    """Test that saves on the event loop are deferred until flushed"""
+    print("🔍 Testing write-behind...")
+    path = tmp_path / "warnings.json"
+    store = JsonStore(str(path), flush_delay=60)
+
+    async def scenario():
+        data = store.load()
+        for i in range(5):
+            data[str(i)] = i
+            store.save(data)
+        assert not path.exists()
+        assert store.dirty_since is not None
+
+        # Shutdown flushes everything that is still pending
+        assert flush_all() >= 1
+        assert json.loads(path.read_text()) == {str(i): i for i in range(5)}
+        assert store.dirty_since is None
+
+    asyncio.run(scenario())
+    print("✅ Write-behind works")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_save_without_loop_writes_immediately(Path(tmp))
+        test_write_behind_and_flush(Path(tmp))
+    print("🎉 All storage tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for translation
+Verifies the offline phrase table, the result cache and request batching
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.cache import TTLCache
+from utils.translation import PhraseTableBackend, Translator, TranslationBackend
+
+class CountingBackend(TranslationBackend):
+    """Wraps a backend and records every batch it is called with"""
+
+    name = "counting"
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = []
+
+    async def translate_batch(self, texts, target, source=None):
+        self.calls.append(list(texts))
+        return await self.inner.translate_batch(texts, target, source)
+
+def test_phrase_table():
+    """Test longest-match phrase translation across scripts"""
+    print("🔍 Testing phrase table...")
+    backend = PhraseTableBackend()
+    assert len(backend.languages) == 16
+
+    result = backend.translate("Hello, how are you?", "es")
+    assert result.text == "Hola, cómo estás?"
+    assert result.source == "en" and result.coverage == 1.0
+
+    assert backend.translate("Спасибо, друг", "fr").text == "Merci, ami"
+    assert backend.translate("你好吗", "en").text == "how are you"
+    assert backend.translate("नमस्ते दोस्त", "en").text == "hello friend"
+
+    # Unknown words are kept, and only whole words match
+    partial = backend.translate("Good morning Alice", "de")
+    assert partial.text == "Guten Morgen Alice" and 0 < partial.coverage < 1
+    assert backend.translate("goodness", "fr").text == "goodness"
+    print("✅ Phrase table works")
+
+def test_cache_and_batching():
+    """Test that concurrent requests share one backend call and repeats hit the cache"""
+    print("🔍 Testing translation cache and batching...")
+    backend = CountingBackend(PhraseTableBackend())
+    translator = Translator(backend, TTLCache("test_translations", 60, maxsize=10), window=0.01)
+
+    async def scenario():
+        results = await asyncio.gather(
+            translator.translate("thank you", "de"),
+            translator.translate("good night", "de"),
+            translator.translate("thank you", "de"),
+            translator.translate("thank you", "fr")
+        )
+        assert [r.text for r in results] == ["danke", "gute Nacht", "danke", "merci"]
+        # One call per target language, duplicates sent once
+        assert sorted(backend.calls) == [["thank you"], ["thank you", "good night"]]
+
+        assert (await translator.translate("thank you", "de")).text == "danke"
+        assert len(backend.calls) == 2
+
+    asyncio.run(scenario())
+    print("✅ Translation cache and batching work")
+
+class ShortBackend(TranslationBackend):
+    """Drops the last result of every batch"""
+
+    name = "short"
+
+    async def translate_batch(self, texts, target, source=None):
+        return (await PhraseTableBackend().translate_batch(texts, target, source))[:-1]
+
+def test_short_batch_fails_every_caller():
+    """Test that a backend returning too few results fails the whole batch instead of hanging"""
+    print("🔍 Testing mismatched batch results...")
+    translator = Translator(ShortBackend(), TTLCache("test_short", 60, maxsize=10), window=0.01)
+
+    async def scenario():
+        results = await asyncio.wait_for(asyncio.gather(
+            translator.translate("thank you", "de"),
+            translator.translate("good night", "de"),
+            return_exceptions=True
+        ), timeout=1)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert not translator._in_flight and len(translator.cache) == 0
+
+    asyncio.run(scenario())
+    print("✅ Mismatched batch results fail every caller")
+
+if __name__ == "__main__":
+    test_phrase_table()
+    test_cache_and_batching()
+    test_short_batch_fails_every_caller()
+    print("🎉 All translation tests passed!")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for warm-state restarts
+Verifies cache snapshots survive a restart and the supervisor backs off on crashes
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+from unittest.mock import AsyncMock, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import ChatMemberAdministrator, ChatMemberMember, ChatMemberOwner, User
+from utils import cache
+from utils.decorators import admin_required
+from utils.storage import JsonStore
+from bot_runner import CrashTracker, backoff_delay
+
+def make_admins():
+    """Two admins in the shape get_chat_administrators returns"""
+    owner = ChatMemberOwner(User(1, "Owner", False, username="boss"), False)
+    admin = ChatMemberAdministrator(
+        User(2, "Helper", False, username="helper"),
+        *([False] * 2), *([True] * 10)
+    )
+    return (owner, admin)
+
+def test_snapshot_roundtrip(tmp_path):
+    """Test that admin tables, usernames and rate limits come back after a restart"""
+    print("🔍 Testing warm state snapshot...")
+    store = JsonStore(str(tmp_path / "warm_state.json"))
+    calls = {42: [9999999999.0]}
+    cache.register_rate_limit("test.command", calls)
+
+    cache.ADMIN_CACHE.set(-100, make_admins())
+    cache.remember_user(User(3, "Member", False, username="Member_3"))
+    cache.save_warm_state(store)
+    saved = json.loads((tmp_path / "warm_state.json").read_text())
+    assert saved['rate_limits']['test.command'] == {"42": [9999999999.0]}
+
+    # Simulate a fresh process
+    cache.ADMIN_CACHE.clear()
+    cache.USERNAME_INDEX.clear()
+    calls.clear()
+    cache.load_warm_state(JsonStore(str(tmp_path / "warm_state.json")))
+
+    admins = cache.ADMIN_CACHE.get(-100)
+    assert [admin.status for admin in admins] == ['creator', 'administrator']
+    assert cache.find_user_by_username("@member_3").id == 3
+    assert calls == {42: [9999999999.0]}
+    print("✅ Warm state snapshot works")
+
+def test_expired_entries_dropped():
+    """Test that expired entries are neither served nor snapshotted"""
+    print("🔍 Testing cache expiry...")
+    ttl_cache = cache.TTLCache("test", ttl=60)
+    ttl_cache.set("fresh", 1)
+    ttl_cache.set("stale", 2, ttl=-1)
+    assert ttl_cache.get("stale") is None
+    assert [key for key, _, _ in ttl_cache.snapshot()] == ["fresh"]
+    assert 59 < ttl_cache.remaining("fresh") <= 60
+    assert ttl_cache.remaining("stale") is None and ttl_cache.remaining("missing") is None
+    print("✅ Cache expiry works")
+
+def test_demoted_admin_denied():
+    """Test that a restored admin table doesn't keep a demoted user's powers"""
+    print("🔍 Testing admin check after a demotion...")
+    cache.ADMIN_CACHE.set(-200, make_admins())
+    demoted = User(2, "Helper", False, username="helper")
+    bot = Mock()
+    bot.get_chat_member = AsyncMock(return_value=ChatMemberMember(demoted))
+    update = Mock()
+    update.effective_chat.id = -200
+    update.effective_chat.type = 'supergroup'
+    update.effective_user = demoted
+    update.message.reply_text = AsyncMock()
+    context = Mock(bot=bot)
+    ran = []
+
+    @admin_required
+    async def ban(update, context):
+        ran.append(True)
+
+    asyncio.run(ban(update, context))
+    assert not ran
+    bot.get_chat_member.assert_awaited_once_with(-200, 2)
+    print("✅ Demoted admins are refused")
+
+def test_backoff_and_crash_loop():
+    """Test that restarts back off exponentially and a crash loop is noticed"""
+    print("🔍 Testing supervisor backoff...")
+    rng = random.Random(1)
+    for failures, upper in ((1, 1), (2, 2), (5, 16), (20, 300)):
+        delay = backoff_delay(failures, base=1, cap=300, rng=rng)
+        assert upper / 2 <= delay <= upper
+
+    tracker = CrashTracker(window=60, threshold=3)
+    assert not tracker.record(1, now=0)
+    assert not tracker.record(1, now=100)
+    assert not tracker.record(1, now=110)
+    assert tracker.record(1, now=120)
+    assert tracker.failures == 4
+    print("✅ Supervisor backoff works")
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot_roundtrip(Path(tmp))
+    test_expired_entries_dropped()
+    test_demoted_admin_denied()
+    test_backoff_and_crash_loop()
+    print("🎉 All warm state tests passed!")
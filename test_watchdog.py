@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the stall watchdog
+Verifies that stale polling and stuck update processing are detected
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.lifecycle import TRACKER
+from utils.metrics import InstrumentedRequest
+from utils.watchdog import StallWatchdog
+
+class FakeApplication:
+    """Just enough of an Application for the watchdog"""
+
+    def __init__(self):
+        self.update_queue = asyncio.Queue()
+
+def test_polling_stall(monkeypatch):
+    """Test that a getUpdates call that stopped succeeding is a stall"""
+    print("🔍 Testing polling stall detection...")
+    monkeypatch.setattr(InstrumentedRequest, "last_success", {})
+    watchdog = StallWatchdog(poll_timeout=60, update_timeout=60)
+    watchdog.arm(FakeApplication())
+    assert watchdog.check() is None
+
+    InstrumentedRequest.last_success['getUpdates'] = time.monotonic()
+    watchdog.armed_at -= 120
+    assert watchdog.check() is None
+
+    InstrumentedRequest.last_success['getUpdates'] -= 120
+    assert watchdog.check() == "polling"
+    print("✅ Polling stall detection works")
+
+def test_update_stall(monkeypatch):
+    """Test that queued updates with nothing processed is a stall"""
+    print("🔍 Testing update stall detection...")
+    monkeypatch.setattr(InstrumentedRequest, "last_success", {'getUpdates': time.monotonic()})
+    monkeypatch.setattr(TRACKER, "last_update_time", time.monotonic() - 120)
+    watchdog = StallWatchdog(poll_timeout=600, update_timeout=60)
+    application = FakeApplication()
+    watchdog.arm(application)
+
+    # Idle is fine, no matter how long ago the last update was
+    watchdog.armed_at -= 120
+    assert watchdog.check() is None
+
+    application.update_queue.put_nowait(object())
+    assert watchdog.check() == "updates"
+    print("✅ Update stall detection works")
+
+if __name__ == "__main__":
+    import pytest
+    for test in (test_polling_stall, test_update_stall):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch)
+    print("🎉 All watchdog tests passed!")
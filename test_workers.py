@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the worker process pool
+Verifies results, busy replies when saturated and recovery after a timeout
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.safe_calc import evaluate, CalcError
+from utils.workers import WorkerPool, WorkerBusy, WorkerTimeout
+
+def nap(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+def test_results_and_errors():
+    """Test that results and exceptions come back from the worker"""
+    print("🔍 Testing worker results...")
+    pool = WorkerPool(processes=1, queue_limit=1)
+
+    async def scenario():
+        assert await pool.run(evaluate, "6 * 7") == 42
+        assert await pool.run(nap, 0) != os.getpid()
+        try:
+            await pool.run(evaluate, "9**9**9")
+            assert False
+        except CalcError:
+            pass
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    print("✅ Worker results work")
+
+def test_busy_and_timeout():
+    """Test that a full pool replies busy and a stuck task is killed"""
+    print("🔍 Testing busy and timeout...")
+    pool = WorkerPool(processes=1, queue_limit=1)
+
+    async def scenario():
+        running = asyncio.gather(pool.run(nap, 0.3), pool.run(nap, 0.3))
+        await asyncio.sleep(0.05)
+        try:
+            await pool.run(nap, 0)
+            assert False
+        except WorkerBusy:
+            pass
+        # The queued task's timeout starts once it has a worker
+        await asyncio.wait_for(running, 5)
+
+        stuck = await pool.run(nap, 0)
+        started = time.perf_counter()
+        try:
+            await pool.run(nap, 30, timeout=0.5)
+            assert False
+        except WorkerTimeout:
+            pass
+        assert time.perf_counter() - started < 5
+        # The stuck worker was killed, not left running its task
+        await asyncio.sleep(0.2)
+        try:
+            os.kill(stuck, 0)
+            assert False, "stuck worker is still alive"
+        except ProcessLookupError:
+            pass
+        assert await pool.run(evaluate, "1 + 1") == 2
+        assert pool.pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    print("✅ Busy and timeout work")
+
+if __name__ == "__main__":
+    test_results_and_errors()
+    test_busy_and_timeout()
+    print("🎉 All worker tests passed!")
@@ -0,0 +1,345 @@
+"""
+Chat activity analytics for the Telegram Bot
+Streams every group message through fixed-size sketches: a count-min sketch with
+heavy hitters for top posters, HyperLogLog for active users and hourly histograms
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import NamedTuple
+import numpy as np
+from telegram import Chat
+from config import (IST, STATS_SKETCH_WIDTH, STATS_SKETCH_DEPTH, STATS_HLL_PRECISION, STATS_TOP_POSTERS,
+                    STATS_HISTORY_HOURS, STATS_ACTIVE_DAYS, STATS_IDLE_DAYS)
+from utils.rotation import splitmix64
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FILE = "data/activity.npz"
+
+# Seconds to add to a Unix timestamp for the IST wall clock
+IST_OFFSET = int(IST.utcoffset(None).total_seconds())
+
+class CountMinSketch:
+    """
+    Approximate per-key counts in depth x width counters
+    Estimates never undercount, and overcount by at most total * e / width
+    with probability 1 - exp(-depth)
+    """
+
+    def __init__(self, width: int = STATS_SKETCH_WIDTH, depth: int = STATS_SKETCH_DEPTH, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.seeds = [splitmix64(seed * depth + row) for row in range(depth)]
+        self.rows = np.arange(depth)
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+
+    def _columns(self, key: int) -> list:
+        return [splitmix64(key ^ seed) % self.width for seed in self.seeds]
+
+    def add(self, key: int, count: int = 1) -> int:
+        """Count key and return its new estimate"""
+        columns = self._columns(key)
+        cells = self.table[self.rows, columns]
+        # Conservative update, only the cells at the minimum grow, which tightens estimates
+        estimate = int(cells.min()) + count
+        self.table[self.rows, columns] = np.maximum(cells, estimate)
+        return estimate
+
+    def estimate(self, key: int) -> int:
+        return int(self.table[self.rows, self._columns(key)].min())
+
+class HeavyHitters:
+    """The k keys with the largest sketch estimates, with a label for each"""
+
+    def __init__(self, k: int = STATS_TOP_POSTERS):
+        self.k = k
+        self.entries = {}
+
+    def offer(self, key: int, estimate: int, label: str):
+        if key in self.entries or len(self.entries) < self.k:
+            self.entries[key] = (estimate, label)
+            return
+        smallest = min(self.entries, key=lambda candidate: self.entries[candidate][0])
+        if estimate > self.entries[smallest][0]:
+            del self.entries[smallest]
+            self.entries[key] = (estimate, label)
+
+    def top(self, n: int = None) -> list:
+        """(key, estimate, label) from the largest estimate down"""
+        ranked = sorted(self.entries.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, estimate, label) for key, (estimate, label) in ranked[:n]]
+
+class HyperLogLog:
+    """
+    Distinct count estimate in 2 ** precision one-byte registers
+    Standard error is 1.04 / sqrt(2 ** precision), about 3% at precision 10
+    """
+
+    def __init__(self, precision: int = STATS_HLL_PRECISION, registers: np.ndarray = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, key: int):
+        value = splitmix64(key)
+        index = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int32)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while most registers are empty
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def union(self, *others) -> "HyperLogLog":
+        registers = self.registers.copy()
+        for other in others:
+            np.maximum(registers, other.registers, out=registers)
+        return HyperLogLog(self.precision, registers)
+
+class HourlyHistogram:
+    """
+    Message counts for the last hours as a ring of hourly buckets, plus an
+    all-time histogram by IST hour of day
+    """
+
+    def __init__(self, hours: int = STATS_HISTORY_HOURS):
+        self.recent = np.zeros(hours, dtype=np.int64)
+        self.by_hour = np.zeros(24, dtype=np.int64)
+        # Hours since the epoch of the newest bucket
+        self.head = 0
+
+    def _advance(self, hour: int):
+        """Move the ring forward to hour, clearing the buckets it skips"""
+        if hour <= self.head:
+            return
+        skipped = min(hour - self.head, len(self.recent))
+        for step in range(1, skipped + 1):
+            self.recent[(self.head + step) % len(self.recent)] = 0
+        self.head = hour
+
+    def add(self, timestamp: float):
+        hour = int(timestamp // 3600)
+        self._advance(hour)
+        if self.head - hour < len(self.recent):
+            self.recent[hour % len(self.recent)] += 1
+        self.by_hour[int((timestamp + IST_OFFSET) // 3600) % 24] += 1
+
+    def last(self, hours: int, now: float) -> np.ndarray:
+        """Counts for the given number of hours up to now, oldest first"""
+        self._advance(int(now // 3600))
+        hours = min(hours, len(self.recent))
+        positions = np.arange(self.head - hours + 1, self.head + 1) % len(self.recent)
+        return self.recent[positions]
+
+SPARK_LEVELS = "▁▂▃▄▅▆▇█"
+
+def sparkline(counts: np.ndarray) -> str:
+    """One block character per count, scaled to the largest"""
+    peak = counts.max() if len(counts) else 0
+    if not peak:
+        return SPARK_LEVELS[0] * len(counts)
+    levels = np.ceil(counts / peak * (len(SPARK_LEVELS) - 1)).astype(int)
+    return "".join(SPARK_LEVELS[level] for level in levels)
+
+class ActivitySummary(NamedTuple):
+    """What /stats shows for a chat"""
+    messages: int
+    last_24h: np.ndarray
+    by_hour: np.ndarray
+    active_today: int
+    active_week: int
+    active_all_time: int
+    top_posters: list
+
+class ChatActivity:
+    """All sketches for one chat, their size does not depend on how busy the chat is"""
+
+    def __init__(self):
+        self.messages = 0
+        self.posters = CountMinSketch()
+        self.top = HeavyHitters()
+        self.users = HyperLogLog()
+        self.days = [HyperLogLog() for _ in range(STATS_ACTIVE_DAYS)]
+        # Days since the epoch (IST) of the newest daily sketch
+        self.today = 0
+        self.hours = HourlyHistogram()
+
+    def _day_sketch(self, day: int) -> HyperLogLog:
+        if day > self.today:
+            for step in range(1, min(day - self.today, len(self.days)) + 1):
+                self.days[(self.today + step) % len(self.days)] = HyperLogLog()
+            self.today = day
+        return self.days[day % len(self.days)]
+
+    def add(self, user_id: int, name: str, timestamp: float):
+        self.messages += 1
+        self.top.offer(user_id, self.posters.add(user_id), name)
+        self.users.add(user_id)
+        day = int((timestamp + IST_OFFSET) // 86400)
+        if self.today - day < len(self.days):
+            self._day_sketch(day).add(user_id)
+        self.hours.add(timestamp)
+
+    def summary(self, now: float, top: int = 5) -> ActivitySummary:
+        today = self._day_sketch(int((now + IST_OFFSET) // 86400))
+        return ActivitySummary(
+            messages=self.messages,
+            last_24h=self.hours.last(24, now),
+            by_hour=self.hours.by_hour.copy(),
+            active_today=today.count(),
+            active_week=today.union(*self.days).count(),
+            active_all_time=self.users.count(),
+            top_posters=self.top.top(top)
+        )
+
+    @property
+    def last_active(self) -> float:
+        """Start of the hour of the newest message, as a Unix timestamp"""
+        return self.hours.head * 3600.0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the sketch arrays"""
+        return (self.posters.table.nbytes + self.users.registers.nbytes + self.hours.recent.nbytes
+                + self.hours.by_hour.nbytes + sum(day.registers.nbytes for day in self.days))
+
+class ActivityTracker:
+    """
+    Per-chat activity, fed every update and snapshotted to disk across restarts
+    The async save and load copy the arrays on the event loop and leave
+    compression and file access to a thread
+    """
+
+    def __init__(self):
+        self.chats = {}
+
+    def chat(self, chat_id: int) -> ChatActivity:
+        activity = self.chats.get(chat_id)
+        if activity is None:
+            activity = self.chats[chat_id] = ChatActivity()
+        return activity
+
+    def observe(self, update):
+        """Count a group message, service messages and bots are skipped"""
+        message = update.message
+        chat = update.effective_chat
+        if message is None or chat is None or chat.type not in (Chat.GROUP, Chat.SUPERGROUP):
+            return
+        user = message.from_user
+        if user is None or user.is_bot or message.new_chat_members or message.left_chat_member:
+            return
+        self.chat(chat.id).add(user.id, user.first_name, message.date.timestamp())
+
+    def evict_idle(self, now: float = None, idle_days: float = STATS_IDLE_DAYS) -> int:
+        """Drop chats without messages for idle_days, returns how many were dropped"""
+        cutoff = (time.time() if now is None else now) - idle_days * 86400
+        idle = [chat_id for chat_id, activity in self.chats.items() if activity.last_active < cutoff]
+        for chat_id in idle:
+            del self.chats[chat_id]
+        if idle:
+            logger.info(f"🧹 Dropped activity of {len(idle)} idle chat(s)")
+        return len(idle)
+
+    def snapshot(self) -> tuple:
+        """Copies of every chat's arrays and the metadata to save, taken without yielding"""
+        arrays = {}
+        meta = {}
+        for chat_id, activity in self.chats.items():
+            arrays[f"{chat_id}.posters"] = activity.posters.table.copy()
+            arrays[f"{chat_id}.users"] = activity.users.registers.copy()
+            arrays[f"{chat_id}.days"] = np.stack([day.registers for day in activity.days])
+            arrays[f"{chat_id}.recent"] = activity.hours.recent.copy()
+            arrays[f"{chat_id}.by_hour"] = activity.hours.by_hour.copy()
+            meta[str(chat_id)] = {
+                'messages': activity.messages,
+                'today': activity.today,
+                'head': activity.hours.head,
+                'top': [[key, estimate, label] for key, estimate, label in activity.top.top()]
+            }
+        return arrays, meta
+
+    @staticmethod
+    def _write(path: str, arrays: dict, meta: dict):
+        """Compress a snapshot into one NumPy archive"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Per thread, so a periodic save still running never shares the final save's file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+            np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(tmp_path, path)
+            logger.info(f"💾 Saved activity for {len(meta)} chat(s)")
+        except Exception as e:
+            logger.error(f"Error saving {path}: {e}")
+
+    def save(self, path: str = ACTIVITY_FILE):
+        """Write every chat's sketches to one compressed NumPy archive"""
+        self._write(path, *self.snapshot())
+
+    async def save_async(self, path: str = ACTIVITY_FILE):
+        """save() with the compression and writing off the event loop"""
+        arrays, meta = self.snapshot()
+        await asyncio.to_thread(self._write, path, arrays, meta)
+
+    @classmethod
+    def _read(cls, path: str) -> dict:
+        """Chat id -> ChatActivity from a saved archive, skipping any that no longer fit the config"""
+        chats = {}
+        if not os.path.exists(path):
+            return chats
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                meta = json.loads(str(archive['meta']))
+                for chat_id, info in meta.items():
+                    try:
+                        chats[int(chat_id)] = cls._restore(archive, chat_id, info)
+                    except Exception as e:
+                        logger.warning(f"Skipping saved activity of chat {chat_id}: {e}")
+            logger.info(f"📊 Loaded activity for {len(chats)} chat(s)")
+        except Exception as e:
+            logger.error(f"Error loading {path}: {e}")
+        return chats
+
+    def load(self, path: str = ACTIVITY_FILE):
+        """Restore the sketches written by save()"""
+        self.chats.update(self._read(path))
+
+    async def load_async(self, path: str = ACTIVITY_FILE):
+        """load() with the file read and decompressed off the event loop"""
+        self.chats.update(await asyncio.to_thread(self._read, path))
+
+    @staticmethod
+    def _restore(archive, chat_id: str, info: dict) -> ChatActivity:
+        activity = ChatActivity()
+        # Assigning into the new arrays fails if the sketch sizes were reconfigured
+        activity.posters.table[...] = archive[f"{chat_id}.posters"]
+        activity.users.registers[...] = archive[f"{chat_id}.users"]
+        activity.hours.recent[...] = archive[f"{chat_id}.recent"]
+        activity.hours.by_hour[...] = archive[f"{chat_id}.by_hour"]
+        days = archive[f"{chat_id}.days"]
+        if len(days) != len(activity.days):
+            raise ValueError("number of days changed")
+        for day, registers in zip(activity.days, days):
+            day.registers[...] = registers
+        activity.messages = info['messages']
+        activity.today = info['today']
+        activity.hours.head = info['head']
+        for key, estimate, label in info['top']:
+            activity.top.offer(key, estimate, label)
+        return activity
+
+ACTIVITY = ActivityTracker()
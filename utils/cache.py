@@ -0,0 +1,273 @@
+"""
+In-memory caches for the Telegram Bot
+Admin tables, chat details, rendered replies, a username index and rate limiter state,
+snapshotted across restarts
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from telegram import ChatMember, User
+from config import ADMIN_CACHE_TTL, USERNAME_INDEX_TTL, CHAT_INFO_TTL, MEMBER_COUNT_TTL, RESPONSE_CACHE_TTL
+from utils.metrics import record_cache
+from utils.storage import JsonStore
+
+logger = logging.getLogger(__name__)
+
+WARM_STATE_FILE = "data/warm_state.json"
+
+class TTLCache:
+    """
+    Least recently used cache whose entries expire after ttl seconds
+    Expiry uses wall clock time so a snapshot stays valid in the next process
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1000):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Get a live entry, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.time():
+            del self._entries[key]
+            entry = None
+        record_cache(self.name, entry is not None)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        """Store an entry, evicting the least recently used one when full"""
+        self._entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def peek(self, key):
+        """A live entry without counting a lookup or refreshing its recency, or None"""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None and entry[0] > time.time() else None
+
+    def remaining(self, key):
+        """Seconds until a live entry expires, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[0] - time.time()
+
+    def invalidate(self, key):
+        """Drop an entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def snapshot(self, encode=lambda value: value) -> list:
+        """Live entries as [key, expires_at, encoded value] lists"""
+        now = time.time()
+        return [[key, expires, encode(value)] for key, (expires, value) in self._entries.items() if expires > now]
+
+    def restore(self, entries, decode=lambda value: value) -> int:
+        """Load entries from a snapshot, skipping expired ones, returns how many were loaded"""
+        now = time.time()
+        loaded = 0
+        for key, expires, value in entries or []:
+            if expires <= now:
+                continue
+            try:
+                self._entries[key] = (expires, decode(value))
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Skipping unreadable {self.name} cache entry: {e}")
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return loaded
+
+# chat id -> tuple of ChatMember for the chat's administrators
+ADMIN_CACHE = TTLCache("chat_admins", ADMIN_CACHE_TTL, maxsize=2000)
+
+# chat id -> ChatFullInfo from get_chat
+CHAT_INFO_CACHE = TTLCache("chat_info", CHAT_INFO_TTL, maxsize=2000)
+
+# chat id -> member count from get_chat_member_count
+MEMBER_COUNT_CACHE = TTLCache("member_counts", MEMBER_COUNT_TTL, maxsize=2000)
+
+# (chat id, command, data versions) -> reply text rendered for the whole chat
+RESPONSE_CACHE = TTLCache("responses", RESPONSE_CACHE_TTL, maxsize=5000)
+
+# (chat id, topic) -> counter bumped whenever that data changes
+_versions = {}
+
+# lowercase username -> User seen in any update
+USERNAME_INDEX = TTLCache("usernames", USERNAME_INDEX_TTL, maxsize=50000)
+
+# user id -> the lowercase username they were last indexed under
+_indexed_usernames = OrderedDict()
+
+# rate limiter name -> {user id: [call timestamps]}, filled by the rate_limit decorator
+RATE_LIMITS = {}
+
+WARM_STATE = JsonStore(WARM_STATE_FILE)
+
+def remember_user(user):
+    """Index a user by username so @mentions can be resolved without API calls"""
+    if user is None or not user.username:
+        return
+    username = user.username.lower()
+    previous = _indexed_usernames.pop(user.id, None)
+    if previous is not None and previous != username:
+        # A renamed user's old username may be taken by someone else by now
+        owner = USERNAME_INDEX.peek(previous)
+        if owner is not None and owner.id == user.id:
+            USERNAME_INDEX.invalidate(previous)
+    USERNAME_INDEX.set(username, user)
+    _indexed_usernames[user.id] = username
+    while len(_indexed_usernames) > USERNAME_INDEX.maxsize:
+        _indexed_usernames.popitem(last=False)
+
+def find_user_by_username(username: str):
+    """Look up a user seen before by username"""
+    return USERNAME_INDEX.get(username.lstrip('@').lower())
+
+# (cache name, key) -> fetch in progress, so a burst of misses makes one API call
+_fetches = {}
+
+async def cached_fetch(cache: TTLCache, key, fetch, ttl: float = None):
+    """Get a cached value, or run fetch() once for every caller waiting on the same miss"""
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    flight = (cache.name, key)
+    task = _fetches.get(flight)
+    if task is None:
+        async def fetch_and_store():
+            try:
+                result = await fetch()
+                cache.set(key, result, ttl)
+                return result
+            finally:
+                _fetches.pop(flight, None)
+        task = _fetches[flight] = asyncio.ensure_future(fetch_and_store())
+    # Shielded so one caller giving up doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+async def get_chat_admins(bot, chat_id: int) -> tuple:
+    """Get a chat's administrators, calling get_chat_administrators only on a cache miss"""
+    async def fetch():
+        admins = tuple(await bot.get_chat_administrators(chat_id))
+        for admin in admins:
+            remember_user(admin.user)
+        return admins
+    return await cached_fetch(ADMIN_CACHE, chat_id, fetch)
+
+async def get_chat_info(bot, chat_id: int):
+    """Get a chat's details, calling get_chat only on a cache miss"""
+    return await cached_fetch(CHAT_INFO_CACHE, chat_id, lambda: bot.get_chat(chat_id))
+
+async def get_member_count(bot, chat_id: int) -> int:
+    """Get a chat's member count, calling get_chat_member_count only on a cache miss"""
+    return await cached_fetch(MEMBER_COUNT_CACHE, chat_id, lambda: bot.get_chat_member_count(chat_id))
+
+def data_version(chat_id: int, topic: str) -> int:
+    return _versions.get((chat_id, topic), 0)
+
+def bump_version(chat_id: int, *topics: str):
+    """Mark a chat's data as changed, replies rendered from it are no longer served"""
+    for topic in topics:
+        _versions[(chat_id, topic)] = data_version(chat_id, topic) + 1
+
+def invalidate_chat(chat_id: int, admins: bool = False, info: bool = False, members: bool = False):
+    """Drop cached data about a chat after something changed it"""
+    if admins:
+        ADMIN_CACHE.invalidate(chat_id)
+        bump_version(chat_id, 'admins')
+    if info:
+        CHAT_INFO_CACHE.invalidate(chat_id)
+        bump_version(chat_id, 'info')
+    if members:
+        MEMBER_COUNT_CACHE.invalidate(chat_id)
+        bump_version(chat_id, 'members')
+
+async def cached_response(chat_id: int, command: str, topics: tuple, render, ttl: float = None) -> str:
+    """
+    Reply text for a command whose output is the same for everyone in the chat
+    render() builds it on a miss, it is reused until any of the topics' data changes
+    """
+    async def build():
+        text = render()
+        return await text if inspect.isawaitable(text) else text
+    key = (chat_id, command, tuple(data_version(chat_id, topic) for topic in topics))
+    return await cached_fetch(RESPONSE_CACHE, key, build, ttl)
+
+def invalidate_for_update(update):
+    """Drop cached chat data that a service update shows is out of date"""
+    chat = update.effective_chat
+    if chat is None:
+        return
+    if update.my_chat_member is not None:
+        # The bot itself was added, removed or had its rights changed
+        invalidate_chat(chat.id, admins=True, info=True, members=True)
+    elif update.chat_member is not None:
+        old, new = update.chat_member.old_chat_member, update.chat_member.new_chat_member
+        admin_statuses = (ChatMember.OWNER, ChatMember.ADMINISTRATOR)
+        invalidate_chat(chat.id, admins=old.status in admin_statuses or new.status in admin_statuses,
+                        members=old.status != new.status)
+    message = update.message
+    if message is None:
+        return
+    if message.new_chat_members or message.left_chat_member:
+        invalidate_chat(chat.id, members=True)
+    if message.new_chat_title or message.new_chat_photo or message.delete_chat_photo or message.pinned_message:
+        invalidate_chat(chat.id, info=True)
+    if message.migrate_to_chat_id:
+        invalidate_chat(chat.id, admins=True, info=True, members=True)
+
+def register_rate_limit(name: str, calls: dict):
+    """Track a rate limiter's call log so it survives restarts"""
+    RATE_LIMITS[name] = calls
+
+def save_warm_state(store: JsonStore = WARM_STATE):
+    """Write the warm caches to disk"""
+    store.save({
+        'saved_at': datetime.now().isoformat(),
+        'admins': ADMIN_CACHE.snapshot(lambda admins: [admin.to_dict() for admin in admins]),
+        'usernames': USERNAME_INDEX.snapshot(lambda user: user.to_dict()),
+        'rate_limits': {name: {str(user_id): times for user_id, times in calls.items() if times}
+                        for name, calls in RATE_LIMITS.items()}
+    })
+    store.flush()
+    logger.info(f"💾 Saved warm state: {len(ADMIN_CACHE)} admin table(s), {len(USERNAME_INDEX)} username(s)")
+
+def load_warm_state(store: JsonStore = WARM_STATE):
+    """Reload the warm caches written by the previous run"""
+    state = store.load()
+    if not state:
+        return
+
+    admins = ADMIN_CACHE.restore(
+        state.get('admins'), lambda members: tuple(ChatMember.de_json(member, None) for member in members))
+    usernames = USERNAME_INDEX.restore(state.get('usernames'), lambda user: User.de_json(user, None))
+    for username, _, user in USERNAME_INDEX.snapshot():
+        _indexed_usernames[user.id] = username
+
+    now = time.time()
+    for name, calls in (state.get('rate_limits') or {}).items():
+        target = RATE_LIMITS.get(name)
+        if target is None:
+            continue
+        for user_id, times in calls.items():
+            # Calls older than a day can't matter to any window in use
+            target[int(user_id)] = [t for t in times if now - t < 86400]
+
+    logger.info(f"♨️ Loaded warm state: {admins} admin table(s), {usernames} username(s)")
@@ -0,0 +1,252 @@
+"""
+Content store for the Telegram Bot
+Loads quotes, jokes and facts once into immutable tuples and hot-swaps them when the files change
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+from typing import NamedTuple, Optional
+from config import CONTENT_RELOAD_INTERVAL
+from utils.corpus import MappedCorpus
+from utils.rotation import Rotation, ROTATION_STORE
+from utils.sampling import ContentFilter, NO_FILTER, TagIndex
+from utils.search import InvertedIndex, SAMPLE_ATTEMPTS, build_index, open_index
+from utils.storage import JsonStore
+
+logger = logging.getLogger(__name__)
+
+class Entry(NamedTuple):
+    """One quote, joke or fact"""
+    text: str
+    author: Optional[str] = None
+    tags: tuple = ()
+    weight: float = 1.0
+
+def parse_entry(item) -> Entry:
+    """Accept both plain strings and {"text": ..., "author": ..., "tags": [...], "weight": ...} objects"""
+    if isinstance(item, str):
+        return Entry(item)
+    tags = tuple(dict.fromkeys(str(tag).lower() for tag in item.get('tags', ())))
+    return Entry(str(item['text']), item.get('author'), tags, max(0.0, float(item.get('weight', 1.0))))
+
+class SearchUnavailable(Exception):
+    """A pack's keyword index is still being built"""
+
+class ContentStore:
+    """
+    The entries of one data file, held as a tuple
+    When a JSONL content pack exists it is served through a memory-mapped
+    index instead, so very large packs are never loaded whole
+    A keyword index and the per-tag alias tables are built alongside on every load,
+    except for packs: their keyword index is saved next to the pack by
+    refresh_index() off the event loop and mapped like the pack itself, and
+    they have no tag index
+    Readers always see a complete old or new version, reload just swaps the reference
+    """
+
+    def __init__(self, path: str, key: str, defaults=(), pack: str = None):
+        self.path = path
+        self.key = key
+        self.pack = pack
+        self.rotation = Rotation(key, ROTATION_STORE)
+        self.defaults = tuple(parse_entry(item) for item in defaults)
+        self._current = (self.defaults, InvertedIndex(self.defaults), TagIndex(self.defaults))
+        self.mtime = None
+        self.reload()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def entries(self):
+        return self._current[0]
+
+    @property
+    def index(self) -> Optional[InvertedIndex]:
+        """The keyword index, None while a pack has no current saved index"""
+        entries, index, tags = self._current
+        if index is None:
+            # Opening a saved index only maps it, building is left to refresh_index()
+            index = open_index(entries.path, entries)
+            if index is not None and self._current[0] is entries:
+                self._current = (entries, index, tags)
+        return index
+
+    def refresh_index(self) -> bool:
+        """
+        Build a pack's missing or stale keyword index, returns True if one was built
+        Decodes the whole pack, so it runs in a thread like reload()
+        """
+        entries, index, tags = self._current
+        if not isinstance(entries, MappedCorpus) or self.index is not None:
+            return False
+        try:
+            index = build_index(entries.path, entries)
+        except Exception as e:
+            logger.error(f"Error building the search index of {entries.path}: {e}")
+            return False
+        if self._current[0] is entries:
+            self._current = (entries, index, tags)
+        return True
+
+    @property
+    def tags(self) -> TagIndex:
+        return self._current[2]
+
+    @property
+    def source(self) -> str:
+        """The file currently providing content, the pack wins when present"""
+        if self.pack and os.path.exists(self.pack):
+            return self.pack
+        return self.path
+
+    def _load(self, source: str):
+        if source == self.pack:
+            # Only the index header is read here, entries are decoded when picked
+            return MappedCorpus(source, decode=lambda line: parse_entry(json.loads(line)))
+        with open(source, 'r') as f:
+            data = json.load(f)
+        return tuple(parse_entry(item) for item in data.get(self.key, []))
+
+    def reload(self) -> bool:
+        """Re-read the file if its modification time changed, returns True if content was swapped"""
+        source = self.source
+        try:
+            mtime = (source, os.stat(source).st_mtime_ns)
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+
+        try:
+            entries = self._load(source)
+        except Exception as e:
+            # Keep serving the old content, and don't retry until the file changes again
+            logger.error(f"Error loading {source}: {e}")
+            self.mtime = mtime
+            return False
+
+        self.mtime = mtime
+        if not len(entries):
+            entries = self.defaults
+        # Entries and their indexes are swapped together, so they always match
+        if isinstance(entries, MappedCorpus):
+            self._current = (entries, None, TagIndex())
+            logger.info(f"📚 Loaded {len(entries)} {self.key} from {source}")
+        else:
+            self._current = (entries, InvertedIndex(entries), TagIndex(entries))
+            logger.info(f"📚 Loaded {len(entries)} {self.key} from {source} ({len(self.index)} search terms)")
+        return True
+
+    def random(self) -> Optional[Entry]:
+        """Pick a random entry without touching the disk"""
+        entries = self.entries
+        return random.choice(entries) if entries else None
+
+    def search(self, query: str, content_filter: ContentFilter = NO_FILTER) -> Optional[Entry]:
+        """
+        Pick a random entry matching every word of the query and allowed by the filter
+        Raises SearchUnavailable while a pack's index is being built
+        """
+        index = self.index
+        if index is None:
+            raise SearchUnavailable(f"the {self.key} search index is being built")
+        entries = index.entries
+        if content_filter == NO_FILTER:
+            entry_id = index.sample(query)
+            return entries[entry_id] if entry_id is not None else None
+
+        for _ in range(SAMPLE_ATTEMPTS):
+            entry_id = index.sample(query)
+            if entry_id is None:
+                return None
+            if content_filter.allows(entries[entry_id]):
+                return entries[entry_id]
+
+        # Most matches are filtered out, check them all instead
+        allowed = [entry_id for entry_id in index.search(query) if content_filter.allows(entries[entry_id])]
+        return entries[random.choice(allowed)] if allowed else None
+
+    def next_for(self, chat_id, content_filter: ContentFilter = NO_FILTER) -> Optional[Entry]:
+        """
+        Pick the next entry for a chat among those its filter allows
+        Equal weights walk a shuffled rotation with no repeats until all were shown,
+        custom weights are sampled from the filter's alias table instead
+        Packs ignore weights and check the filter on the rotation's picks
+        """
+        entries, _, tags = self._current
+        if isinstance(entries, MappedCorpus):
+            return self._next_from_pack(chat_id, entries, content_filter)
+        sampler = tags.sampler(content_filter)
+        if not len(sampler):
+            return None
+        if sampler.weighted:
+            return entries[sampler.pick()]
+        return entries[sampler.ids[self.rotation.next_index(chat_id, len(sampler))]]
+
+    def _next_from_pack(self, chat_id, entries: MappedCorpus, content_filter: ContentFilter) -> Optional[Entry]:
+        """The next allowed entry of the chat's rotation over the whole pack, or None if a few picks were all rejected"""
+        if not len(entries):
+            return None
+        for _ in range(SAMPLE_ATTEMPTS):
+            entry = entries[self.rotation.next_index(chat_id, len(entries))]
+            if content_filter.allows(entry):
+                return entry
+        return None
+
+QUOTES = ContentStore('data/quotes.json', 'quotes', pack='data/quotes.jsonl', defaults=[
+    {"text": "The only way to do great work is to love what you do.", "author": "Steve Jobs"},
+    {"text": "Life is what happens to you while you're busy making other plans.", "author": "John Lennon"},
+    {"text": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt"},
+    {"text": "It is during our darkest moments that we must focus to see the light.", "author": "Aristotle"},
+    {"text": "The only impossible journey is the one you never begin.", "author": "Tony Robbins"}
+])
+
+JOKES = ContentStore('data/jokes.json', 'jokes', pack='data/jokes.jsonl', defaults=[
+    "Why don't scientists trust atoms? Because they make up everything!",
+    "Why did the scarecrow win an award? He was outstanding in his field!",
+    "Why don't eggs tell jokes? They'd crack each other up!",
+    "What do you call a fake noodle? An impasta!",
+    "Why did the math book look so sad? Because it was full of problems!"
+])
+
+FACTS = ContentStore('data/facts.json', 'facts', pack='data/facts.jsonl', defaults=[
+    "Octopuses have three hearts and blue blood!",
+    "Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old!",
+    "Your brain uses about 20% of your body's total energy!",
+    "There are more possible games of chess than there are atoms in the observable universe!",
+    "A giraffe's tongue can be up to 20 inches long!"
+])
+
+CONTENT_STORES = (QUOTES, JOKES, FACTS)
+
+# Per-chat tag filters, shared by every kind of content
+CONTENT_FILTERS = JsonStore("data/content_filters.json")
+
+def get_chat_filter(chat_id) -> ContentFilter:
+    """The tag filter set for a chat, or no filter"""
+    saved = CONTENT_FILTERS.load().get(str(chat_id))
+    if not saved:
+        return NO_FILTER
+    return ContentFilter(tuple(saved.get('require', ())), tuple(saved.get('exclude', ())))
+
+def set_chat_filter(chat_id, content_filter: ContentFilter):
+    """Save a chat's tag filter, an empty filter removes it"""
+    filters = CONTENT_FILTERS.load()
+    if content_filter.require or content_filter.exclude:
+        filters[str(chat_id)] = {'require': list(content_filter.require), 'exclude': list(content_filter.exclude)}
+    else:
+        filters.pop(str(chat_id), None)
+    CONTENT_FILTERS.save(filters)
+
+async def watch_content(interval: float = CONTENT_RELOAD_INTERVAL):
+    """Poll the content files' mtimes and hot-swap changed content"""
+    while True:
+        await asyncio.sleep(interval)
+        for store in CONTENT_STORES:
+            # stat, parse and index off the loop, the swaps are single assignments
+            await asyncio.to_thread(store.reload)
+            await asyncio.to_thread(store.refresh_index)
@@ -0,0 +1,178 @@
+"""
+Memory-mapped content corpora for the Telegram Bot
+JSONL content packs with a binary line-offset index, so a random entry is found in O(1)
+and only that line is decoded, however large the pack is
+
+Build or refresh an index with:
+    python -m utils.corpus build data/quotes.jsonl
+Add --search to also save the keyword index, otherwise the bot builds it in the background
+Convert an existing JSON content file with:
+    python -m utils.corpus convert data/quotes.json quotes
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# magic, entry count, source size, source mtime in ns; offsets follow as native uint64
+INDEX_MAGIC = b"BOTIDX1\0"
+INDEX_HEADER = struct.Struct("=8sQQQ")
+CHUNK_SIZE = 1 << 20
+
+def index_path_for(path: str) -> str:
+    return f"{path}.idx"
+
+def build_index(path: str, index_path: str = None) -> int:
+    """
+    Scan a JSONL file and write the offset of every non-blank line
+    Streams in fixed-size chunks, so memory use does not grow with the file
+    """
+    index_path = index_path or index_path_for(path)
+    stat = os.stat(path)
+    tmp_path = f"{index_path}.tmp"
+    count = 0
+
+    with open(path, 'rb') as source, open(tmp_path, 'wb') as index:
+        index.write(INDEX_HEADER.pack(INDEX_MAGIC, 0, 0, 0))
+        offsets = array('Q')
+        position = 0
+        line_start = 0
+        line_has_text = False
+
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            start = 0
+            while True:
+                newline = chunk.find(b"\n", start)
+                end = newline if newline != -1 else len(chunk)
+                if not line_has_text and chunk[start:end].strip():
+                    line_has_text = True
+                if newline == -1:
+                    break
+                if line_has_text:
+                    offsets.append(line_start)
+                line_start = position + newline + 1
+                line_has_text = False
+                start = newline + 1
+            position += len(chunk)
+
+            count += len(offsets)
+            offsets.tofile(index)
+            del offsets[:]
+
+        # Last line without a trailing newline
+        if line_has_text:
+            array('Q', [line_start]).tofile(index)
+            count += 1
+
+        index.seek(0)
+        index.write(INDEX_HEADER.pack(INDEX_MAGIC, count, stat.st_size, stat.st_mtime_ns))
+
+    os.replace(tmp_path, index_path)
+    logger.info(f"🗂️ Indexed {count} entries in {path}")
+    return count
+
+def index_is_current(path: str, index_path: str, magic: bytes = INDEX_MAGIC) -> bool:
+    """Check that an index exists and was built from the current version of the file"""
+    try:
+        stat = os.stat(path)
+        with open(index_path, 'rb') as index:
+            found, _, size, mtime = INDEX_HEADER.unpack(index.read(INDEX_HEADER.size))
+    except (OSError, struct.error):
+        return False
+    return found == magic and size == stat.st_size and mtime == stat.st_mtime_ns
+
+def map_file(path: str):
+    """Read-only mapping of a whole file, empty bytes for an empty file"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        # The mapping stays valid after the file object is closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class MappedCorpus:
+    """
+    A JSONL content pack opened through mmap
+    Supports len() and indexing, so random.choice() works on it directly;
+    pages are loaded by the OS on demand and resident memory stays constant
+    """
+
+    def __init__(self, path: str, decode=json.loads):
+        self.path = path
+        self.decode = decode
+        index_path = index_path_for(path)
+        if not index_is_current(path, index_path):
+            build_index(path, index_path)
+
+        self._data = map_file(path)
+        self._index = map_file(index_path)
+        _, self.count, _, _ = INDEX_HEADER.unpack_from(self._index, 0)
+        self._offsets = memoryview(self._index)[INDEX_HEADER.size:].cast('Q') if self.count else ()
+
+    def __len__(self):
+        return self.count
+
+    def line(self, i: int) -> bytes:
+        """Raw bytes of entry i"""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start = self._offsets[i]
+        end = self._data.find(b"\n", start)
+        return self._data[start:end if end != -1 else len(self._data)]
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self.count
+        return self.decode(self.line(i))
+
+    def random(self):
+        return self[random.randrange(self.count)] if self.count else None
+
+def convert_json(json_path: str, key: str, jsonl_path: str = None) -> str:
+    """Write the entries of a {key: [...]} JSON content file as JSONL and index it"""
+    jsonl_path = jsonl_path or f"{os.path.splitext(json_path)[0]}.jsonl"
+    with open(json_path, 'r') as f:
+        entries = json.load(f).get(key, [])
+    with open(jsonl_path, 'w') as out:
+        for entry in entries:
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    build_index(jsonl_path)
+    return jsonl_path
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build offset indexes for JSONL content packs")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="index a JSONL file")
+    build.add_argument('paths', nargs='+')
+    build.add_argument('--search', action='store_true', help="also save the keyword search index")
+    convert = commands.add_parser('convert', help="convert a JSON content file to indexed JSONL")
+    convert.add_argument('json_path')
+    convert.add_argument('key', help="list key inside the JSON file, e.g. quotes")
+    convert.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for path in args.paths:
+            print(f"✅ {path}: {build_index(path)} entries")
+            if args.search:
+                from utils.content import parse_entry
+                from utils.search import build_index
+                corpus = MappedCorpus(path, decode=lambda line: parse_entry(json.loads(line)))
+                print(f"✅ {path}: {len(build_index(path, corpus))} search terms")
+    else:
+        output = convert_json(args.json_path, args.key, args.output)
+        print(f"✅ Wrote {output} ({len(MappedCorpus(output))} entries)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
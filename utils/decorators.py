@@ -5,11 +5,14 @@ Provides admin checking, rate limiting and other useful decorators
 
 import logging
 import asyncio
+import time
 from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
-from config import EMOJIS, MESSAGES
+from config import EMOJIS, MESSAGES, SLOW_HANDLER_THRESHOLD
+from utils.metrics import HANDLER_LATENCY, count_handler_error, current_handler, error_counted
+from utils.cache import register_rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +30,7 @@ def admin_required(func):
                 logger.error("Invalid update object in admin_required")
                 return
                 
-            # Get user's chat member status with retry logic
+            # Get user's chat member status live, a cached admin list can miss a demotion
             max_retries = 2
             for attempt in range(max_retries):
                 try:
@@ -88,7 +91,7 @@ def bot_admin_required(func):
                 logger.error("Invalid update/context in bot_admin_required")
                 return
                 
-            # Get bot's chat member status with retry logic
+            # Get bot's chat member status live, with retry logic
             max_retries = 2
             for attempt in range(max_retries):
                 try:
@@ -181,6 +184,8 @@ def rate_limit(max_calls=5, time_window=60):
     user_calls = {}
     
     def decorator(func):
+        register_rate_limit(f"{func.__module__}.{func.__name__}", user_calls)
+        
         @wraps(func)
         async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
             try:
@@ -241,3 +246,30 @@ def log_command_usage(func):
             return await func(update, context, *args, **kwargs)
     
     return wrapper
+
+
+def instrument_handler(name):
+    """Decorator to record latency and errors of a handler under the given name"""
+    def decorator(func):
+        latency = HANDLER_LATENCY.labels(name)
+        
+        @wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+            token = current_handler.set(name)
+            counted_token = error_counted.set(False)
+            start = time.perf_counter()
+            try:
+                return await func(update, context, *args, **kwargs)
+            except Exception:
+                count_handler_error()
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                latency.observe(elapsed)
+                error_counted.reset(counted_token)
+                current_handler.reset(token)
+                if elapsed >= SLOW_HANDLER_THRESHOLD:
+                    logger.warning(f"🐢 Slow handler {name}: {elapsed:.2f}s")
+        
+        return wrapper
+    return decorator
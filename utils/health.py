@@ -0,0 +1,120 @@
+"""
+Health reporting for the Telegram Bot
+Collects the timing and size of each pipeline stage for /health and the /status command
+"""
+
+import asyncio
+import logging
+import time
+from config import API_PROBE_INTERVAL, MAX_FLUSH_LAG, POLL_STALL_TIMEOUT
+from utils.lifecycle import TRACKER
+from utils.loopmon import LOOP_MONITOR
+from utils.metrics import (HANDLER_LATENCY, API_PROBE_RTT, STORE_FLUSH_LAG, UPDATE_QUEUE_DEPTH,
+                           OUTBOUND_QUEUE_DEPTH, PENDING_RESPONSES, merged_quantile)
+from utils.storage import STORES
+from utils.watchdog import WATCHDOG, age
+
+logger = logging.getLogger(__name__)
+
+class ApiProbe:
+    """Measures the Bot API round trip with a periodic getMe"""
+
+    def __init__(self, interval: float = API_PROBE_INTERVAL):
+        self.interval = interval
+        self.last_rtt = None
+        self.last_success = None
+        self.last_error = None
+        self._task = None
+
+    async def measure(self, bot):
+        """Call getMe once and record the round trip, returns seconds or None on failure"""
+        start = time.perf_counter()
+        try:
+            await bot.get_me()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"getMe probe failed: {e}")
+            return None
+        self.last_rtt = time.perf_counter() - start
+        self.last_success = time.monotonic()
+        self.last_error = None
+        API_PROBE_RTT.set(self.last_rtt)
+        return self.last_rtt
+
+    async def _run(self, bot):
+        while True:
+            await self.measure(bot)
+            await asyncio.sleep(self.interval)
+
+    def start(self, bot):
+        """Probe the given bot in the background"""
+        self.stop()
+        self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def fresh(self) -> bool:
+        """Whether a probe succeeded recently enough to trust"""
+        last = age(self.last_success)
+        return last is not None and last < self.interval * 3
+
+# Shared probe, started by the runtime for every Application
+API_PROBE = ApiProbe()
+
+def store_flush_lag() -> float:
+    """Age of the oldest unsaved change across all stores"""
+    lag = max((store.flush_lag for store in STORES), default=0.0)
+    STORE_FLUSH_LAG.set(lag)
+    return lag
+
+def seconds(value, digits=1):
+    """Round a duration for display, keeping None"""
+    return round(value, digits) if value is not None else None
+
+def milliseconds(value):
+    """Convert seconds to rounded milliseconds, keeping None"""
+    return round(value * 1000, 1) if value is not None else None
+
+def collect_health(running: bool) -> dict:
+    """
+    Snapshot every pipeline stage and decide readiness
+    Ready means polling works, the Bot API answers and stores are being written
+    """
+    poll_age = WATCHDOG.last_poll_age() if WATCHDOG.application is not None else None
+    flush_lag = store_flush_lag()
+
+    problems = []
+    if not running:
+        problems.append("application not running")
+    if poll_age is None or poll_age > POLL_STALL_TIMEOUT:
+        problems.append("getUpdates not succeeding")
+    if not API_PROBE.fresh:
+        problems.append("Bot API probe failing" if API_PROBE.last_error else "Bot API probe pending")
+    if flush_lag > MAX_FLUSH_LAG:
+        problems.append("store writes falling behind")
+    if not WATCHDOG.loop_responsive:
+        problems.append("event loop lagging")
+
+    return {
+        'ready': not problems,
+        'status': 'ok' if not problems else ('starting' if not running else 'degraded'),
+        'problems': problems,
+        'last_update_age_s': seconds(age(TRACKER.last_update_time)),
+        'last_getupdates_age_s': seconds(poll_age),
+        'updates_processed': TRACKER.processed,
+        'updates_in_flight': TRACKER.in_flight,
+        'handler_p50_ms': milliseconds(merged_quantile(HANDLER_LATENCY, 0.5)),
+        'handler_p99_ms': milliseconds(merged_quantile(HANDLER_LATENCY, 0.99)),
+        'api_rtt_ms': milliseconds(API_PROBE.last_rtt),
+        'api_probe_age_s': seconds(age(API_PROBE.last_success)),
+        'update_queue': UPDATE_QUEUE_DEPTH.get(),
+        'outbound_queue': OUTBOUND_QUEUE_DEPTH.get(),
+        'pending_responses': PENDING_RESPONSES.get(),
+        'store_flush_lag_s': seconds(flush_lag, 2),
+        'loop_lag_ms': milliseconds(LOOP_MONITOR.last_lag),
+        'watchdog_restarts': WATCHDOG.restarts
+    }
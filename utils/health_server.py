@@ -0,0 +1,233 @@
+"""
+Async HTTP server for health and status endpoints
+Runs on the bot's own event loop using only asyncio streams
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+MAX_HEADER_BYTES = 16384
+
+class Request:
+    """A parsed HTTP request"""
+    __slots__ = ("method", "path", "query", "headers")
+
+    def __init__(self, method, path, query, headers):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+
+class Response:
+    """An HTTP response with a fully buffered body"""
+    __slots__ = ("status", "body", "content_type", "headers")
+
+    def __init__(self, body=b"", status=200, content_type="text/plain; charset=utf-8", headers=None):
+        self.status = status
+        self.body = body.encode() if isinstance(body, str) else body
+        self.content_type = content_type
+        self.headers = headers or {}
+
+class StreamResponse:
+    """
+    A response whose body is produced by an async iterator of chunks
+    Used for Server-Sent Events, the connection stays open until the iterator ends
+    """
+    __slots__ = ("status", "chunks", "content_type", "headers")
+
+    def __init__(self, chunks, content_type="text/event-stream; charset=utf-8", headers=None):
+        self.status = 200
+        self.chunks = chunks
+        self.content_type = content_type
+        self.headers = headers or {}
+
+class StaticAsset:
+    """
+    A body rendered once and served with ETag revalidation and gzip
+    Clients that already have the current version get an empty 304
+    """
+
+    def __init__(self, body, content_type, max_age=0):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.content_type = content_type
+        self.gzipped = gzip.compress(self.body, compresslevel=9)
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()[:16]}"'
+        self.cache_control = f"public, max-age={max_age}, must-revalidate" if max_age else "no-cache"
+
+    def respond(self, request) -> Response:
+        """Build the response for a request, honouring If-None-Match and Accept-Encoding"""
+        headers = {'ETag': self.etag, 'Cache-Control': self.cache_control, 'Vary': 'Accept-Encoding'}
+
+        if_none_match = request.headers.get('if-none-match', '')
+        if self.etag in if_none_match or if_none_match.strip() == '*':
+            return Response(b"", 304, self.content_type, headers)
+
+        if accepts_gzip(request):
+            headers['Content-Encoding'] = 'gzip'
+            return Response(self.gzipped, 200, self.content_type, headers)
+        return Response(self.body, 200, self.content_type, headers)
+
+def accepts_gzip(request) -> bool:
+    """Check whether the client accepts a gzip encoded body"""
+    for coding in request.headers.get('accept-encoding', '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() == 'gzip':
+            return params.replace(' ', '') != 'q=0'
+    return False
+
+def json_response(data, status=200, indent=None):
+    """Build a JSON response"""
+    return Response(json.dumps(data, indent=indent), status, "application/json")
+
+def text_response(text, status=200):
+    """Build a plain text response"""
+    return Response(text, status)
+
+class HealthServer:
+    """Minimal HTTP/1.1 server dispatching GET requests by path"""
+
+    def __init__(self, host="0.0.0.0", port=5000):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self._server = None
+        self._streams = set()
+
+    def route(self, path, handler):
+        """Register an async handler taking a Request and returning a Response"""
+        self.routes[path] = handler
+
+    async def start(self):
+        """Bind the port and start accepting connections"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info(f"✅ Health server running on port {self.port}")
+
+    async def stop(self):
+        """Stop accepting connections and close the listening socket"""
+        if self._server is not None:
+            self._server.close()
+            # Event streams never finish on their own
+            for task in list(self._streams):
+                task.cancel()
+            await self._server.wait_closed()
+            self._server = None
+            logger.info("🛑 Health server stopped")
+
+    async def _read_request(self, reader):
+        """Read and parse the request line and headers"""
+        raw = await reader.readuntil(b"\r\n\r\n")
+        if len(raw) > MAX_HEADER_BYTES:
+            return None
+
+        lines = raw.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            return None
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(parts[1])
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return Request(parts[0].upper(), url.path, query, headers)
+
+    async def _dispatch(self, request):
+        """Find the route for a request and run it"""
+        if request is None:
+            return json_response({'error': 'Bad request'}, 400)
+
+        handler = self.routes.get(request.path)
+        if handler is None:
+            return json_response({'error': 'Not found', 'available_endpoints': sorted(self.routes)}, 404)
+
+        if request.method not in ("GET", "HEAD"):
+            return json_response({'error': 'Method not allowed'}, 405)
+
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"Error handling request {request.path}: {e}")
+            return json_response({'error': 'Internal server error'}, 500)
+
+    def _write_head(self, writer, response, extra):
+        """Write the status line and headers"""
+        head = [
+            f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'OK')}",
+            f"Content-Type: {response.content_type}",
+            *extra,
+            "Access-Control-Allow-Origin: *",
+            "Connection: close"
+        ]
+        for name, value in response.headers.items():
+            head.append(f"{name}: {value}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+    async def _write_response(self, writer, request, response):
+        """Serialize a response to the client"""
+        if isinstance(response, StreamResponse):
+            await self._write_stream(writer, request, response)
+            return
+
+        self._write_head(writer, response, [f"Content-Length: {len(response.body)}"])
+        if request is None or request.method != "HEAD":
+            writer.write(response.body)
+        await writer.drain()
+
+    async def _write_stream(self, writer, request, response):
+        """Send chunks as they are produced until the stream or the client ends"""
+        self._write_head(writer, response, ["Cache-Control: no-cache"])
+        await writer.drain()
+        if request.method == "HEAD":
+            return
+
+        task = asyncio.current_task()
+        self._streams.add(task)
+        try:
+            async for chunk in response.chunks:
+                writer.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                await writer.drain()
+        except asyncio.CancelledError:
+            # Cancelled by stop(), the connection is closed by the caller
+            pass
+        finally:
+            self._streams.discard(task)
+            aclose = getattr(response.chunks, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+
+    async def _handle_connection(self, reader, writer):
+        """Serve a single request per connection"""
+        try:
+            try:
+                request = await asyncio.wait_for(self._read_request(reader), timeout=10)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+
+            response = await self._dispatch(request)
+            await self._write_response(writer, request, response)
+
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Health server connection error: {e}")
+        finally:
+            writer.close()
@@ -9,12 +9,32 @@ from datetime import datetime, timezone, timedelta
 from telegram import Update, User
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
+from utils.cache import find_user_by_username, get_chat_admins
+from utils.members import MEMBERS
 
 # Indian Standard Time (IST) timezone
 IST = timezone(timedelta(hours=5, minutes=30))
 
 logger = logging.getLogger(__name__)
 
+async def find_known_user(bot, chat_id: int, username: str):
+    """
+    A user from the username index, only if they belong to this chat
+    Users the member registry has seen here are trusted, anyone else is
+    confirmed with a single get_chat_member call
+    """
+    known_user = find_user_by_username(username)
+    if known_user is None:
+        return None
+    if MEMBERS.get(chat_id, known_user.id) is not None:
+        return known_user
+    try:
+        chat_member = await bot.get_chat_member(chat_id, known_user.id)
+    except BadRequest as e:
+        logger.warning(f"Indexed user {known_user.id} not found in chat {chat_id}: {e}")
+        return None
+    return chat_member.user
+
 async def get_user_from_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Extract user from command arguments or replied message
@@ -46,8 +66,14 @@ async def get_user_from_message(update: Update, context: ContextTypes.DEFAULT_TY
             elif user_input.startswith('@'):
                 username = user_input[1:].lower()
                 try:
-                    # Search through administrators first (they're most likely to be targeted)
-                    administrators = await context.bot.get_chat_administrators(update.effective_chat.id)
+                    # Anyone the bot has seen recently is in the username index
+                    known_user = await find_known_user(context.bot, update.effective_chat.id, username)
+                    if known_user:
+                        logger.info(f"Found user via username index: {known_user.id} ({known_user.first_name})")
+                        return known_user
+                    
+                    # Search through administrators next (they're most likely to be targeted)
+                    administrators = await get_chat_admins(context.bot, update.effective_chat.id)
                     for admin in administrators:
                         if admin.user.username and admin.user.username.lower() == username:
                             logger.info(f"Found admin user via username: {admin.user.id} ({admin.user.first_name})")
@@ -64,7 +90,10 @@ async def get_user_from_message(update: Update, context: ContextTypes.DEFAULT_TY
             # Try parsing as plain username without @
             else:
                 try:
-                    administrators = await context.bot.get_chat_administrators(update.effective_chat.id)
+                    known_user = await find_known_user(context.bot, update.effective_chat.id, user_input)
+                    if known_user:
+                        return known_user
+                    administrators = await get_chat_admins(context.bot, update.effective_chat.id)
                     for admin in administrators:
                         if admin.user.username and admin.user.username.lower() == user_input.lower():
                             logger.info(f"Found admin user via plain username: {admin.user.id} ({admin.user.first_name})")
@@ -0,0 +1,139 @@
+"""
+Language detection for the Telegram Bot
+Scores hashed character n-gram counts against per-language profiles with NumPy,
+one text or a whole batch of messages per call
+"""
+
+import json
+import logging
+import re
+from typing import NamedTuple, Optional
+import numpy as np
+from utils.translation import PHRASES_FILE
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_FILE = "data/language_samples.json"
+
+NGRAM_SIZES = (1, 2, 3)
+HASH_BUCKETS = 1 << 14
+HASH_MULTIPLIER = np.uint64(1000003)
+# Add-alpha smoothing for n-grams a language's samples never contain
+SMOOTHING = 0.1
+# Texts scored together, bounds the (n-grams x languages) matrix of a batch
+BATCH_SIZE = 256
+
+# Digits, punctuation and underscores separate words, they say nothing about the language
+NON_LETTERS = re.compile(r"[\W\d_]+")
+
+class Detection(NamedTuple):
+    """The most likely language of a text and its posterior probability"""
+    language: Optional[str]
+    confidence: float
+
+def ngram_hashes(text: str) -> np.ndarray:
+    """Bucket of every 1-, 2- and 3-gram of the text, words padded with spaces"""
+    text = f" {NON_LETTERS.sub(' ', text.lower()).strip()} "
+    if len(text) <= 2:
+        return np.empty(0, dtype=np.int64)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    parts = []
+    for n in NGRAM_SIZES:
+        count = len(codes) - n + 1
+        if count <= 0:
+            continue
+        hashes = np.full(count, n, dtype=np.uint64)
+        for k in range(n):
+            # Wraps around on overflow, which is all a hash needs
+            hashes = hashes * HASH_MULTIPLIER ^ codes[k:k + count]
+        parts.append(hashes)
+    return (np.concatenate(parts) % np.uint64(HASH_BUCKETS)).astype(np.int64)
+
+def load_training_texts(samples_path: str = SAMPLES_FILE, phrases_path: str = PHRASES_FILE) -> dict:
+    """Sample paragraphs per language, plus the phrasebook so short greetings are recognised"""
+    texts = {}
+    with open(samples_path, 'r', encoding='utf-8') as f:
+        for language, sample in json.load(f).items():
+            texts.setdefault(language, []).append(sample)
+    try:
+        with open(phrases_path, 'r', encoding='utf-8') as f:
+            for row in json.load(f).get('phrases', []):
+                for language, value in row.items():
+                    texts.setdefault(language, []).extend(value if isinstance(value, list) else [value])
+    except Exception as e:
+        logger.warning(f"Language detection is trained without the phrasebook: {e}")
+    return texts
+
+class LanguageDetector:
+    """
+    Naive Bayes over hashed character n-grams
+    Each language is a row of smoothed log-probabilities, so scoring a text is
+    a gather and a sum over its n-gram buckets
+    """
+
+    def __init__(self, texts: dict):
+        self.languages = tuple(sorted(texts))
+        counts = np.zeros((len(self.languages), HASH_BUCKETS), dtype=np.float64)
+        for row, language in enumerate(self.languages):
+            for text in texts[language]:
+                counts[row] += np.bincount(ngram_hashes(text), minlength=HASH_BUCKETS)
+        totals = counts.sum(axis=1, keepdims=True)
+        # Transposed so the buckets of a text select contiguous rows
+        self.log_probabilities = np.log((counts + SMOOTHING) / (totals + SMOOTHING * HASH_BUCKETS)).T.astype(np.float32)
+
+    @classmethod
+    def from_files(cls, samples_path: str = SAMPLES_FILE, phrases_path: str = PHRASES_FILE):
+        return cls(load_training_texts(samples_path, phrases_path))
+
+    def scores(self, texts: list):
+        """
+        Log-likelihood of every text under every language, shape (texts, languages),
+        and the number of n-grams each text had
+        """
+        hashes = [ngram_hashes(text) for text in texts]
+        lengths = np.array([len(h) for h in hashes])
+        scores = np.zeros((len(texts), len(self.languages)), dtype=np.float64)
+        if not lengths.any():
+            return scores, lengths
+        gathered = self.log_probabilities[np.concatenate(hashes)]
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        nonempty = lengths > 0
+        scores[nonempty] = np.add.reduceat(gathered, starts[nonempty], axis=0)
+        return scores, lengths
+
+    def detect_batch(self, texts: list) -> list:
+        """A Detection per text, texts without letters get Detection(None, 0.0)"""
+        detections = []
+        for offset in range(0, len(texts), BATCH_SIZE):
+            chunk = texts[offset:offset + BATCH_SIZE]
+            scores, lengths = self.scores(chunk)
+            best = scores.argmax(axis=1)
+            # Posterior with equal priors, a softmax over the log-likelihoods
+            shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+            confidence = shifted[np.arange(len(chunk)), best] / shifted.sum(axis=1)
+            for length, index, probability in zip(lengths, best, confidence):
+                if not length:
+                    detections.append(Detection(None, 0.0))
+                else:
+                    detections.append(Detection(self.languages[index], float(probability)))
+        return detections
+
+    def detect(self, text: str) -> Detection:
+        return self.detect_batch([text])[0]
+
+_detector = None
+
+def get_detector() -> LanguageDetector:
+    """The shared detector, trained on first use"""
+    global _detector
+    if _detector is None:
+        _detector = LanguageDetector.from_files()
+        logger.info(f"🔎 Language detection ready for {len(_detector.languages)} languages")
+    return _detector
+
+def detect_language(text: str) -> Detection:
+    return get_detector().detect(text)
+
+def detect_languages(texts: list) -> list:
+    """Classify many messages in one call"""
+    return get_detector().detect_batch(texts)
@@ -0,0 +1,212 @@
+"""
+Lifecycle helpers for the Telegram Bot
+Tracks in-flight updates and performs the drain-and-flush shutdown sequence
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from telegram import Update
+from telegram.ext import Application
+from config import SHUTDOWN_CANCEL_GRACE
+from utils.storage import JsonStore, flush_all
+from utils.cache import remember_user, invalidate_for_update
+from utils.members import MEMBERS
+from utils.analytics import ACTIVITY
+from utils.responder import RESPONDER
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_STATE_FILE = "data/runtime_state.json"
+
+# Telegram picks update ids at random again after a week without updates,
+# so an older saved offset says nothing about the next ids
+OFFSET_MAX_AGE = 6 * 24 * 3600
+
+class UpdateTracker:
+    """Counts updates being processed and remembers the last one"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.processed = 0
+        self.last_update_id = None
+        self.last_update_time = None
+        self.last_update_at = None
+        # task -> update it is processing, so a shutdown can cancel and record them
+        self.active = {}
+        # Updates up to this id were handled by the previous run, except the replayed ones
+        self.skip_through = None
+        self.replayed = set()
+
+    def begin(self, update):
+        """Mark an update as started"""
+        self.in_flight += 1
+        task = asyncio.current_task()
+        if task is not None:
+            self.active[task] = update
+
+    def end(self, update):
+        """Mark an update as finished"""
+        self.in_flight -= 1
+        self.processed += 1
+        self.active.pop(asyncio.current_task(), None)
+        self.last_update_time = time.monotonic()
+        self.last_update_at = time.time()
+        update_id = getattr(update, 'update_id', None)
+        if update_id is not None and (self.last_update_id is None or update_id > self.last_update_id):
+            self.last_update_id = update_id
+
+    def resume_after(self, last_update_id, replayed=()):
+        """Skip updates the previous run already handled, other than the ones it handed over"""
+        self.skip_through = last_update_id
+        self.replayed = {update.update_id for update in replayed}
+
+    def already_processed(self, update) -> bool:
+        update_id = getattr(update, 'update_id', None)
+        return (self.skip_through is not None and update_id is not None
+                and update_id <= self.skip_through and update_id not in self.replayed)
+
+    def cancel_in_flight(self) -> list:
+        """Cancel every update still being processed, returns those updates"""
+        interrupted = []
+        for task, update in list(self.active.items()):
+            if not task.done():
+                task.cancel()
+                interrupted.append(update)
+        return interrupted
+
+# Shared tracker, fed by TrackingApplication
+TRACKER = UpdateTracker()
+
+class TrackingApplication(Application):
+    """Application that reports every processed update to the tracker"""
+
+    async def process_update(self, update: object) -> None:
+        if TRACKER.already_processed(update):
+            logger.info(f"⏭️ Skipping update {update.update_id}, handled before the restart")
+            return
+        TRACKER.begin(update)
+        if isinstance(update, Update):
+            remember_user(update.effective_user)
+            invalidate_for_update(update)
+            MEMBERS.observe(update)
+            ACTIVITY.observe(update)
+        try:
+            await super().process_update(update)
+        finally:
+            TRACKER.end(update)
+
+class RuntimeState:
+    """Update offset and undelivered updates persisted across restarts"""
+
+    def __init__(self, path: str = RUNTIME_STATE_FILE):
+        self.store = JsonStore(path)
+
+    @property
+    def last_update_id(self):
+        """The last update the previous run handled, None once update ids may have been reset"""
+        state = self.store.load()
+        last_update_at = state.get('last_update_at')
+        if last_update_at is None or time.time() - last_update_at > OFFSET_MAX_AGE:
+            return None
+        return state.get('last_update_id')
+
+    def save(self, last_update_id, pending_updates, interrupted_updates=(), last_update_at=None):
+        """Persist the offset, any updates that were fetched but not handled and the ids of interrupted ones"""
+        self.store.save({
+            'last_update_id': last_update_id,
+            'last_update_at': last_update_at,
+            'pending_updates': [update.to_dict() for update in pending_updates],
+            'interrupted_updates': [update.update_id for update in interrupted_updates],
+            'saved_at': datetime.now().isoformat()
+        })
+        self.store.flush()
+
+    def take_pending(self, bot) -> list:
+        """Load and clear the updates left over from the previous run"""
+        state = self.store.load()
+        raw_updates = state.get('pending_updates') or []
+        interrupted = state.get('interrupted_updates') or []
+        if interrupted:
+            # Their handlers may have had side effects already, so they are not run again
+            logger.warning(f"⚠️ The last shutdown interrupted update(s) {interrupted}, they were not retried")
+        if not raw_updates and not interrupted:
+            return []
+
+        updates = []
+        for data in raw_updates:
+            try:
+                updates.append(Update.de_json(data, bot))
+            except Exception as e:
+                logger.warning(f"Dropping unreadable pending update: {e}")
+
+        state['pending_updates'] = []
+        state['interrupted_updates'] = []
+        self.store.save(state)
+        self.store.flush()
+        return updates
+
+def take_queued_updates(application: Application) -> list:
+    """Remove updates still waiting in the update queue"""
+    pending = []
+    others = []
+    while not application.update_queue.empty():
+        item = application.update_queue.get_nowait()
+        application.update_queue.task_done()
+        if isinstance(item, Update):
+            pending.append(item)
+        else:
+            others.append(item)
+
+    # Put back the stop signal so the update fetcher still exits once it is free
+    for item in others:
+        application.update_queue.put_nowait(item)
+    return pending
+
+async def drain_and_flush(application: Application, state: RuntimeState, timeout: float,
+                          grace: float = SHUTDOWN_CANCEL_GRACE):
+    """
+    Graceful shutdown sequence
+    1. stop accepting updates
+    2. drain in-flight handlers within the deadline, then cancel the rest
+    3. send coalesced responses and flush the JSON stores
+    4. persist the update offset, undelivered updates and interrupted ones
+    """
+    started = time.monotonic()
+
+    # 1. Stop fetching new updates from Telegram
+    if application.updater and application.updater.running:
+        await application.updater.stop()
+    logger.info("🛑 Stopped accepting updates")
+
+    # 2. Let queued and in-flight updates finish, up to the deadline
+    pending = []
+    interrupted = []
+    stop_task = asyncio.ensure_future(application.stop())
+    try:
+        await asyncio.wait_for(asyncio.shield(stop_task), timeout=timeout)
+        logger.info(f"✅ Drained in-flight updates in {time.monotonic() - started:.1f}s")
+    except asyncio.TimeoutError:
+        pending = take_queued_updates(application)
+        interrupted = TRACKER.cancel_in_flight()
+        logger.warning(
+            f"⚠️ Drain deadline of {timeout}s reached, cancelled {len(interrupted)} update(s) in flight, "
+            f"keeping {len(pending)} queued update(s) for the next start"
+        )
+        # stop() finishes once the cancelled handlers unwind, it is not left running past shutdown
+        try:
+            await asyncio.wait_for(asyncio.gather(stop_task, return_exceptions=True), timeout=grace)
+        except asyncio.TimeoutError:
+            logger.error(f"Application did not stop within {grace}s of cancelling its handlers")
+
+    # 3. Write out everything the handlers sent or changed
+    batches = await RESPONDER.flush_all()
+    if batches:
+        logger.info(f"📦 Sent {batches} pending response batch(es)")
+    written = flush_all()
+    logger.info(f"💾 Flushed {written} store(s)")
+
+    # 4. Remember where we stopped
+    state.save(TRACKER.last_update_id, pending, interrupted, TRACKER.last_update_at)
+    logger.info(f"📌 Saved update offset {TRACKER.last_update_id}")
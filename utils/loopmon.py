@@ -0,0 +1,131 @@
+"""
+Event loop monitor for the Telegram Bot
+Measures scheduling lag and logs the stack of anything that blocks the loop
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from config import LOOP_PROBE_INTERVAL, LOOP_BLOCK_THRESHOLD
+from utils.metrics import LOOP_LAG, LOOP_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+class LoopMonitor:
+    """
+    Two cooperating probes
+    - a task on the loop that sleeps for interval and records how late it woke up
+    - a watchdog thread that notices when that task is overdue and captures
+      the loop thread's stack while the blocking code is still running
+    """
+
+    def __init__(self, interval: float = LOOP_PROBE_INTERVAL, threshold: float = LOOP_BLOCK_THRESHOLD,
+                 max_blocks: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.recent_blocks = deque(maxlen=max_blocks)
+        self._heartbeat = None
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start probing the running event loop"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Event loop monitor started (block threshold {self.threshold}s)")
+
+    async def stop(self):
+        """Stop the probe task and the watchdog thread"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _probe(self):
+        """Sleep for the interval and record how late the wake-up was"""
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - due)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+            if lag >= self.threshold:
+                # The watchdog saw it while it happened, fill in how long it lasted
+                if self.recent_blocks and self.recent_blocks[-1]['duration'] is None:
+                    self.recent_blocks[-1]['duration'] = round(lag, 3)
+                logger.warning(f"⚠️ Event loop was blocked for {lag:.3f}s")
+
+    def _watch(self):
+        """Watchdog thread, captures the loop stack when the probe is overdue"""
+        reported = None
+        check_every = max(self.threshold / 2, 0.01)
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.threshold or heartbeat == reported:
+                continue
+
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            self.blocks += 1
+            LOOP_BLOCKS.inc()
+            self.recent_blocks.append({
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'duration': None,
+                'stack': stack
+            })
+            logger.warning(f"⚠️ Event loop blocked for more than {overdue:.3f}s, loop thread stack:\n{stack}")
+
+    def snapshot(self) -> dict:
+        """Current numbers for the health server"""
+        child = LOOP_LAG.labels()
+        p50 = child.quantile(0.5)
+        p99 = child.quantile(0.99)
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'block_threshold': self.threshold,
+            'last_lag_ms': round(self.last_lag * 1000, 2),
+            'max_lag_ms': round(self.max_lag * 1000, 2),
+            'p50_lag_ms': round(p50 * 1000, 2) if p50 is not None else None,
+            'p99_lag_ms': round(p99 * 1000, 2) if p99 is not None else None,
+            'probes': child.count,
+            'blocks': self.blocks,
+            'recent_blocks': list(self.recent_blocks)
+        }
+
+# Shared monitor, started by the runtime
+LOOP_MONITOR = LoopMonitor()
@@ -0,0 +1,328 @@
+"""
+Member registry for the Telegram Bot
+Tracks joins, leaves and activity per chat from the updates the bot already
+receives, in array-backed columns persisted through an append-only journal
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from array import array
+from typing import NamedTuple, Optional
+from telegram import Chat, ChatMember
+from config import MEMBER_COUNT_RESYNC
+from utils.cache import get_member_count
+from utils.storage import STORES, JsonStore
+
+logger = logging.getLogger(__name__)
+
+MEMBERS_FILE = "data/members.journal"
+MEMBER_COUNTS_FILE = "data/member_counts.json"
+
+# Status codes stored per row, the first four are in the chat
+STATUSES = (ChatMember.MEMBER, ChatMember.ADMINISTRATOR, ChatMember.OWNER, ChatMember.RESTRICTED,
+            ChatMember.LEFT, ChatMember.BANNED)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+ABSENT = STATUS_CODES[ChatMember.LEFT]
+
+# Flag on a status code that came from a join, leave or chat_member event,
+# rows first seen through a message are assumed to be members without it
+CONFIRMED = 0x80
+STATUS_MASK = 0x7f
+
+# chat id, user id, joined, first seen, last seen, message count, status
+RECORD = struct.Struct("=qqdddIB")
+
+# Rewrite the journal once it holds this many records per live row
+COMPACT_RATIO = 4
+
+def effective_status(member: ChatMember) -> str:
+    # Restricted users may have left the chat and still be restricted
+    if member.status == ChatMember.RESTRICTED and not member.is_member:
+        return ChatMember.LEFT
+    return member.status
+
+class MemberRecord(NamedTuple):
+    """What the registry knows about one user in one chat, times are Unix timestamps"""
+    user_id: int
+    status: str
+    joined: Optional[float]
+    first_seen: float
+    last_seen: float
+    messages: int
+    confirmed: bool = False
+
+    @property
+    def present(self) -> bool:
+        return STATUS_CODES[self.status] < ABSENT
+
+class ChatMembers:
+    """Column arrays for one chat, rows are found through a user id -> slot map"""
+
+    def __init__(self):
+        self.slots = {}
+        self.user_ids = array('q')
+        self.joined = array('d')
+        self.first_seen = array('d')
+        self.last_seen = array('d')
+        self.messages = array('I')
+        self.statuses = bytearray()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def slot(self, user_id: int, when: float) -> int:
+        """Row of a user, added as a member first seen at when if new"""
+        slot = self.slots.get(user_id)
+        if slot is None:
+            slot = self.slots[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.joined.append(0.0)
+            self.first_seen.append(when)
+            self.last_seen.append(when)
+            self.messages.append(0)
+            self.statuses.append(STATUS_CODES[ChatMember.MEMBER])
+        return slot
+
+    def get(self, user_id: int) -> Optional[MemberRecord]:
+        slot = self.slots.get(user_id)
+        if slot is None:
+            return None
+        status = self.statuses[slot]
+        return MemberRecord(self.user_ids[slot], STATUSES[status & STATUS_MASK], self.joined[slot] or None,
+                            self.first_seen[slot], self.last_seen[slot], self.messages[slot],
+                            bool(status & CONFIRMED))
+
+    def row(self, slot: int) -> tuple:
+        return (self.user_ids[slot], self.joined[slot], self.first_seen[slot], self.last_seen[slot],
+                self.messages[slot], self.statuses[slot])
+
+    def load_row(self, user_id, joined, first_seen, last_seen, messages, status):
+        slot = self.slot(user_id, first_seen)
+        self.joined[slot] = joined
+        self.first_seen[slot] = first_seen
+        self.last_seen[slot] = last_seen
+        self.messages[slot] = messages
+        self.statuses[slot] = status
+
+    def is_present(self, slot: int) -> bool:
+        return self.statuses[slot] & STATUS_MASK < ABSENT
+
+    def present(self) -> int:
+        return sum(1 for status in self.statuses if status & STATUS_MASK < ABSENT)
+
+    def active_since(self, since: float) -> int:
+        """Members who sent a message at or after since"""
+        return sum(1 for seen, count, status in zip(self.last_seen, self.messages, self.statuses)
+                   if status & STATUS_MASK < ABSENT and count and seen >= since)
+
+    def joined_since(self, since: float) -> int:
+        return sum(1 for joined, status in zip(self.joined, self.statuses)
+                   if status & STATUS_MASK < ABSENT and joined >= since)
+
+class MemberRegistry:
+    """
+    Per-chat member tables fed by service messages and chat_member updates
+    Changed rows are appended to the journal write-behind, like a JsonStore,
+    and the journal is rewritten from the live rows once it grows too long.
+    The member count is seeded from Telegram and then follows joins and leaves
+    """
+
+    def __init__(self, path: str = MEMBERS_FILE, counts: JsonStore = None, flush_delay: float = 2.0):
+        self.path = path
+        self.counts = counts if counts is not None else JsonStore(MEMBER_COUNTS_FILE)
+        self.flush_delay = flush_delay
+        self.dirty_since = None
+        self.records_on_disk = 0
+        self._chats = None
+        self._dirty = set()
+        self._flush_handle = None
+
+    @property
+    def chats(self) -> dict:
+        """Chat id -> ChatMembers, replayed from the journal the first time"""
+        if self._chats is None:
+            self._chats = {}
+            self._replay()
+        return self._chats
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Error loading {self.path}: {e}")
+            return
+        # A torn last record from a crash mid-write is cut off, so appends stay aligned
+        usable = len(data) - len(data) % RECORD.size
+        if usable < len(data):
+            try:
+                os.truncate(self.path, usable)
+                logger.warning(f"Dropped a torn record of {len(data) - usable} bytes from {self.path}")
+            except OSError as e:
+                logger.error(f"Error truncating {self.path}: {e}")
+        skipped = 0
+        for chat_id, *row in RECORD.iter_unpack(memoryview(data)[:usable]):
+            if row[-1] & STATUS_MASK >= len(STATUSES):
+                skipped += 1
+                continue
+            self._chats.setdefault(chat_id, ChatMembers()).load_row(*row)
+        if skipped:
+            logger.warning(f"Skipped {skipped} record(s) with an unknown status in {self.path}")
+        self.records_on_disk = usable // RECORD.size
+        logger.info(f"👥 Loaded {sum(len(m) for m in self._chats.values())} member(s) in {len(self._chats)} chat(s)")
+
+    def chat(self, chat_id: int) -> ChatMembers:
+        return self.chats.setdefault(chat_id, ChatMembers())
+
+    def get(self, chat_id: int, user_id: int) -> Optional[MemberRecord]:
+        members = self.chats.get(chat_id)
+        return members.get(user_id) if members is not None else None
+
+    def set_status(self, chat_id: int, user_id: int, status: str, when: float, was_present: bool = None):
+        """
+        Record a user's new status, keeping the member count in step
+        was_present describes users the registry has not seen yet, by default
+        someone unknown who leaves was a member all along and vice versa
+        """
+        members = self.chat(chat_id)
+        code = STATUS_CODES[status]
+        if user_id in members.slots:
+            was_present = members.is_present(members.slots[user_id])
+        elif was_present is None:
+            was_present = code >= ABSENT
+        slot = members.slot(user_id, when)
+        members.statuses[slot] = code | CONFIRMED
+        if code < ABSENT and not was_present:
+            members.joined[slot] = when
+            self._adjust_count(chat_id, 1)
+        elif code >= ABSENT and was_present:
+            self._adjust_count(chat_id, -1)
+        self._touch(chat_id, slot)
+
+    def joined(self, chat_id: int, user_id: int, when: float):
+        record = self.get(chat_id, user_id)
+        if record is None or not record.present:
+            self.set_status(chat_id, user_id, ChatMember.MEMBER, when)
+
+    def left(self, chat_id: int, user_id: int, when: float):
+        record = self.get(chat_id, user_id)
+        if record is None or record.present:
+            self.set_status(chat_id, user_id, ChatMember.LEFT, when)
+
+    def seen(self, chat_id: int, user_id: int, when: float):
+        """Count a message from the user"""
+        members = self.chat(chat_id)
+        slot = members.slot(user_id, when)
+        members.last_seen[slot] = max(members.last_seen[slot], when)
+        members.messages[slot] += 1
+        self._touch(chat_id, slot)
+
+    def observe(self, update):
+        """Feed an update, only group chats are tracked"""
+        chat = update.effective_chat
+        if chat is None or chat.type not in (Chat.GROUP, Chat.SUPERGROUP):
+            return
+        if update.chat_member is not None:
+            old, new = update.chat_member.old_chat_member, update.chat_member.new_chat_member
+            self.set_status(chat.id, new.user.id, effective_status(new), update.chat_member.date.timestamp(),
+                            was_present=STATUS_CODES[effective_status(old)] < ABSENT)
+
+        message = update.message
+        if message is None:
+            return
+        when = message.date.timestamp()
+        if message.new_chat_members:
+            for user in message.new_chat_members:
+                self.joined(chat.id, user.id, when)
+        elif message.left_chat_member:
+            self.left(chat.id, message.left_chat_member.id, when)
+        elif message.from_user:
+            self.seen(chat.id, message.from_user.id, when)
+
+    def _adjust_count(self, chat_id: int, delta: int):
+        counts = self.counts.load()
+        entry = counts.get(str(chat_id))
+        if entry is not None:
+            entry[0] = max(0, entry[0] + delta)
+            self.counts.save(counts)
+
+    async def member_count(self, bot, chat_id: int) -> int:
+        """Member count from joins and leaves, asking Telegram only to seed or resync it"""
+        counts = self.counts.load()
+        entry = counts.get(str(chat_id))
+        if entry is not None and time.time() - entry[1] < MEMBER_COUNT_RESYNC:
+            return entry[0]
+        count = await get_member_count(bot, chat_id)
+        counts[str(chat_id)] = [count, time.time()]
+        self.counts.save(counts)
+        return count
+
+    def _touch(self, chat_id: int, slot: int):
+        """Mark a row for the next journal write"""
+        self._dirty.add((chat_id, slot))
+        if self.dirty_since is None:
+            self.dirty_since = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts and tests), write straight away
+            self.flush()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self) -> bool:
+        """Append changed rows to the journal, or rewrite it when it has grown too long"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return False
+
+        rows = sum(len(members) for members in self.chats.values())
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if self.records_on_disk + len(self._dirty) > COMPACT_RATIO * rows + 1000:
+                self._compact()
+            else:
+                records = b"".join(RECORD.pack(chat_id, *self._chats[chat_id].row(slot))
+                                   for chat_id, slot in self._dirty)
+                with open(self.path, 'ab') as f:
+                    f.write(records)
+                self.records_on_disk += len(self._dirty)
+            self._dirty.clear()
+            self.dirty_since = None
+            return True
+        except Exception as e:
+            logger.error(f"Error saving {self.path}: {e}")
+            return False
+
+    def _compact(self):
+        """Replace the journal with one record per row"""
+        tmp_path = f"{self.path}.tmp"
+        count = 0
+        with open(tmp_path, 'wb') as f:
+            for chat_id, members in self._chats.items():
+                f.write(b"".join(RECORD.pack(chat_id, *members.row(slot)) for slot in range(len(members))))
+                count += len(members)
+        os.replace(tmp_path, self.path)
+        logger.info(f"🗜️ Compacted {self.path} from {self.records_on_disk} to {count} records")
+        self.records_on_disk = count
+
+    @property
+    def flush_lag(self) -> float:
+        """Seconds the oldest unsaved change has been waiting"""
+        if self.dirty_since is None:
+            return 0.0
+        return time.monotonic() - self.dirty_since
+
+MEMBERS = MemberRegistry()
+# Only the shared registry is flushed on shutdown, other instances flush themselves
+STORES.append(MEMBERS)
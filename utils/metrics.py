@@ -0,0 +1,403 @@
+"""
+Metrics for the Telegram Bot
+Counters, gauges and histograms rendered in the Prometheus text format
+"""
+
+import bisect
+import contextvars
+import logging
+import math
+import os
+import re
+import time
+from telegram.request import HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from fast dict lookups up to slow Bot API calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_value(value) -> str:
+    """Format a sample value the way Prometheus expects"""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def format_labels(names, values) -> str:
+    """Format a label set as {a="1",b="2"}"""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Metric:
+    """Base class for a metric family with optional labels"""
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            # Unlabelled metrics are always rendered, even before first use
+            self.labels()
+
+    def labels(self, *values):
+        """Get the child metric for a set of label values"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self):
+        """Yield (suffix, label names, label values, value) tuples"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(names, values)} {format_value(value)}")
+        return "\n".join(lines)
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class Counter(Metric):
+    """A value that only goes up"""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(f"{name}_total", documentation, labelnames)
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in self._children.items():
+            yield "", self.labelnames, values, child.value
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        """Compute the value when scraped instead of storing it"""
+        self.function = function
+
+    def get(self):
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception as e:
+                logger.warning(f"Gauge callback failed: {e}")
+                return math.nan
+        return self.value
+
+class Gauge(Metric):
+    """A value that can go up and down"""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+    def get(self):
+        return self.labels().get()
+
+    def samples(self):
+        for values, child in self._children.items():
+            yield "", self.labelnames, values, child.get()
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside the bucket"""
+        return bucket_quantile(q, self.bounds, self.counts)
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += count
+                yield "_bucket", names, values + (format_value(float(bound)),), cumulative
+            yield "_sum", self.labelnames, values, child.sum
+            yield "_count", self.labelnames, values, child.count
+
+def bucket_quantile(q, bounds, counts):
+    """
+    Estimate quantile q from non-cumulative bucket counts
+    Returns None when there are no observations
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count > 0:
+            lower = bounds[i - 1] if i > 0 else 0.0
+            if i >= len(bounds):
+                # Overflow bucket has no upper bound, report its lower edge
+                return lower
+            upper = bounds[i]
+            return lower + (upper - lower) * ((rank - cumulative) / count)
+        cumulative += count
+    return bounds[-1]
+
+class Registry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+REGISTRY = Registry()
+
+SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+def parse_prometheus(text: str) -> dict:
+    """
+    Parse the Prometheus text format into {sample name: [(labels, value)]}
+    Comments and malformed lines are skipped
+    """
+    samples = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = SAMPLE_PATTERN.match(line)
+        if not match:
+            continue
+        name, raw_labels, raw_value = match.groups()
+        labels = {}
+        for key, value in LABEL_PATTERN.findall(raw_labels or ""):
+            labels[key] = value.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+        try:
+            value = float(raw_value)
+        except ValueError:
+            continue
+        samples.setdefault(name, []).append((labels, value))
+    return samples
+
+def write_snapshot(path: str, registry: Registry = None):
+    """Atomically write the rendered metrics to a file for offline inspection"""
+    registry = registry or REGISTRY
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_duration_seconds", "Time spent handling a command or update", ("handler",))
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors", "Errors raised or logged while handling an update", ("handler",))
+API_LATENCY = REGISTRY.histogram(
+    "bot_api_request_duration_seconds", "Bot API call latency by method", ("method",),
+    buckets=DEFAULT_BUCKETS + (30.0, 60.0))
+API_ERRORS = REGISTRY.counter(
+    "bot_api_request_errors", "Bot API calls that failed before returning a response", ("method",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "bot_cache_requests", "Cache lookups by result", ("cache", "result"))
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "bot_cache_hit_ratio", "Fraction of cache lookups that were hits", ("cache",))
+UPDATE_QUEUE_DEPTH = REGISTRY.gauge(
+    "bot_update_queue_depth", "Updates fetched from Telegram and waiting to be processed")
+OUTBOUND_QUEUE_DEPTH = REGISTRY.gauge(
+    "bot_outbound_queue_depth", "Bot API calls sent and waiting for a response")
+PENDING_RESPONSES = REGISTRY.gauge(
+    "bot_pending_responses", "Messages waiting in a coalescing window to be sent")
+COALESCED_RESPONSES = REGISTRY.counter(
+    "bot_coalesced_responses", "Messages merged into another send instead of sent on their own")
+WORKER_QUEUE_DEPTH = REGISTRY.gauge(
+    "bot_worker_queue_depth", "Tasks submitted to the worker pool and not finished yet")
+WORKER_TASKS = REGISTRY.counter(
+    "bot_worker_tasks", "Worker pool tasks by result", ("task", "result"))
+WORKER_TASK_DURATION = REGISTRY.histogram(
+    "bot_worker_task_duration_seconds", "Worker pool task time including the wait for a worker", ("task",))
+LOOP_LAG = REGISTRY.histogram(
+    "bot_event_loop_lag_seconds", "Delay between when the lag probe was due and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_BLOCKS = REGISTRY.counter(
+    "bot_event_loop_blocks", "Times the event loop stalled longer than the block threshold")
+WATCHDOG_RESTARTS = REGISTRY.counter(
+    "bot_watchdog_restarts", "In-process Application restarts triggered by the stall watchdog", ("reason",))
+PROCESS_START_TIME = REGISTRY.gauge(
+    "bot_process_start_time_seconds", "Unix time the process started")
+PROCESS_START_TIME.set(time.time())
+SNAPSHOT_TIME = REGISTRY.gauge(
+    "bot_scrape_time_seconds", "Unix time these metrics were rendered")
+SNAPSHOT_TIME.set_function(time.time)
+API_PROBE_RTT = REGISTRY.gauge(
+    "bot_api_probe_rtt_seconds", "Round-trip time of the last getMe health probe")
+STORE_FLUSH_LAG = REGISTRY.gauge(
+    "bot_store_flush_lag_seconds", "Age of the oldest unsaved change across the JSON stores")
+
+def merged_quantile(histogram, q):
+    """Estimate a quantile across every label set of a histogram"""
+    counts = [0] * (len(histogram.bounds) + 1)
+    for child in histogram._children.values():
+        for i, count in enumerate(child.counts):
+            counts[i] += count
+    return bucket_quantile(q, histogram.bounds, counts)
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup and keep the hit ratio gauge current"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+    ratio = CACHE_HIT_RATIO.labels(cache)
+    if ratio.function is None:
+        hits = CACHE_REQUESTS.labels(cache, "hit")
+        misses = CACHE_REQUESTS.labels(cache, "miss")
+        ratio.set_function(lambda: hits.value / ((hits.value + misses.value) or 1))
+
+# Name of the handler currently running, used to attribute logged errors
+current_handler = contextvars.ContextVar("current_handler", default=None)
+
+# Set once the running handler's error was counted, so a run that logs an
+# error and then raises is counted once
+error_counted = contextvars.ContextVar("error_counted", default=False)
+
+def count_handler_error():
+    """Count an error of the running handler, at most once per run"""
+    handler = current_handler.get()
+    if handler is None or error_counted.get():
+        return
+    error_counted.set(True)
+    HANDLER_ERRORS.labels(handler).inc()
+
+class ErrorCountingHandler(logging.Handler):
+    """
+    Logging handler that counts ERROR records per bot handler
+    Command handlers catch their own exceptions and log them, so counting
+    log records sees errors that never propagate to the decorator
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, record):
+        count_handler_error()
+
+_error_counter = ErrorCountingHandler()
+
+def install_error_counter():
+    """Attach the error counter to the root logger once"""
+    root = logging.getLogger()
+    if _error_counter not in root.handlers:
+        root.addHandler(_error_counter)
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPX request backend that records latency and errors per Bot API method"""
+
+    # Monotonic time of the last successful call per API method, shared by all instances
+    last_success = {}
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        # getUpdates is a long poll, it is not waiting in the outbound queue
+        outbound = api_method != "getUpdates"
+        if outbound:
+            OUTBOUND_QUEUE_DEPTH.inc()
+
+        start = time.perf_counter()
+        try:
+            result = await super().do_request(url, method, *args, **kwargs)
+            InstrumentedRequest.last_success[api_method] = time.monotonic()
+            return result
+        except Exception:
+            API_ERRORS.labels(api_method).inc()
+            raise
+        finally:
+            API_LATENCY.labels(api_method).observe(time.perf_counter() - start)
+            if outbound:
+                OUTBOUND_QUEUE_DEPTH.dec()
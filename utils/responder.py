@@ -0,0 +1,128 @@
+"""
+Response composition for the Telegram Bot
+Coalesces bursts of messages to the same chat into one send, and runs
+independent Bot API calls concurrently
+"""
+
+import asyncio
+import logging
+from telegram.constants import MessageLimit
+from config import COALESCE_WINDOW, MAX_CONCURRENT_SENDS
+from utils.metrics import PENDING_RESPONSES, COALESCED_RESPONSES
+
+logger = logging.getLogger(__name__)
+
+def join_paragraphs(items: list) -> str:
+    """Default rendering of a batch, one paragraph per message"""
+    return "\n\n".join(items)
+
+def split_text(text: str, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list:
+    """Split text into messages Telegram accepts, preferring paragraph boundaries"""
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:limit])
+            paragraph = paragraph[limit:]
+        if current and len(current) + 2 + len(paragraph) > limit:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+class Batch:
+    """Items posted to one chat under one key while its window is open"""
+
+    def __init__(self, bot, chat_id, render, parse_mode):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.render = render
+        self.parse_mode = parse_mode
+        self.items = []
+        self.done = asyncio.get_running_loop().create_future()
+        self.timer = None
+
+class Responder:
+    """
+    Sends posted messages after a short window, merging everything posted to
+    the same chat and key meanwhile, so a join raid becomes one welcome
+    post() never waits for the send, handlers return straight away
+    """
+
+    def __init__(self, window: float = COALESCE_WINDOW):
+        self.window = window
+        self._batches = {}
+        self._flushes = set()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(batch.items) for batch in self._batches.values())
+
+    def post(self, bot, chat_id, item, key: str = "text", render=join_paragraphs, parse_mode=None) -> asyncio.Future:
+        """
+        Queue an item for the chat, returns a future of the sent messages
+        render turns the batch's items into the message text when the window closes
+        """
+        batch = self._batches.get((chat_id, key))
+        if batch is None:
+            batch = Batch(bot, chat_id, render, parse_mode)
+            batch.timer = asyncio.get_running_loop().call_later(self.window, self._schedule_flush, chat_id, key)
+            self._batches[(chat_id, key)] = batch
+        else:
+            COALESCED_RESPONSES.inc()
+        batch.items.append(item)
+        PENDING_RESPONSES.inc()
+        return batch.done
+
+    def _schedule_flush(self, chat_id, key: str):
+        # Keep a reference until the send finishes, the loop only holds weak ones
+        task = asyncio.ensure_future(self.flush(chat_id, key))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self, chat_id, key: str = "text") -> list:
+        """Send one batch now, returns the messages sent"""
+        batch = self._batches.pop((chat_id, key), None)
+        if batch is None:
+            return []
+        batch.timer.cancel()
+        PENDING_RESPONSES.dec(len(batch.items))
+
+        sent = []
+        try:
+            for chunk in split_text(batch.render(batch.items)):
+                sent.append(await batch.bot.send_message(batch.chat_id, chunk, parse_mode=batch.parse_mode))
+            if len(batch.items) > 1:
+                logger.info(f"📦 Sent {len(batch.items)} {key} message(s) to chat {chat_id} as {len(sent)}")
+        except Exception as e:
+            logger.error(f"Error sending {key} batch to chat {chat_id}: {e}")
+        if not batch.done.done():
+            batch.done.set_result(sent)
+        return sent
+
+    async def flush_all(self) -> int:
+        """Send every open batch, used on shutdown, returns how many were sent"""
+        batches = list(self._batches)
+        await gather_sends(self.flush(chat_id, key) for chat_id, key in batches)
+        return len(batches)
+
+async def gather_sends(calls, limit: int = MAX_CONCURRENT_SENDS) -> list:
+    """
+    Await independent Bot API calls concurrently, at most limit at a time
+    Returns each call's result, or the exception it raised
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(call):
+        async with semaphore:
+            return await call
+
+    return await asyncio.gather(*(bounded(call) for call in calls), return_exceptions=True)
+
+RESPONDER = Responder()
@@ -0,0 +1,216 @@
+"""
+Per-chat content rotation for the Telegram Bot
+Walks a lazily computed pseudo-random permutation so a chat sees every entry once
+before any repeats, keeping only (seed, position) per chat in a fixed-width journal
+"""
+
+import asyncio
+import logging
+import os
+import random
+import struct
+import time
+from typing import Optional
+from utils.storage import STORES
+
+logger = logging.getLogger(__name__)
+
+ROTATION_FILE = "data/rotation.journal"
+MASK64 = (1 << 64) - 1
+
+# kind, chat id, seed, position, size, last index (-1 for none)
+KIND_SIZE = 8
+RECORD = struct.Struct(f"={KIND_SIZE}sqIIIi")
+
+# Rewrite the journal once it holds this many records per chat state
+COMPACT_RATIO = 4
+
+def splitmix64(value: int) -> int:
+    """Well-mixed 64-bit hash of an integer"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+class FeistelPermutation:
+    """
+    A bijection on range(n) computed one element at a time
+    A balanced Feistel network permutes the smallest even-bit power of two >= n,
+    and cycle-walking re-encrypts values that land outside range(n)
+    """
+
+    def __init__(self, n: int, seed: int, rounds: int = 4):
+        self.n = n
+        bits = max(2, (n - 1).bit_length())
+        bits += bits & 1
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = [splitmix64(seed * rounds + i) for i in range(rounds)]
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ (splitmix64(right ^ key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        # The domain is at most 4n, so this loops fewer than 4 times on average
+        value = self._encrypt(i)
+        while value >= self.n:
+            value = self._encrypt(value)
+        return value
+
+class RotationJournal:
+    """
+    Rotation state of every chat, one fixed-width record per (kind, chat)
+    Changed states are appended write-behind, like the member registry, and
+    the journal is rewritten from the live states once it grows too long
+    """
+
+    def __init__(self, path: str = ROTATION_FILE, flush_delay: float = 2.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.dirty_since = None
+        self.records_on_disk = 0
+        self._states = None
+        self._dirty = set()
+        self._flush_handle = None
+
+    @property
+    def states(self) -> dict:
+        """(kind, chat id) -> [seed, position, size, last index], replayed the first time"""
+        if self._states is None:
+            self._states = {}
+            self._replay()
+        return self._states
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Error loading {self.path}: {e}")
+            return
+        # A torn last record from a crash mid-write is cut off, so appends stay aligned
+        usable = len(data) - len(data) % RECORD.size
+        if usable < len(data):
+            try:
+                os.truncate(self.path, usable)
+                logger.warning(f"Dropped a torn record of {len(data) - usable} bytes from {self.path}")
+            except OSError as e:
+                logger.error(f"Error truncating {self.path}: {e}")
+        for kind, chat_id, seed, position, size, last in RECORD.iter_unpack(memoryview(data)[:usable]):
+            key = (kind.rstrip(b"\0").decode(), chat_id)
+            self._states[key] = [seed, position, size, None if last < 0 else last]
+        self.records_on_disk = usable // RECORD.size
+        logger.info(f"🔀 Loaded rotation state for {len(self._states)} chat(s)")
+
+    def get(self, kind: str, chat_id: int) -> Optional[list]:
+        return self.states.get((kind, chat_id))
+
+    def put(self, kind: str, chat_id: int, state: list):
+        """Store a chat's state and schedule a journal write"""
+        key = (kind, chat_id)
+        self.states[key] = state
+        self._dirty.add(key)
+        if self.dirty_since is None:
+            self.dirty_since = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts and tests), write straight away
+            self.flush()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def _record(self, key) -> bytes:
+        seed, position, size, last = self._states[key]
+        return RECORD.pack(key[0].encode(), key[1], seed, position, size, -1 if last is None else last)
+
+    def flush(self) -> bool:
+        """Append changed states to the journal, or rewrite it when it has grown too long"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return False
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if self.records_on_disk + len(self._dirty) > COMPACT_RATIO * len(self._states) + 1000:
+                self._compact()
+            else:
+                with open(self.path, 'ab') as f:
+                    f.write(b"".join(self._record(key) for key in self._dirty))
+                self.records_on_disk += len(self._dirty)
+            self._dirty.clear()
+            self.dirty_since = None
+            return True
+        except Exception as e:
+            logger.error(f"Error saving {self.path}: {e}")
+            return False
+
+    def _compact(self):
+        """Replace the journal with one record per chat state"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b"".join(self._record(key) for key in self._states))
+        os.replace(tmp_path, self.path)
+        logger.info(f"🗜️ Compacted {self.path} from {self.records_on_disk} to {len(self._states)} records")
+        self.records_on_disk = len(self._states)
+
+    @property
+    def flush_lag(self) -> float:
+        """Seconds the oldest unsaved change has been waiting"""
+        if self.dirty_since is None:
+            return 0.0
+        return time.monotonic() - self.dirty_since
+
+class Rotation:
+    """
+    Next-entry picker for one kind of content across all chats
+    State per chat is [seed, position, size, last index], kept in a RotationJournal
+    """
+
+    def __init__(self, kind: str, store: RotationJournal):
+        if len(kind.encode()) > KIND_SIZE:
+            raise ValueError(f"Rotation kind {kind!r} is too long for the journal")
+        self.kind = kind
+        self.store = store
+
+    def next_index(self, chat_id, size: int) -> int:
+        """Index of the next entry this chat has not seen in the current cycle"""
+        if size <= 1:
+            return 0
+
+        state = self.store.get(self.kind, chat_id)
+        if state is None or state[2] != size or state[1] >= size:
+            # New chat, changed content, or the cycle is complete
+            last = state[3] if state is not None and state[2] == size else None
+            state = [self._new_seed(size, last), 0, size, None]
+
+        index = FeistelPermutation(size, state[0])[state[1]]
+        self.store.put(self.kind, chat_id, [state[0], state[1] + 1, size, index])
+        return index
+
+    @staticmethod
+    def _new_seed(size: int, last) -> int:
+        """Seed for a new cycle, avoiding a repeat across the cycle boundary"""
+        seed = random.getrandbits(32)
+        for _ in range(8):
+            if last is None or FeistelPermutation(size, seed)[0] != last:
+                break
+            seed = random.getrandbits(32)
+        return seed
+
+# One journal for every kind of content, appended at most every 30 seconds
+ROTATION_STORE = RotationJournal(flush_delay=30)
+# Only the shared journal is flushed on shutdown, other instances flush themselves
+STORES.append(ROTATION_STORE)
@@ -0,0 +1,191 @@
+"""
+Command router for the Telegram Bot
+Parses the command token once and dispatches through a single dict lookup
+"""
+
+import logging
+from telegram import Update
+from telegram.ext import BaseHandler
+from utils.storage import JsonStore
+
+logger = logging.getLogger(__name__)
+
+# Simple file-based storage for per-chat disabled commands
+DISABLED_COMMANDS_FILE = "data/disabled_commands.json"
+
+def parse_command(text: str, prefixes=("/",)):
+    """
+    Split a message text into (command, target, args)
+    Returns None if the text is not a command
+    """
+    if not text or text[0] not in prefixes:
+        return None
+
+    parts = text.split()
+    token = parts[0][1:]
+    if not token:
+        return None
+
+    command, _, target = token.partition('@')
+    if not command:
+        return None
+
+    return command.lower(), target, parts[1:]
+
+class CommandEntry:
+    """A registered command with its callback and bit position"""
+    __slots__ = ("name", "callback", "bit")
+
+    def __init__(self, name, callback, bit):
+        self.name = name
+        self.callback = callback
+        self.bit = bit
+
+class CommandRouter(BaseHandler):
+    """
+    Single handler for every command
+    Replaces one CommandHandler per command, so dispatch cost does not grow
+    with the size of the command set
+    """
+
+    def __init__(self, prefixes=("/",), aliases=None, protected=()):
+        super().__init__(self._unrouted)
+        self.prefixes = tuple(prefixes)
+        self.protected = set(protected)
+        self._commands = {}
+        self._table = {}
+        self._chat_masks = {}
+        self._pending_aliases = dict(aliases or {})
+        self._store = JsonStore(DISABLED_COMMANDS_FILE)
+        self._disabled = self._store.load()
+
+    async def _unrouted(self, update: Update, context):
+        """Placeholder callback, real callbacks are resolved per update"""
+        return None
+
+    def add_command(self, name: str, callback):
+        """Register a command callback"""
+        name = name.lower()
+        entry = CommandEntry(name, callback, 1 << len(self._commands))
+        self._commands[name] = entry
+        self._table[name] = entry
+
+        # Aliases may be declared before their target is registered
+        for alias, target in list(self._pending_aliases.items()):
+            if target == name:
+                self.add_alias(alias, name)
+                del self._pending_aliases[alias]
+
+        self._rebuild_masks()
+
+    def add_alias(self, alias: str, name: str):
+        """Register an alternative name for an existing command"""
+        alias = alias.lower()
+        entry = self._commands.get(name.lower())
+        if entry is None:
+            self._pending_aliases[alias] = name.lower()
+            return
+        if alias in self._commands:
+            logger.warning(f"Alias '{alias}' shadows a command and was ignored")
+            return
+        self._table[alias] = entry
+
+    def resolve(self, name: str):
+        """Get the command entry for a command name or alias"""
+        return self._table.get(name.lower())
+
+    @property
+    def commands(self):
+        """Names of all registered commands"""
+        return list(self._commands)
+
+    def is_disabled(self, chat_id: int, name: str) -> bool:
+        """Check if a command is disabled in a chat"""
+        entry = self.resolve(name)
+        if entry is None:
+            return False
+        return bool(self._chat_masks.get(chat_id, 0) & entry.bit)
+
+    def disable(self, chat_id: int, name: str) -> bool:
+        """Disable a command in a chat, returns False for unknown or protected commands"""
+        entry = self.resolve(name)
+        if entry is None or entry.name in self.protected:
+            return False
+        names = self._disabled.setdefault(str(chat_id), [])
+        if entry.name not in names:
+            names.append(entry.name)
+            self._store.save(self._disabled)
+        self._chat_masks[chat_id] = self._chat_masks.get(chat_id, 0) | entry.bit
+        return True
+
+    def enable(self, chat_id: int, name: str) -> bool:
+        """Enable a previously disabled command in a chat"""
+        entry = self.resolve(name)
+        if entry is None:
+            return False
+        names = self._disabled.get(str(chat_id), [])
+        if entry.name in names:
+            names.remove(entry.name)
+            if not names:
+                del self._disabled[str(chat_id)]
+            self._store.save(self._disabled)
+        mask = self._chat_masks.get(chat_id, 0) & ~entry.bit
+        if mask:
+            self._chat_masks[chat_id] = mask
+        else:
+            self._chat_masks.pop(chat_id, None)
+        return True
+
+    def disabled_commands(self, chat_id: int) -> list:
+        """Names of the commands disabled in a chat"""
+        mask = self._chat_masks.get(chat_id, 0)
+        return [name for name, entry in self._commands.items() if mask & entry.bit]
+
+    def _rebuild_masks(self):
+        """Turn persisted command names into per-chat bitsets"""
+        masks = {}
+        for chat_id, names in self._disabled.items():
+            mask = 0
+            for name in names:
+                entry = self._commands.get(name)
+                if entry is not None:
+                    mask |= entry.bit
+            if mask:
+                masks[int(chat_id)] = mask
+        self._chat_masks = masks
+
+    def check_update(self, update: object):
+        """Parse the command token once and look it up"""
+        if not isinstance(update, Update) or not update.message:
+            return None
+
+        parsed = parse_command(update.message.text, self.prefixes)
+        if parsed is None:
+            return None
+
+        command, target, args = parsed
+        entry = self._table.get(command)
+        if entry is None:
+            return None
+
+        if target:
+            try:
+                username = update.message.get_bot().username
+            except RuntimeError:
+                username = None
+            if not username or target.lower() != username.lower():
+                return None
+
+        if update.message.chat and self._chat_masks.get(update.message.chat.id, 0) & entry.bit:
+            return None
+
+        return entry, args
+
+    def collect_additional_context(self, context, update, application, check_result):
+        """Provide the command arguments like CommandHandler does"""
+        context.args = check_result[1]
+
+    async def handle_update(self, update, application, check_result, context):
+        """Dispatch the update to the resolved command callback"""
+        self.collect_additional_context(context, update, application, check_result)
+        return await check_result[0].callback(update, context)
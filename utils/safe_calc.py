@@ -0,0 +1,154 @@
+"""
+Safe expression engine for the Telegram Bot
+Parses /calc input to an AST and evaluates only whitelisted numeric nodes,
+with bounded input size, result size and evaluation time
+"""
+
+import ast
+import math
+import operator
+import time
+from config import CALC_MAX_LENGTH, CALC_MAX_NODES, CALC_MAX_RESULT_BITS, CALC_TIME_BUDGET
+
+# Largest n for factorial(n), 500! is about 3,800 bits
+MAX_FACTORIAL = 500
+
+class CalcError(ValueError):
+    """An expression that is not allowed or cannot be evaluated, the message is shown to the user"""
+
+def check_size(value):
+    """Reject integers beyond the result budget, they are what makes arithmetic slow"""
+    if isinstance(value, int) and value.bit_length() > CALC_MAX_RESULT_BITS:
+        raise CalcError(f"Result is too large (over {CALC_MAX_RESULT_BITS} bits)")
+    return value
+
+def safe_mul(a, b):
+    if isinstance(a, int) and isinstance(b, int) and a.bit_length() + b.bit_length() > CALC_MAX_RESULT_BITS + 1:
+        raise CalcError(f"Result is too large (over {CALC_MAX_RESULT_BITS} bits)")
+    return a * b
+
+def safe_pow(base, exponent):
+    """Power with the result size estimated before anything is computed"""
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log2(abs(base)) > CALC_MAX_RESULT_BITS:
+            raise CalcError(f"Result is too large (over {CALC_MAX_RESULT_BITS} bits)")
+        return base ** exponent
+    if base == 0 and exponent < 0:
+        raise ZeroDivisionError("0 cannot be raised to a negative power")
+    if base < 0 and not float(exponent).is_integer():
+        raise CalcError("Result is not a real number")
+    return math.pow(base, exponent) if isinstance(base, float) or isinstance(exponent, float) else base ** exponent
+
+def safe_factorial(n):
+    if not float(n).is_integer() or n < 0:
+        raise CalcError("factorial() needs a whole number of 0 or more")
+    if n > MAX_FACTORIAL:
+        raise CalcError(f"factorial() is limited to {MAX_FACTORIAL}")
+    return math.factorial(int(n))
+
+def safe_log(x, base=math.e):
+    return math.log(x, base)
+
+def safe_round(x, ndigits=None):
+    # round() builds 10 ** ndigits internally
+    if ndigits is not None and abs(ndigits) > 100:
+        raise CalcError("round() is limited to 100 digits")
+    return round(x, ndigits)
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: safe_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: safe_pow
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+FUNCTIONS = {
+    'abs': abs, 'round': safe_round, 'min': min, 'max': max, 'pow': safe_pow,
+    'sqrt': math.sqrt, 'cbrt': math.cbrt, 'exp': math.exp,
+    'log': safe_log, 'ln': math.log, 'log10': math.log10, 'log2': math.log2,
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan, 'atan2': math.atan2,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'degrees': math.degrees, 'radians': math.radians, 'hypot': math.hypot,
+    'floor': math.floor, 'ceil': math.ceil, 'factorial': safe_factorial, 'gcd': math.gcd
+}
+
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+class Evaluator:
+    """Walks a parsed expression, checking the time budget at every node"""
+
+    def __init__(self, time_budget: float):
+        self.deadline = time.perf_counter() + time_budget
+
+    def visit(self, node):
+        if time.perf_counter() > self.deadline:
+            raise CalcError("Calculation took too long")
+
+        if isinstance(node, ast.Expression):
+            return self.visit(node.body)
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise CalcError("Only numbers are allowed")
+            return check_size(node.value)
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            left, right = self.visit(node.left), self.visit(node.right)
+            return check_size(BINARY_OPERATORS[type(node.op)](left, right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            return UNARY_OPERATORS[type(node.op)](self.visit(node.operand))
+        if isinstance(node, ast.Name):
+            if node.id not in CONSTANTS:
+                raise CalcError(f"Unknown name '{node.id}'")
+            return CONSTANTS[node.id]
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise CalcError("Unknown function")
+            if node.keywords:
+                raise CalcError("Keyword arguments are not supported")
+            args = [self.visit(arg) for arg in node.args]
+            try:
+                return check_size(FUNCTIONS[node.func.id](*args))
+            except TypeError:
+                raise CalcError(f"Wrong number of arguments for {node.func.id}()")
+        raise CalcError(f"'{type(node).__name__}' is not allowed")
+
+def evaluate(expression: str, time_budget: float = CALC_TIME_BUDGET):
+    """
+    Evaluate a math expression, returns an int or a float
+    Raises CalcError for anything disallowed or too large, and ZeroDivisionError as usual
+    """
+    expression = expression.strip()
+    if not expression:
+        raise CalcError("Empty expression")
+    if len(expression) > CALC_MAX_LENGTH:
+        raise CalcError(f"Expression is too long (max {CALC_MAX_LENGTH} characters)")
+
+    try:
+        tree = ast.parse(expression.replace('^', '**'), mode='eval')
+    except (SyntaxError, ValueError):
+        raise CalcError("Could not parse the expression")
+    if sum(1 for _ in ast.walk(tree)) > CALC_MAX_NODES:
+        raise CalcError(f"Expression is too complex (max {CALC_MAX_NODES} parts)")
+
+    try:
+        result = Evaluator(time_budget).visit(tree)
+    except OverflowError:
+        raise CalcError("Result is too large")
+    except RecursionError:
+        raise CalcError("Expression is nested too deeply")
+    except ValueError as e:
+        if isinstance(e, CalcError):
+            raise
+        raise CalcError(f"Math error: {e}")
+
+    if isinstance(result, float) and not math.isfinite(result):
+        raise CalcError("Result is not a finite number")
+    return result
@@ -0,0 +1,142 @@
+"""
+Weighted and tagged sampling for the Telegram Bot
+Walker/Vose alias tables per tag, so weighted picks are O(1) and per-chat
+tag filters never rescan the content
+"""
+
+import random
+from array import array
+from typing import NamedTuple
+
+# Distinct filter combinations kept with their alias tables
+FILTER_CACHE_SIZE = 256
+
+class AliasTable:
+    """
+    Vose's alias method over a list of weights
+    One uniform column and one biased coin per draw, whatever the number of weights
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        self.n = n
+        self.probability = array('d', [1.0]) * n
+        self.alias = array('I', range(n))
+        if not n or total <= 0:
+            # Nothing to prefer, every column stays a certain pick of itself
+            return
+
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1 up to rounding error
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def __len__(self):
+        return self.n
+
+    def sample(self, rng=random) -> int:
+        """A position drawn with probability proportional to its weight"""
+        column = rng.randrange(self.n)
+        return column if rng.random() < self.probability[column] else self.alias[column]
+
+class ContentFilter(NamedTuple):
+    """Tags an entry must all have, and tags it must not have"""
+    require: tuple = ()
+    exclude: tuple = ()
+
+    def allows(self, entry) -> bool:
+        return (all(tag in entry.tags for tag in self.require)
+                and not any(tag in entry.tags for tag in self.exclude))
+
+NO_FILTER = ContentFilter()
+
+class Sampler:
+    """Entry ids allowed by one filter, with an alias table when their weights differ"""
+
+    def __init__(self, ids, weights=None):
+        self.ids = ids
+        self.table = None
+        if weights is not None:
+            picked = [weights[entry_id] for entry_id in ids]
+            if len(set(picked)) > 1:
+                self.table = AliasTable(picked)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def weighted(self) -> bool:
+        return self.table is not None
+
+    def pick(self, rng=random):
+        """A random allowed id, weighted when the weights differ, or None"""
+        if not self.ids:
+            return None
+        position = self.table.sample(rng) if self.table else rng.randrange(len(self.ids))
+        return self.ids[position]
+
+class TagIndex:
+    """
+    Entry ids per tag and the weight of every entry
+    Samplers for all entries and for each single tag are built up front,
+    other filters are combined from the tag lists on first use and cached
+    """
+
+    def __init__(self, entries=()):
+        tags = {}
+        weights = array('d')
+        for entry_id, entry in enumerate(entries):
+            weights.append(entry.weight)
+            for tag in entry.tags:
+                tags.setdefault(tag, array('I')).append(entry_id)
+
+        self.size = len(weights)
+        self.tags = tags
+        # Without any custom weight there is nothing to build alias tables from
+        self.weights = weights if any(weight != 1.0 for weight in weights) else None
+        self.samplers = {NO_FILTER: Sampler(range(self.size), self.weights)}
+        for tag, ids in tags.items():
+            self.samplers[ContentFilter((tag,))] = Sampler(ids, self.weights)
+        self._combined = {}
+
+    def _ids(self, content_filter: ContentFilter):
+        if content_filter.require:
+            postings = sorted((self.tags.get(tag, ()) for tag in content_filter.require), key=len)
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                ids.intersection_update(posting)
+        else:
+            ids = None
+
+        excluded = set()
+        for tag in content_filter.exclude:
+            excluded.update(self.tags.get(tag, ()))
+        if ids is None:
+            return array('I', (entry_id for entry_id in range(self.size) if entry_id not in excluded))
+        return array('I', sorted(ids - excluded))
+
+    def sampler(self, content_filter: ContentFilter = NO_FILTER) -> Sampler:
+        """The sampler for a filter, combining the tag lists only the first time"""
+        content_filter = ContentFilter(tuple(sorted(set(content_filter.require))),
+                                       tuple(sorted(set(content_filter.exclude))))
+        sampler = self.samplers.get(content_filter)
+        if sampler is not None:
+            return sampler
+
+        sampler = self._combined.pop(content_filter, None)
+        if sampler is None:
+            sampler = Sampler(self._ids(content_filter), self.weights)
+            if len(self._combined) >= FILTER_CACHE_SIZE:
+                del self._combined[next(iter(self._combined))]
+        # Re-inserted so the least recently used filter is evicted first
+        self._combined[content_filter] = sampler
+        return sampler
@@ -0,0 +1,241 @@
+"""
+Keyword search for the Telegram Bot
+An inverted index with prefix matching over quotes, jokes and facts
+"""
+
+import bisect
+import logging
+import os
+import random
+import re
+from array import array
+from typing import Optional
+from utils.corpus import INDEX_HEADER, index_is_current, map_file
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# Words too common to narrow a search down
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "to", "was", "with"
+})
+
+# Check candidates against the entries themselves once their posting lists are this much larger
+VERIFY_RATIO = 8
+
+# Random draws tried before a multi-word sample falls back to a full search
+SAMPLE_ATTEMPTS = 64
+
+# Saved indexes: header as in utils.corpus, then term offsets and cumulative
+# posting sizes as uint64, the posting lists as uint32 and the UTF-8 terms
+TERMS_MAGIC = b"BOTTRM1\0"
+
+def terms_path_for(path: str) -> str:
+    return f"{path}.terms"
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens, apostrophes inside words are kept"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+def entry_text(entry) -> str:
+    """The searchable text of an entry, its author included"""
+    return entry.text if entry.author is None else f"{entry.text} {entry.author}"
+
+class InvertedIndex:
+    """
+    Sorted vocabulary with a posting list of entry ids per token
+    A prefix maps to a contiguous vocabulary range, and cumulative posting
+    sizes give the size of that range in O(log n), so queries start from
+    their most selective word and never scan the corpus
+    """
+
+    def __init__(self, entries=()):
+        postings = {}
+        for entry_id, entry in enumerate(entries):
+            for token in set(tokenize(entry_text(entry))):
+                postings.setdefault(token, array('I')).append(entry_id)
+
+        self.entries = entries
+        self.vocabulary = sorted(postings)
+        # ids were appended in order, so every posting list is already sorted
+        self.postings = [postings[token] for token in self.vocabulary]
+        self.cumulative = array('Q', [0])
+        for posting in self.postings:
+            self.cumulative.append(self.cumulative[-1] + len(posting))
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def save(self, path: str, source: str):
+        """Write the index for mapping with MappedIndex, tagged with the size and mtime of source"""
+        stat = os.stat(source)
+        blob = bytearray()
+        term_offsets = array('Q', [0])
+        for token in self.vocabulary:
+            blob += token.encode('utf-8')
+            term_offsets.append(len(blob))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(TERMS_MAGIC, len(self.vocabulary), stat.st_size, stat.st_mtime_ns))
+            term_offsets.tofile(f)
+            array('Q', self.cumulative).tofile(f)
+            for posting in self.postings:
+                posting.tofile(f)
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def _range(self, prefix: str):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        return start, end
+
+    def _ids(self, start: int, end: int) -> set:
+        ids = set()
+        for posting in self.postings[start:end]:
+            ids.update(posting)
+        return ids
+
+    def _has_prefix(self, entry_id: int, prefix: str) -> bool:
+        return any(token.startswith(prefix) for token in tokenize(entry_text(self.entries[entry_id])))
+
+    def _terms(self, query: str) -> list:
+        """Query words with their vocabulary range and posting count, most selective first"""
+        words = [word for word in tokenize(query) if word not in STOP_WORDS] or tokenize(query)
+        terms = []
+        for word in dict.fromkeys(words):
+            start, end = self._range(word)
+            terms.append((self.cumulative[end] - self.cumulative[start], word, start, end))
+        terms.sort()
+        return terms
+
+    def search(self, query: str) -> list:
+        """Ids of entries matching every query word, each as a prefix"""
+        terms = self._terms(query)
+        if not terms or terms[0][0] == 0:
+            return []
+
+        _, _, start, end = terms[0]
+        matches = self._ids(start, end)
+        for size, word, start, end in terms[1:]:
+            if len(matches) * VERIFY_RATIO < size:
+                matches = {entry_id for entry_id in matches if self._has_prefix(entry_id, word)}
+            else:
+                matches &= self._ids(start, end)
+            if not matches:
+                return []
+        return sorted(matches)
+
+    def _draw(self, size: int, word: str, start: int, end: int, rng) -> int:
+        """A uniformly random id among the entries with a token starting with word"""
+        if end - start == 1:
+            return rng.choice(self.postings[start])
+
+        base = self.cumulative[start]
+        for _ in range(32):
+            position = base + rng.randrange(size)
+            token = bisect.bisect_right(self.cumulative, position, start, end + 1) - 1
+            entry_id = self.postings[token][position - self.cumulative[token]]
+            # An entry with several tokens under this prefix appears in several
+            # posting lists, accept it with 1/count to keep the pick uniform
+            count = sum(1 for t in set(tokenize(entry_text(self.entries[entry_id]))) if t.startswith(word))
+            if count <= 1 or rng.random() < 1 / count:
+                return entry_id
+        return entry_id
+
+    def sample(self, query: str, rng=random):
+        """
+        A uniformly random matching id, or None
+        Draws from the most selective word and checks the others, so broad
+        queries never collect every match
+        """
+        terms = self._terms(query)
+        if not terms or terms[0][0] == 0:
+            return None
+
+        size, word, start, end = terms[0]
+        others = [other for _, other, _, _ in terms[1:]]
+
+        # Chance that a draw matches the other words, assuming they occur independently
+        hit_rate = 1.0
+        for other_size, _, _, _ in terms[1:]:
+            hit_rate *= min(1.0, other_size / max(len(self.entries), 1))
+
+        if hit_rate * SAMPLE_ATTEMPTS >= 4:
+            for _ in range(SAMPLE_ATTEMPTS):
+                entry_id = self._draw(size, word, start, end, rng)
+                if all(self._has_prefix(entry_id, other) for other in others):
+                    return entry_id
+
+        # Rare combinations, collect the matches instead
+        matches = self.search(query)
+        return rng.choice(matches) if matches else None
+
+class MappedTerms:
+    """The sorted vocabulary of a saved index, decoded one term at a time for bisect"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+class MappedPostings:
+    """Posting lists of a saved index as views into one mapped uint32 array"""
+
+    def __init__(self, ids, cumulative):
+        self.ids = ids
+        self.cumulative = cumulative
+
+    def __len__(self):
+        return len(self.cumulative) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.ids[self.cumulative[i]:self.cumulative[i + 1]]
+
+class MappedIndex(InvertedIndex):
+    """
+    An index saved next to a content pack, opened through mmap
+    Queries run unchanged on views into the file, so memory stays flat
+    however large the pack is
+    """
+
+    def __init__(self, path: str, entries):
+        self.entries = entries
+        self._data = map_file(path)
+        _, count, _, _ = INDEX_HEADER.unpack_from(self._data, 0)
+        view = memoryview(self._data)
+        position = INDEX_HEADER.size
+        term_offsets = view[position:position + 8 * (count + 1)].cast('Q')
+        position += 8 * (count + 1)
+        self.cumulative = view[position:position + 8 * (count + 1)].cast('Q')
+        position += 8 * (count + 1)
+        ids = view[position:position + 4 * self.cumulative[count]].cast('I')
+        position += 4 * self.cumulative[count]
+        self.vocabulary = MappedTerms(view[position:], term_offsets)
+        self.postings = MappedPostings(ids, self.cumulative)
+
+def build_index(source: str, entries) -> MappedIndex:
+    """
+    Save the index of a content pack next to it and open it
+    Decodes and tokenizes the whole pack, so it belongs in a thread or offline
+    """
+    path = terms_path_for(source)
+    InvertedIndex(entries).save(path, source)
+    logger.info(f"🗂️ Built search index {path}")
+    return MappedIndex(path, entries)
+
+def open_index(source: str, entries) -> Optional[MappedIndex]:
+    """The saved index of a content pack, or None while it is missing or older than the pack"""
+    path = terms_path_for(source)
+    if not index_is_current(source, path, TERMS_MAGIC):
+        return None
+    return MappedIndex(path, entries)
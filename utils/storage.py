@@ -0,0 +1,101 @@
+"""
+File-backed JSON stores for the Telegram Bot
+Keeps data in memory and writes changes behind, so handlers never block on disk
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Every store created, so shutdown can flush them all
+STORES = []
+
+class JsonStore:
+    """
+    A JSON document cached in memory
+    save() marks the document dirty and schedules a write after flush_delay
+    seconds, coalescing bursts of changes into a single atomic file write
+    """
+
+    def __init__(self, path: str, flush_delay: float = 2.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.dirty_since = None
+        self._data = None
+        self._flush_handle = None
+        STORES.append(self)
+
+    def load(self) -> dict:
+        """Get the document, reading the file only the first time"""
+        record_cache("json_store", self._data is not None)
+        if self._data is None:
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, 'r') as f:
+                        self._data = json.load(f)
+                else:
+                    self._data = {}
+            except Exception as e:
+                logger.error(f"Error loading {self.path}: {e}")
+                self._data = {}
+        return self._data
+
+    def save(self, data: dict = None):
+        """Replace the document and schedule a write"""
+        if data is not None:
+            self._data = data
+        if self.dirty_since is None:
+            self.dirty_since = time.monotonic()
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts and tests), write straight away
+            self.flush()
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self) -> bool:
+        """Write the document if it has unsaved changes"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self.dirty_since is None:
+            return False
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data if self._data is not None else {}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty_since = None
+            return True
+        except Exception as e:
+            logger.error(f"Error saving {self.path}: {e}")
+            return False
+
+    @property
+    def flush_lag(self) -> float:
+        """Seconds the oldest unsaved change has been waiting"""
+        if self.dirty_since is None:
+            return 0.0
+        return time.monotonic() - self.dirty_since
+
+def flush_all() -> int:
+    """Flush every store, returns how many were written"""
+    written = 0
+    for store in STORES:
+        if store.flush():
+            written += 1
+    return written
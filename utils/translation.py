@@ -0,0 +1,246 @@
+"""
+Translation for the Telegram Bot
+A pluggable backend interface with an offline phrase table, an LRU cache of
+results and batching of concurrent requests into one backend call
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import unicodedata
+from collections import Counter
+from typing import NamedTuple, Optional
+from config import (TRANSLATION_BACKEND, TRANSLATION_BATCH_WINDOW, TRANSLATION_CACHE_SIZE,
+                    TRANSLATION_CACHE_TTL)
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PHRASES_FILE = "data/phrases.json"
+
+# Punctuation trimmed from both ends of a phrase before it is looked up
+EDGE_PUNCTUATION = " \t\n.,!?¿¡;:\"'“”«»()…。、！？，"
+
+class Translation(NamedTuple):
+    """A translated text, the language it was read as and how much of it was understood"""
+    text: str
+    source: Optional[str]
+    coverage: float
+    backend: str
+
+def fold(text: str) -> str:
+    """Lowercase without changing the length, so positions map back to the original"""
+    return ''.join(lower if len(lower := char.lower()) == 1 else char for char in text)
+
+def is_unspaced(char: str) -> bool:
+    """Han and kana are written without spaces, every character is a word boundary"""
+    code = ord(char)
+    return 0x3040 <= code <= 0x30FF or 0x3400 <= code <= 0x4DBF or 0x4E00 <= code <= 0x9FFF
+
+def is_word_char(char: str) -> bool:
+    # Combining marks such as Devanagari vowel signs are part of the word
+    return char.isalnum() or unicodedata.category(char).startswith('M')
+
+def is_boundary(text: str, i: int) -> bool:
+    if i <= 0 or i >= len(text):
+        return True
+    before, after = text[i - 1], text[i]
+    return not is_word_char(before) or not is_word_char(after) or is_unspaced(before) or is_unspaced(after)
+
+class TranslationBackend:
+    """
+    Interface every translation engine implements
+    translate_batch gets many texts for one target language in a single call,
+    so engines behind a network API can send them in one request
+    """
+
+    name = "base"
+    languages = ()
+
+    async def translate_batch(self, texts: list, target: str, source: str = None) -> list:
+        """One Translation per text, in order"""
+        raise NotImplementedError
+
+class PhraseTableBackend(TranslationBackend):
+    """
+    Offline translation from a table of common phrases in every language
+    Known phrases are replaced by the longest match, other words are kept as they are
+    """
+
+    name = "phrasebook"
+
+    def __init__(self, path: str = PHRASES_FILE):
+        self.path = path
+        self.rows = []
+        self.index = {}
+        self.lengths = ()
+        self.languages = ()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading {self.path}: {e}")
+            return
+
+        self.languages = tuple(data.get('languages', ()))
+        for row in data.get('phrases', []):
+            # A language may list alternatives, the first one is used in translations
+            row = {lang: value if isinstance(value, list) else [value] for lang, value in row.items()}
+            row_id = len(self.rows)
+            self.rows.append({lang: values[0] for lang, values in row.items()})
+            for lang, values in row.items():
+                for value in values:
+                    key = fold(value).strip(EDGE_PUNCTUATION)
+                    if key:
+                        self.index.setdefault(key, []).append((row_id, lang))
+        self.lengths = tuple(sorted({len(key) for key in self.index}, reverse=True))
+        logger.info(f"📖 Loaded {len(self.rows)} phrases in {len(self.languages)} languages from {self.path}")
+
+    def _match(self, folded: str, i: int, source: str):
+        """Longest known phrase starting at i, as (length, [(row, language)])"""
+        for length in self.lengths:
+            end = i + length
+            if end > len(folded) or not is_boundary(folded, end):
+                continue
+            matches = self.index.get(folded[i:end])
+            if matches and source is not None:
+                matches = [match for match in matches if match[1] == source]
+            if matches:
+                return length, matches
+        return 0, None
+
+    def translate(self, text: str, target: str, source: str = None) -> Translation:
+        folded = fold(text)
+        spans = []
+        votes = Counter()
+        i = 0
+        while i < len(text):
+            if is_word_char(folded[i]) and is_boundary(folded, i):
+                length, matches = self._match(folded, i, source)
+                if matches:
+                    spans.append((i, i + length, matches))
+                    votes.update({lang for _, lang in matches})
+                    i += length
+                    continue
+            i += 1
+
+        detected = source or (votes.most_common(1)[0][0] if votes else None)
+        pieces = []
+        position = 0
+        covered = 0
+        for start, end, matches in spans:
+            # Prefer the reading in the language most of the text was in
+            row_id = next((row for row, lang in matches if lang == detected), matches[0][0])
+            translated = self.rows[row_id].get(target)
+            if translated is None:
+                continue
+            original = text[start:end]
+            if original[0].isupper() and translated[0].islower():
+                translated = translated[0].upper() + translated[1:]
+            pieces.append(text[position:start])
+            pieces.append(translated)
+            position = end
+            covered += sum(1 for char in original if is_word_char(char))
+        pieces.append(text[position:])
+
+        letters = sum(1 for char in text if is_word_char(char))
+        return Translation(''.join(pieces), detected, covered / letters if letters else 0.0, self.name)
+
+    async def translate_batch(self, texts: list, target: str, source: str = None) -> list:
+        return [self.translate(text, target, source) for text in texts]
+
+# Engine name -> factory, external engines register themselves here
+BACKENDS = {PhraseTableBackend.name: PhraseTableBackend}
+
+def register_backend(name: str, factory):
+    """Make a translation engine selectable through TRANSLATION_BACKEND"""
+    BACKENDS[name] = factory
+
+def text_key(text: str, target: str, source: str = None) -> tuple:
+    """Cache key, the text is hashed so long messages don't sit in memory twice"""
+    return (hashlib.blake2b(text.encode(), digest_size=16).hexdigest(), target, source)
+
+class Translator:
+    """
+    Front end handlers call
+    Cached results are returned at once, identical requests in flight share one
+    result, and everything requested within the batch window for the same
+    language pair goes to the backend in one call
+    """
+
+    def __init__(self, backend: TranslationBackend = None, cache: TTLCache = None,
+                 window: float = TRANSLATION_BATCH_WINDOW):
+        self._backend = backend
+        self.cache = cache if cache is not None else TTLCache("translations", TRANSLATION_CACHE_TTL, maxsize=TRANSLATION_CACHE_SIZE)
+        self.window = window
+        self._batches = {}
+        self._in_flight = {}
+        self._flushes = set()
+
+    @property
+    def backend(self) -> TranslationBackend:
+        # Loaded on first use, so importing handlers doesn't read the phrase table
+        if self._backend is None:
+            factory = BACKENDS.get(TRANSLATION_BACKEND)
+            if factory is None:
+                logger.error(f"Unknown translation backend {TRANSLATION_BACKEND}, using the phrasebook")
+                factory = PhraseTableBackend
+            self._backend = factory()
+        return self._backend
+
+    async def translate(self, text: str, target: str, source: str = None) -> Translation:
+        key = text_key(text, target, source)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[key] = future
+            batch = self._batches.get((target, source))
+            if batch is None:
+                batch = self._batches[(target, source)] = []
+                loop.call_later(self.window, self._schedule_flush, target, source)
+            batch.append((key, text, future))
+        # Shielded so one caller giving up doesn't cancel the result for the others
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self, target: str, source: str):
+        task = asyncio.ensure_future(self._flush(target, source))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, target: str, source: str):
+        batch = self._batches.pop((target, source), [])
+        if not batch:
+            return
+        try:
+            results = await self.backend.translate_batch([text for _, text, _ in batch], target, source)
+        except Exception as e:
+            logger.error(f"Translation backend {self.backend.name} failed for {len(batch)} text(s): {e}")
+            results = [e] * len(batch)
+        else:
+            if len(results) != len(batch):
+                # A short or padded answer can't be matched to the texts reliably
+                error = RuntimeError(f"backend {self.backend.name} returned {len(results)} result(s) "
+                                     f"for {len(batch)} text(s)")
+                logger.error(f"Translation backend {self.backend.name} failed: {error}")
+                results = [error] * len(batch)
+
+        for (key, _, future), result in zip(batch, results):
+            self._in_flight.pop(key, None)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                self.cache.set(key, result)
+                future.set_result(result)
+
+TRANSLATOR = Translator()
@@ -0,0 +1,111 @@
+"""
+Stall watchdog for the Telegram Bot
+Notices when polling or update processing stops and asks the runtime to restart the Application
+"""
+
+import asyncio
+import logging
+import time
+from config import WATCHDOG_INTERVAL, POLL_STALL_TIMEOUT, UPDATE_STALL_TIMEOUT, LOOP_STALL_LAG
+from utils.lifecycle import TRACKER
+from utils.loopmon import LOOP_MONITOR
+from utils.metrics import InstrumentedRequest, WATCHDOG_RESTARTS
+
+logger = logging.getLogger(__name__)
+
+def age(timestamp):
+    """Seconds since a monotonic timestamp, None if it never happened"""
+    if timestamp is None:
+        return None
+    return time.monotonic() - timestamp
+
+class StallWatchdog:
+    """
+    Periodic in-memory checks of the signals that prove the bot is working
+    - last successful getUpdates, the long poll returns at least every few seconds
+    - last processed update, only a stall when updates are queued behind it
+    - event loop lag from the loop monitor, reported but not restarted on,
+      since a new Application runs on the same blocked loop
+    """
+
+    def __init__(self, interval: float = WATCHDOG_INTERVAL, poll_timeout: float = POLL_STALL_TIMEOUT,
+                 update_timeout: float = UPDATE_STALL_TIMEOUT, loop_lag_limit: float = LOOP_STALL_LAG):
+        self.interval = interval
+        self.poll_timeout = poll_timeout
+        self.update_timeout = update_timeout
+        self.loop_lag_limit = loop_lag_limit
+        self.application = None
+        self.armed_at = None
+        self.restarts = 0
+        self.last_reason = None
+        self.loop_responsive = True
+
+    def arm(self, application):
+        """Start watching a freshly started Application"""
+        self.application = application
+        self.armed_at = time.monotonic()
+
+    def last_poll_age(self):
+        """Seconds since getUpdates last succeeded, counting from arm() if it never has"""
+        last = InstrumentedRequest.last_success.get('getUpdates')
+        if last is None or (self.armed_at is not None and last < self.armed_at):
+            last = self.armed_at
+        return age(last)
+
+    def last_update_age(self):
+        """Seconds since the last update finished processing"""
+        return age(TRACKER.last_update_time)
+
+    def check(self):
+        """Return the reason the bot is stalled, or None if it is healthy"""
+        self.loop_responsive = LOOP_MONITOR.last_lag < self.loop_lag_limit
+        if not self.loop_responsive:
+            logger.warning(f"⚠️ Event loop lagging by {LOOP_MONITOR.last_lag:.1f}s")
+
+        if self.application is None:
+            return None
+
+        poll_age = self.last_poll_age()
+        if poll_age is not None and poll_age > self.poll_timeout:
+            return "polling"
+
+        queued = self.application.update_queue.qsize()
+        if queued:
+            # Measure from whichever is later, the last update or the restart
+            since = max(filter(None, (TRACKER.last_update_time, self.armed_at)), default=None)
+            waited = age(since)
+            if waited is not None and waited > self.update_timeout:
+                return "updates"
+
+        return None
+
+    async def run(self) -> str:
+        """Check periodically until a stall is found, then return its reason"""
+        while True:
+            await asyncio.sleep(self.interval)
+            reason = self.check()
+            if reason is not None:
+                self.restarts += 1
+                self.last_reason = reason
+                WATCHDOG_RESTARTS.labels(reason).inc()
+                logger.error(
+                    f"🚨 Bot stalled ({reason}): last getUpdates {self.last_poll_age():.0f}s ago, "
+                    f"{self.application.update_queue.qsize()} update(s) queued, restarting the application"
+                )
+                return reason
+
+    def snapshot(self) -> dict:
+        """Current watchdog view for the health server"""
+        poll_age = self.last_poll_age()
+        update_age = self.last_update_age()
+        return {
+            'last_getupdates_age': round(poll_age, 1) if poll_age is not None else None,
+            'last_update_age': round(update_age, 1) if update_age is not None else None,
+            'in_flight': TRACKER.in_flight,
+            'loop_responsive': self.loop_responsive,
+            'restarts': self.restarts,
+            'last_restart_reason': self.last_reason
+        }
+
+# Shared watchdog, armed by the runtime for every Application it starts
+WATCHDOG = StallWatchdog()
@@ -0,0 +1,126 @@
+"""
+Worker processes for the Telegram Bot
+A shared, bounded process pool for CPU-heavy command work, so it never runs
+on the event loop, with per-task timeouts and a busy signal when saturated
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import WORKER_PROCESSES, WORKER_QUEUE_LIMIT, WORKER_TASK_TIMEOUT
+from utils.metrics import WORKER_QUEUE_DEPTH, WORKER_TASKS, WORKER_TASK_DURATION
+
+logger = logging.getLogger(__name__)
+
+class WorkerError(Exception):
+    """Work could not be completed by the pool"""
+
+class WorkerBusy(WorkerError):
+    """Every worker is busy and the queue is full"""
+
+class WorkerTimeout(WorkerError):
+    """The task ran past its timeout and its worker was stopped"""
+
+def start_worker(pids):
+    """
+    Worker initializer, Ctrl+C and SIGTERM are handled by the bot process
+    The worker reports its pid, so the pool can kill it if a task gets stuck
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    pids.put(os.getpid())
+
+class WorkerPool:
+    """
+    Process pool shared by all handlers
+    At most processes tasks run and queue_limit more wait, further submissions
+    fail fast with WorkerBusy. Tasks wait for a free worker here, so the timeout
+    only counts their own run time. A task past its timeout cannot be
+    interrupted inside a worker, so the pool is torn down and restarted instead
+    """
+
+    def __init__(self, processes: int = WORKER_PROCESSES, queue_limit: int = WORKER_QUEUE_LIMIT):
+        self.processes = processes
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._slots = asyncio.Semaphore(processes)
+        self._executor = None
+        # Pids reported by the current executor's workers
+        self._pids = None
+
+    @property
+    def capacity(self) -> int:
+        return self.processes + self.queue_limit
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use, so importing handlers never starts processes
+        if self._executor is None:
+            self._pids = multiprocessing.SimpleQueue()
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=start_worker,
+                                                 initargs=(self._pids,))
+        return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor):
+        """Kill the workers, running tasks fail and the next submission starts a fresh pool"""
+        if executor is not self._executor:
+            # Already replaced after an earlier timeout
+            return
+        pids = self._pids
+        self._executor = None
+        self._pids = None
+        # Workers ignore SIGTERM, and a stuck task never returns to check for shutdown
+        while not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        pids.close()
+
+    async def run(self, fn, *args, timeout: float = WORKER_TASK_TIMEOUT):
+        """Run fn(*args) in a worker process and return its result"""
+        name = getattr(fn, '__name__', 'task')
+        if self.pending >= self.capacity:
+            WORKER_TASKS.labels(name, "busy").inc()
+            raise WorkerBusy(f"{self.pending} tasks already queued")
+
+        self.pending += 1
+        WORKER_QUEUE_DEPTH.inc()
+        start = time.perf_counter()
+        result = "error"
+        executor = None
+        try:
+            async with self._slots:
+                executor = self._get_executor()
+                future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+                value = await asyncio.wait_for(future, timeout)
+            result = "ok"
+            return value
+        except asyncio.TimeoutError:
+            result = "timeout"
+            logger.warning(f"⏱️ Worker task {name} exceeded {timeout}s, restarting the worker pool")
+            self._restart(executor)
+            raise WorkerTimeout(f"{name} took longer than {timeout}s")
+        except BrokenProcessPool:
+            # Another task's timeout took this worker down with it
+            self._restart(executor)
+            raise WorkerError(f"{name} was interrupted, please try again")
+        finally:
+            self.pending -= 1
+            WORKER_QUEUE_DEPTH.dec()
+            WORKER_TASKS.labels(name, result).inc()
+            WORKER_TASK_DURATION.labels(name).observe(time.perf_counter() - start)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pids = None
+
+WORKER_POOL = WorkerPool()